@@ -0,0 +1,1184 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from feishu_bitable_utils import (
+    BATCH_GET_LIMIT,
+    BATCH_RECORD_LIMIT,
+    FEISHU_DOMAIN,
+    RATE_LIMIT_CODES,
+    TOKEN_INVALID_CODES,
+    AttachmentCache,
+    ClientMetrics,
+    FeishuBitableClient,
+    RecordCache,
+    SchemaCache,
+    _backoff_delay,
+    _json_loads,
+    _retry_after,
+)
+
+
+class AsyncTenantAccessTokenManager:
+    """
+    tenant_access_token 异步缓存管理器
+
+    与 TenantAccessTokenManager 逻辑一致，使用 asyncio.Lock 实现单飞刷新，
+    供同一事件循环中的协程共用
+    """
+
+    def __init__(self, fetcher: Callable[[], Awaitable[Tuple[str, int]]], refresh_ahead: float = 300):
+        """
+        初始化令牌管理器
+
+        Args:
+            fetcher: 获取新令牌的协程函数，返回 (token, expire秒数)，失败时返回空 token
+            refresh_ahead: 距过期多少秒时开始提前刷新
+        """
+        self._fetcher = fetcher
+        self._refresh_ahead = refresh_ahead
+        self._lock = asyncio.Lock()
+        self._token = ""
+        self._expires_at = 0.0
+
+        # 统计计数
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    async def get_token(self, force_refresh: bool = False) -> str:
+        """
+        获取令牌，优先使用缓存
+
+        Args:
+            force_refresh: 是否忽略缓存强制刷新
+
+        Returns:
+            tenant_access_token，获取失败时返回空字符串
+        """
+        now = time.monotonic()
+        if not force_refresh and self._token and now < self._expires_at:
+            # 未进入提前刷新窗口，或已有协程在刷新时，直接使用旧令牌
+            if now < self._expires_at - self._refresh_ahead or self._lock.locked():
+                self.hits += 1
+                return self._token
+
+        async with self._lock:
+            now = time.monotonic()
+            if not force_refresh and self._token and now < self._expires_at - self._refresh_ahead:
+                self.hits += 1
+                return self._token
+
+            self.misses += 1
+            token, expire = await self._fetcher()
+            if not token:
+                self.failures += 1
+                # 刷新失败时，旧令牌只要未过期仍可继续使用
+                if self._token and now < self._expires_at:
+                    return self._token
+                return ""
+
+            self.refreshes += 1
+            self._token = token
+            self._expires_at = time.monotonic() + max(int(expire), 0)
+            return token
+
+    def invalidate(self):
+        """使缓存的令牌失效，下次获取时重新请求"""
+        self._token = ""
+        self._expires_at = 0.0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计
+
+        Returns:
+            包含 hits、misses、refreshes、failures 的字典
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "failures": self.failures
+        }
+
+
+class AsyncFeishuBitableClient:
+    """
+    飞书多维表格异步操作工具类
+
+    与 FeishuBitableClient 方法一致的 asyncio 版本。
+    记录、数据表和字段接口与令牌、附件下载一样经连接池化的 httpx.AsyncClient 直接请求开放平台，
+    不经过 SDK（SDK 的异步方法每次调用都新建连接，令牌获取也是同步阻塞的），
+    分页读取以异步生成器提供，单个事件循环即可并发大量请求
+    """
+
+    def __init__(self,
+                 app_id: str,
+                 app_secret: str,
+                 log_level: int = logging.INFO,
+                 max_connections: int = 100,
+                 timeout: float = 60.0,
+                 attachment_cache: Optional[AttachmentCache] = None,
+                 schema_cache: Optional[SchemaCache] = None,
+                 record_cache: Optional[RecordCache] = None,
+                 raw_decode: bool = False,
+                 metrics: Optional[ClientMetrics] = None,
+                 base_url: str = FEISHU_DOMAIN,
+                 http: Optional[httpx.AsyncClient] = None):
+        """
+        初始化飞书多维表格异步客户端
+
+        Args:
+            app_id: 飞书应用的 App ID
+            app_secret: 飞书应用的 App Secret
+            log_level: 日志等级，默认为 INFO
+            max_connections: HTTP 连接池的最大连接数
+            timeout: HTTP 请求超时时间（秒）
+            attachment_cache: 附件本地缓存，命中时跳过下载，为空时不使用缓存
+            schema_cache: 数据表和字段结构缓存，为空时不使用缓存
+            record_cache: 记录读缓存，为空时不使用缓存
+            raw_decode: 与同步客户端含义一致，搜索、获取、批量获取、批量创建和批量更新记录时
+                直接从响应 JSON 取值，不构建 SDK 的模型对象
+            metrics: 指标收集器，与同步客户端共用，为空时不记录指标
+            base_url: 开放平台的域名，所有请求都发往该域名
+            http: 所有请求使用的 httpx.AsyncClient，可配置自定义 transport，
+                由调用方负责关闭。为空时按 max_connections 创建
+        """
+        # 复用同步客户端的限流器、日志以及响应转换逻辑
+        self._sync = FeishuBitableClient(
+            app_id, app_secret, log_level,
+            attachment_cache=attachment_cache,
+            schema_cache=schema_cache,
+            record_cache=record_cache,
+            raw_decode=raw_decode,
+            metrics=metrics,
+            base_url=base_url
+        )
+        self.attachment_cache = attachment_cache
+        self.schema_cache = schema_cache
+        self.record_cache = record_cache
+        self.raw_decode = raw_decode
+        self.metrics = metrics
+        self.logger = self._sync.logger
+
+        # 存储应用凭证
+        self.app_id = app_id
+        self.app_secret = app_secret
+
+        self._owns_http = http is None
+        self.http = http or httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout
+        )
+        self.token_manager = AsyncTenantAccessTokenManager(self._fetch_tenant_access_token)
+
+    async def aclose(self):
+        """关闭 HTTP 连接池"""
+        if self._owns_http:
+            await self.http.aclose()
+        self._sync.close()
+
+    async def __aenter__(self) -> "AsyncFeishuBitableClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def _call_raw(self,
+                        endpoint: str,
+                        method: str,
+                        path: str,
+                        action: str,
+                        params: Optional[Dict[str, Any]] = None,
+                        body: Optional[Dict[str, Any]] = None,
+                        operation: Optional[str] = None) -> Dict[str, Any]:
+        """
+        经连接池直接调用开放平台接口，逻辑与 FeishuBitableClient._call_raw 一致
+
+        经共用的限流器发起请求，触发频率限制时指数退避重试。令牌失效时只强制刷新一次，
+        之后的限流重试复用缓存中的新令牌
+
+        Args:
+            endpoint: 接口类别，对应 rate_limiters 的键
+            method: HTTP 方法
+            path: 接口路径，如 /bitable/v1/apps/{app_token}/tables/{table_id}/records/search
+            action: 失败时错误信息的前缀
+            params: 查询参数
+            body: JSON 请求体
+            operation: 记入 metrics 的操作名，默认为 endpoint
+
+        Returns:
+            响应中的 data 字典
+        """
+        url = f"{self._sync.open_api_url}{path}"
+        limiter = self._sync.rate_limiters[endpoint]
+        attempt = 0
+        refreshed = False
+        force_refresh = False
+
+        while True:
+            token = await self.get_tenant_access_token(force_refresh=force_refresh)
+            force_refresh = False
+            await self._throttle(endpoint)
+            started = time.monotonic()
+            response = await self.http.request(
+                method, url,
+                headers={"Authorization": f"Bearer {token}"},
+                params=params,
+                json=body
+            )
+            try:
+                payload = _json_loads(response.content)
+            except ValueError:
+                payload = {"code": response.status_code, "msg": response.text[:200]}
+            code = payload.get("code")
+            throttled = response.status_code == 429 or code in RATE_LIMIT_CODES
+            if self.metrics:
+                status = "throttled" if throttled else "ok" if code == 0 else "error"
+                self.metrics.observe_request(
+                    endpoint, operation or endpoint, time.monotonic() - started, status, len(response.content)
+                )
+
+            if (response.status_code == 401 or code in TOKEN_INVALID_CODES) and not refreshed:
+                refreshed = True
+                force_refresh = True
+                continue
+
+            if not throttled:
+                limiter.on_success()
+                break
+
+            limiter.on_throttle()
+            if attempt >= self._sync.max_retries:
+                break
+
+            delay = max(_backoff_delay(attempt), _retry_after(response.headers))
+            self.logger.warning(f"{action}: 触发频率限制 (code: {code})，{delay:.2f}s 后第 {attempt + 1} 次重试")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        if code != 0:
+            log_id = response.headers.get("X-Tt-Logid")
+            if self.metrics:
+                self.metrics.observe_error(endpoint, operation or endpoint, code, log_id)
+            raise Exception(self._sync._log_error(action, code, payload.get("msg"), log_id, response.content))
+        return payload.get("data") or {}
+
+    @staticmethod
+    def _sdk_response(name: str, data: Dict[str, Any]) -> Any:
+        """将 data 字典包装为 SDK 的响应模型，以复用同步客户端的响应转换逻辑"""
+        from lark_oapi.api.bitable import v1
+        return getattr(v1, name)({"data": data})
+
+    async def _throttle(self, endpoint: str = "download"):
+        """等待限流器放行一次请求"""
+        wait = self._sync.rate_limiters[endpoint].reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def search_records(self,
+                             app_token: str,
+                             table_id: str,
+                             view_id: Optional[str] = None,
+                             field_names: Optional[List[str]] = None,
+                             filter_: Optional[str] = None,
+                             sort: Optional[str] = None,
+                             page_size: int = 20,
+                             page_token: Optional[str] = None,
+                             user_id_type: str = "open_id") -> Dict[str, Any]:
+        """
+        搜索多维表格记录
+
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            view_id: 视图 ID
+            field_names: 需要返回的字段名列表
+            filter_: 过滤条件
+            sort: 排序条件
+            page_size: 分页大小
+            page_token: 分页标记
+            user_id_type: 用户 ID 类型
+
+        Returns:
+            搜索结果数据
+        """
+        params = {"page_size": page_size, "user_id_type": user_id_type}
+        if page_token:
+            params["page_token"] = page_token
+
+        body = {}
+        if view_id:
+            body["view_id"] = view_id
+        if field_names:
+            body["field_names"] = field_names
+        if filter_:
+            body["filter"] = FeishuBitableClient._raw_body_value(filter_)
+        if sort:
+            body["sort"] = FeishuBitableClient._raw_body_value(sort)
+
+        data = await self._call_raw(
+            "search", "POST", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/search",
+            "搜索记录失败", params=params, body=body, operation="records.search"
+        )
+        if self.raw_decode:
+            return FeishuBitableClient._search_data_to_dict(data)
+        return FeishuBitableClient._search_response_to_dict(self._sdk_response("SearchAppTableRecordResponse", data))
+
+    async def iter_record_pages(self,
+                                app_token: str,
+                                table_id: str,
+                                view_id: Optional[str] = None,
+                                field_names: Optional[List[str]] = None,
+                                filter_: Optional[str] = None,
+                                sort: Optional[str] = None,
+                                page_size: int = 100,
+                                page_token: Optional[str] = None,
+                                user_id_type: str = "open_id") -> AsyncIterator[Dict[str, Any]]:
+        """
+        逐页迭代多维表格记录，自动处理分页
+
+        每页结果中的 page_token 即下一页的断点，可作为本方法的 page_token 参数续读
+
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            view_id: 视图 ID
+            field_names: 需要返回的字段名列表
+            filter_: 过滤条件
+            sort: 排序条件
+            page_size: 分页大小
+            page_token: 起始分页标记，为空时从第一页开始
+            user_id_type: 用户 ID 类型
+
+        Yields:
+            每一页的搜索结果数据
+        """
+        has_more = True
+        pages = 0
+
+        try:
+            while has_more:
+                result = await self.search_records(
+                    app_token=app_token,
+                    table_id=table_id,
+                    view_id=view_id,
+                    field_names=field_names,
+                    filter_=filter_,
+                    sort=sort,
+                    page_size=page_size,
+                    page_token=page_token,
+                    user_id_type=user_id_type
+                )
+                pages += 1
+
+                yield result
+
+                has_more = result.get("has_more", False)
+                page_token = result.get("page_token")
+        finally:
+            if self.metrics:
+                self.metrics.observe_pages("records.search", pages)
+
+    async def iter_records(self,
+                           app_token: str,
+                           table_id: str,
+                           view_id: Optional[str] = None,
+                           field_names: Optional[List[str]] = None,
+                           filter_: Optional[str] = None,
+                           sort: Optional[str] = None,
+                           page_size: int = 100,
+                           page_token: Optional[str] = None,
+                           user_id_type: str = "open_id") -> AsyncIterator[Dict[str, Any]]:
+        """
+        逐条迭代多维表格记录，自动处理分页
+
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            view_id: 视图 ID
+            field_names: 需要返回的字段名列表
+            filter_: 过滤条件
+            sort: 排序条件
+            page_size: 分页大小
+            page_token: 起始分页标记，为空时从第一页开始
+            user_id_type: 用户 ID 类型
+
+        Yields:
+            单条记录数据
+        """
+        async for page in self.iter_record_pages(
+            app_token=app_token,
+            table_id=table_id,
+            view_id=view_id,
+            field_names=field_names,
+            filter_=filter_,
+            sort=sort,
+            page_size=page_size,
+            page_token=page_token,
+            user_id_type=user_id_type
+        ):
+            for record in page.get("items", []):
+                yield record
+
+    async def get_all_records(self,
+                              app_token: str,
+                              table_id: str,
+                              view_id: Optional[str] = None,
+                              field_names: Optional[List[str]] = None,
+                              filter_: Optional[str] = None,
+                              sort: Optional[str] = None,
+                              user_id_type: str = "open_id") -> List[Dict[str, Any]]:
+        """
+        获取多维表格的所有记录，自动处理分页
+
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            view_id: 视图 ID
+            field_names: 需要返回的字段名列表
+            filter_: 过滤条件
+            sort: 排序条件
+            user_id_type: 用户 ID 类型
+
+        Returns:
+            所有记录的列表
+        """
+        return [record async for record in self.iter_records(
+            app_token=app_token,
+            table_id=table_id,
+            view_id=view_id,
+            field_names=field_names,
+            filter_=filter_,
+            sort=sort,
+            page_size=100,
+            user_id_type=user_id_type
+        )]
+
+    async def get_record(self,
+                         app_token: str,
+                         table_id: str,
+                         record_id: str,
+                         user_id_type: str = "open_id") -> Dict[str, Any]:
+        """
+        获取单条记录
+
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            record_id: 记录 ID
+            user_id_type: 用户 ID 类型
+
+        Returns:
+            记录数据
+        """
+        if self.record_cache:
+            cached = self.record_cache.get(app_token, table_id, record_id)
+            if cached:
+                return cached
+
+        data = await self._call_raw(
+            "search", "GET", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/{record_id}",
+            "获取记录失败", params={"user_id_type": user_id_type}, operation="records.get"
+        )
+        if self.raw_decode:
+            result = FeishuBitableClient._raw_record(data["record"]) if data.get("record") else {}
+        else:
+            result = FeishuBitableClient._get_record_to_dict(self._sdk_response("GetAppTableRecordResponse", data))
+        if self.record_cache and result:
+            self.record_cache.set(app_token, table_id, result)
+
+        return result
+
+    async def get_records(self,
+                          app_token: str,
+                          table_id: str,
+                          record_ids: List[str],
+                          user_id_type: str = "open_id",
+                          max_concurrency: int = 4) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取记录
+
+        先查记录缓存，未命中的记录去重后按 BATCH_GET_LIMIT 分块，通过批量获取接口并发请求
+
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            record_ids: 记录 ID 列表，可以重复
+            user_id_type: 用户 ID 类型
+            max_concurrency: 同时请求的分块数
+
+        Returns:
+            {record_id: 记录数据}，不存在的记录不会出现在结果中
+        """
+        result = {}
+        missing = []
+        for record_id in dict.fromkeys(record_ids):
+            cached = self.record_cache.get(app_token, table_id, record_id) if self.record_cache else None
+            if cached:
+                result[record_id] = cached
+            else:
+                missing.append(record_id)
+
+        if not missing:
+            return result
+
+        async def send_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+            data = await self._call_raw(
+                "search", "POST", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/batch_get",
+                "批量获取记录失败", body={"record_ids": chunk, "user_id_type": user_id_type},
+                operation="records.batch_get"
+            )
+            if self.raw_decode:
+                return [FeishuBitableClient._raw_record(record) for record in data.get("records") or []]
+            return FeishuBitableClient._records_to_list(self._sdk_response("BatchGetAppTableRecordResponse", data))
+
+        reports = await self._dispatch_chunks(missing, BATCH_GET_LIMIT, max_concurrency, send_chunk)
+        fetched = self._sync._merge_chunk_results("批量获取记录", reports, raise_on_error=True)
+
+        for record in fetched["records"]:
+            result[record["record_id"]] = record
+            if self.record_cache:
+                self.record_cache.set(app_token, table_id, record)
+
+        return result
+
+    async def create_record(self,
+                            app_token: str,
+                            table_id: str,
+                            fields: Dict[str, Any],
+                            user_id_type: str = "open_id") -> Dict[str, Any]:
+        """
+        创建记录
+
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            fields: 字段值，格式为 {字段名: 字段值}
+            user_id_type: 用户 ID 类型
+
+        Returns:
+            创建的记录数据
+        """
+        data = await self._call_raw(
+            "write", "POST", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records",
+            "创建记录失败", params={"user_id_type": user_id_type}, body={"fields": fields},
+            operation="records.create"
+        )
+        result = FeishuBitableClient._single_record_to_dict(self._sdk_response("CreateAppTableRecordResponse", data))
+        if self.record_cache and result:
+            self.record_cache.set(app_token, table_id, result["record"])
+
+        return result
+
+    async def batch_create_records(self,
+                                   app_token: str,
+                                   table_id: str,
+                                   records: List[Dict[str, Any]],
+                                   user_id_type: str = "open_id",
+                                   chunk_size: int = BATCH_RECORD_LIMIT,
+                                   max_concurrency: int = 4,
+                                   raise_on_error: bool = True) -> Dict[str, Any]:
+        """
+        批量创建记录，超过单次请求上限时自动分块并发提交
+
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            records: 记录列表，每个记录为 {字段名: 字段值} 的字典
+            user_id_type: 用户 ID 类型
+            chunk_size: 每个分块的记录数，不超过 BATCH_RECORD_LIMIT
+            max_concurrency: 同时提交的分块数
+            raise_on_error: 有分块失败时是否抛出 BatchOperationError
+
+        Returns:
+            创建的记录数据，records 按输入顺序合并，chunks 为各分块的执行报告
+        """
+        async def send_chunk(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            data = await self._call_raw(
+                "write", "POST", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/batch_create",
+                "批量创建记录失败", params={"user_id_type": user_id_type},
+                body={"records": [{"fields": record} for record in chunk]}, operation="records.batch_create"
+            )
+            if self.raw_decode:
+                created = [FeishuBitableClient._raw_record(record) for record in data.get("records") or []]
+            else:
+                created = FeishuBitableClient._records_to_list(self._sdk_response("BatchCreateAppTableRecordResponse", data))
+            if self.record_cache:
+                for record in created:
+                    self.record_cache.set(app_token, table_id, record)
+            return created
+
+        reports = await self._dispatch_chunks(records, chunk_size, max_concurrency, send_chunk)
+        return self._sync._merge_chunk_results("批量创建记录", reports, raise_on_error)
+
+    async def update_record(self,
+                            app_token: str,
+                            table_id: str,
+                            record_id: str,
+                            fields: Dict[str, Any],
+                            user_id_type: str = "open_id") -> Dict[str, Any]:
+        """
+        更新记录
+
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            record_id: 记录 ID
+            fields: 需要更新的字段，格式为 {字段名: 字段值}
+            user_id_type: 用户 ID 类型
+
+        Returns:
+            更新后的记录数据
+        """
+        data = await self._call_raw(
+            "write", "PUT", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/{record_id}",
+            "更新记录失败", params={"user_id_type": user_id_type}, body={"fields": fields},
+            operation="records.update"
+        )
+        result = FeishuBitableClient._single_record_to_dict(self._sdk_response("UpdateAppTableRecordResponse", data))
+        if self.record_cache and result:
+            self.record_cache.merge(app_token, table_id, result["record"])
+
+        return result
+
+    async def batch_update_records(self,
+                                   app_token: str,
+                                   table_id: str,
+                                   records: List[Dict[str, Any]],
+                                   user_id_type: str = "open_id",
+                                   chunk_size: int = BATCH_RECORD_LIMIT,
+                                   max_concurrency: int = 4,
+                                   raise_on_error: bool = True) -> Dict[str, Any]:
+        """
+        批量更新记录，超过单次请求上限时自动分块并发提交
+
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            records: 记录列表，每个记录必须包含 record_id 和 fields 字段
+            user_id_type: 用户 ID 类型
+            chunk_size: 每个分块的记录数，不超过 BATCH_RECORD_LIMIT
+            max_concurrency: 同时提交的分块数
+            raise_on_error: 有分块失败时是否抛出 BatchOperationError
+
+        Returns:
+            更新后的记录数据，records 按输入顺序合并，chunks 为各分块的执行报告
+        """
+        records_to_update = FeishuBitableClient._normalize_update_records(records)
+
+        async def send_chunk(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            data = await self._call_raw(
+                "write", "POST", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/batch_update",
+                "批量更新记录失败", params={"user_id_type": user_id_type}, body={"records": chunk},
+                operation="records.batch_update"
+            )
+            if self.raw_decode:
+                updated = [FeishuBitableClient._raw_record(record) for record in data.get("records") or []]
+            else:
+                updated = FeishuBitableClient._records_to_list(self._sdk_response("BatchUpdateAppTableRecordResponse", data))
+            if self.record_cache:
+                for record in updated:
+                    self.record_cache.merge(app_token, table_id, record)
+            return updated
+
+        reports = await self._dispatch_chunks(records_to_update, chunk_size, max_concurrency, send_chunk)
+        return self._sync._merge_chunk_results("批量更新记录", reports, raise_on_error)
+
+    async def delete_record(self,
+                            app_token: str,
+                            table_id: str,
+                            record_id: str,
+                            user_id_type: str = "open_id") -> bool:
+        """
+        删除记录
+
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            record_id: 记录 ID
+            user_id_type: 用户 ID 类型
+
+        Returns:
+            是否删除成功
+        """
+        await self._call_raw(
+            "write", "DELETE", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/{record_id}",
+            "删除记录失败", operation="records.delete"
+        )
+        if self.record_cache:
+            self.record_cache.invalidate(app_token, table_id, record_id)
+
+        return True
+
+    async def batch_delete_records(self,
+                                   app_token: str,
+                                   table_id: str,
+                                   record_ids: List[str],
+                                   user_id_type: str = "open_id",
+                                   chunk_size: int = BATCH_RECORD_LIMIT,
+                                   max_concurrency: int = 4) -> bool:
+        """
+        批量删除记录，超过单次请求上限时自动分块并发提交
+
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            record_ids: 记录 ID 列表
+            user_id_type: 用户 ID 类型
+            chunk_size: 每个分块的记录数，不超过 BATCH_RECORD_LIMIT
+            max_concurrency: 同时提交的分块数
+
+        Returns:
+            是否删除成功
+        """
+        async def send_chunk(chunk: List[str]) -> List[str]:
+            await self._call_raw(
+                "write", "POST", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/batch_delete",
+                "批量删除记录失败", body={"records": chunk}, operation="records.batch_delete"
+            )
+            if self.record_cache:
+                for record_id in chunk:
+                    self.record_cache.invalidate(app_token, table_id, record_id)
+            return chunk
+
+        reports = await self._dispatch_chunks(record_ids, chunk_size, max_concurrency, send_chunk)
+        self._sync._merge_chunk_results("批量删除记录", reports, raise_on_error=True)
+        return True
+
+    async def _dispatch_chunks(self,
+                               items: List[Any],
+                               chunk_size: int,
+                               max_concurrency: int,
+                               send_chunk: Callable[[List[Any]], Awaitable[Any]]) -> List[Dict[str, Any]]:
+        """
+        将输入切分为不超过上限的分块并发提交
+
+        Returns:
+            按输入顺序排列的分块报告，格式与 FeishuBitableClient._dispatch_chunks 一致
+        """
+        chunk_size = max(1, min(chunk_size, BATCH_RECORD_LIMIT))
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(index: int) -> Dict[str, Any]:
+            report = {
+                "index": index,
+                "start": index * chunk_size,
+                "count": len(chunks[index]),
+                "success": False,
+                "error": None,
+                "result": None
+            }
+            async with semaphore:
+                try:
+                    report["result"] = await send_chunk(chunks[index])
+                    report["success"] = True
+                except Exception as e:
+                    report["error"] = str(e)
+            return report
+
+        return list(await asyncio.gather(*(run(i) for i in range(len(chunks)))))
+
+    async def get_table_list(self,
+                             app_token: str,
+                             page_size: int = 100,
+                             page_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取数据表列表
+
+        Args:
+            app_token: 多维表格的 app_token
+            page_size: 分页大小
+            page_token: 分页标记
+
+        Returns:
+            数据表列表
+        """
+        params = {"page_size": page_size}
+        if page_token:
+            params["page_token"] = page_token
+
+        data = await self._call_raw(
+            "search", "GET", f"/bitable/v1/apps/{app_token}/tables",
+            "获取数据表列表失败", params=params, operation="tables.list"
+        )
+        return FeishuBitableClient._table_list_to_dict(self._sdk_response("ListAppTableResponse", data))
+
+    async def get_all_tables(self, app_token: str, use_cache: bool = True) -> List[Dict[str, Any]]:
+        """
+        获取所有数据表，自动处理分页
+
+        schema_cache 的使用方式与 FeishuBitableClient.get_all_tables 一致
+
+        Args:
+            app_token: 多维表格的 app_token
+            use_cache: 是否使用结构缓存
+
+        Returns:
+            所有数据表的列表
+        """
+        cache = self.schema_cache if use_cache else None
+        if cache:
+            entry = cache.get_tables(app_token)
+            if entry and cache.is_fresh(entry):
+                return entry["tables"]
+
+        all_tables = []
+        page_token = None
+        has_more = True
+        pages = 0
+
+        while has_more:
+            result = await self.get_table_list(app_token=app_token, page_token=page_token)
+            pages += 1
+            all_tables.extend(result["items"])
+            has_more = result.get("has_more", False)
+            page_token = result.get("page_token")
+
+        if self.metrics:
+            self.metrics.observe_pages("tables.list", pages)
+        if self.schema_cache:
+            self.schema_cache.set_tables(app_token, [dict(table) for table in all_tables])
+
+        return all_tables
+
+    async def get_field_list(self,
+                             app_token: str,
+                             table_id: str,
+                             view_id: Optional[str] = None,
+                             page_size: int = 100,
+                             page_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取字段列表
+
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            view_id: 视图 ID
+            page_size: 分页大小
+            page_token: 分页标记
+
+        Returns:
+            字段列表
+        """
+        params = {"page_size": page_size}
+        if view_id:
+            params["view_id"] = view_id
+        if page_token:
+            params["page_token"] = page_token
+
+        data = await self._call_raw(
+            "search", "GET", f"/bitable/v1/apps/{app_token}/tables/{table_id}/fields",
+            "获取字段列表失败", params=params, operation="fields.list"
+        )
+        return FeishuBitableClient._field_list_to_dict(self._sdk_response("ListAppTableFieldResponse", data))
+
+    async def get_all_fields(self,
+                             app_token: str,
+                             table_id: str,
+                             view_id: Optional[str] = None,
+                             use_cache: bool = True) -> List[Dict[str, Any]]:
+        """
+        获取所有字段，自动处理分页
+
+        schema_cache 的使用方式与 FeishuBitableClient.get_all_fields 一致
+
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            view_id: 视图 ID
+            use_cache: 是否使用结构缓存
+
+        Returns:
+            所有字段的列表
+        """
+        cache = self.schema_cache if use_cache else None
+        if cache:
+            entry = cache.get_fields(app_token, table_id, view_id)
+            if entry and cache.is_fresh(entry):
+                return entry["fields"]
+
+            # 数据表列表缺失或过期时刷新，revision 变化的字段缓存会在此时失效
+            tables = cache.get_tables(app_token)
+            if tables is None or (cache.ttl is not None and not cache.is_fresh(tables)):
+                await self.get_all_tables(app_token, use_cache=False)
+            entry = cache.get_fields(app_token, table_id, view_id)
+            if entry and entry["revision"] == cache.table_revision(app_token, table_id):
+                if cache.ttl is not None:
+                    cache.touch_fields(app_token, table_id, view_id)
+                return entry["fields"]
+
+        all_fields = []
+        page_token = None
+        has_more = True
+        pages = 0
+
+        while has_more:
+            result = await self.get_field_list(
+                app_token=app_token,
+                table_id=table_id,
+                view_id=view_id,
+                page_token=page_token
+            )
+            pages += 1
+            all_fields.extend(result["items"])
+            has_more = result.get("has_more", False)
+            page_token = result.get("page_token")
+
+        if self.metrics:
+            self.metrics.observe_pages("fields.list", pages)
+        if cache:
+            cache.set_fields(
+                app_token, table_id, view_id,
+                [dict(field) for field in all_fields],
+                cache.table_revision(app_token, table_id)
+            )
+
+        return all_fields
+
+    async def get_tenant_access_token(self, force_refresh: bool = False) -> str:
+        """
+        获取飞书的tenant_access_token，令牌会按有效期缓存并自动提前刷新
+
+        Args:
+            force_refresh: 是否忽略缓存强制刷新
+
+        Returns:
+            tenant_access_token: 租户访问令牌
+        """
+        return await self.token_manager.get_token(force_refresh)
+
+    async def _fetch_tenant_access_token(self) -> Tuple[str, int]:
+        """
+        请求新的tenant_access_token
+
+        Returns:
+            (tenant_access_token, 有效期秒数)，失败时返回 ("", 0)
+        """
+        payload = {
+            "app_id": self.app_id,
+            "app_secret": self.app_secret
+        }
+
+        try:
+            await self._throttle("auth")
+            response = await self.http.post(self._sync.token_url, json=payload)
+            if response.status_code == 200:
+                data = response.json()
+                if data.get("code") == 0:
+                    return data.get("tenant_access_token", ""), data.get("expire", 0)
+                else:
+                    self.logger.error(f"获取tenant_access_token失败: {data}")
+            else:
+                self.logger.error(f"获取tenant_access_token请求失败，状态码: {response.status_code}")
+        except Exception as e:
+            self.logger.error(f"获取tenant_access_token异常: {e}")
+
+        return "", 0
+
+    async def download_attachment(self,
+                                  attachment_item: Dict[str, Any],
+                                  save_path: str,
+                                  chunk_size: Optional[int] = None,
+                                  max_resume: int = 3) -> bool:
+        """
+        下载飞书附件
+
+        注意：必须使用API返回的原始URL（带有必要的extra参数），而不是自己构建URL。
+        与 FeishuBitableClient.download_attachment 一致，先写入 .part 临时文件，
+        中断后通过 HTTP Range 续传，校验大小后原子地重命名，并按 file_token 使用本地缓存
+
+        Args:
+            attachment_item: 附件字段项，必须包含url和name字段，可选的size字段用于校验文件大小
+            save_path: 保存文件的路径
+            chunk_size: 每次读取和写入的字节数，默认使用同步客户端的 download_chunk_size
+            max_resume: 连接中断后的最大续传次数
+
+        Returns:
+            bool: 下载是否成功
+        """
+        if not attachment_item:
+            self.logger.error("附件项为空，无法下载")
+            return False
+
+        file_url = attachment_item.get('url')
+        file_name = attachment_item.get('name', 'unknown_file')
+
+        if not file_url:
+            self.logger.error(f"附件项缺少URL信息: {attachment_item}")
+            return False
+
+        chunk_size = chunk_size or self._sync.download_chunk_size
+        expected_size = attachment_item.get('size')
+        expected_size = int(expected_size) if expected_size is not None else None
+        part_path = save_path + ".part"
+        file_token = attachment_item.get('file_token')
+        limiter = self._sync.rate_limiters["download"]
+
+        try:
+            if self.attachment_cache and file_token and \
+                    self.attachment_cache.materialize(file_token, save_path, expected_size):
+                self.logger.info(f"命中附件缓存: {file_name} -> {save_path}")
+                return True
+
+            # 确保目标文件夹存在
+            os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+
+            self.logger.info(f"开始下载文件: {file_name}")
+            self.logger.debug(f"下载URL: {file_url}")
+
+            started = time.monotonic()
+            downloaded = 0
+            refreshed = False
+            throttled = 0
+            resumes = 0
+            total_size = None
+            while True:
+                offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                if expected_size and offset > expected_size:
+                    # 残留的临时文件比附件还大，只能从头下载
+                    os.remove(part_path)
+                    offset = 0
+                if expected_size and offset == expected_size:
+                    total_size = expected_size
+                    break
+
+                token = await self.get_tenant_access_token()
+                if not token:
+                    self.logger.error(f"无法获取授权token，下载失败: {file_url}")
+                    return False
+
+                headers = {
+                    "Authorization": f"Bearer {token}"
+                }
+                if offset:
+                    headers["Range"] = f"bytes={offset}-"
+
+                await self._throttle()
+                async with self.http.stream("GET", file_url, headers=headers) as response:
+                    if response.status_code == 401 and not refreshed:
+                        # 令牌可能已被服务端提前作废，强制刷新后重试一次
+                        refreshed = True
+                        self.token_manager.invalidate()
+                        continue
+
+                    if response.status_code == 429:
+                        limiter.on_throttle()
+                        if throttled < self._sync.max_retries:
+                            delay = max(_backoff_delay(throttled), _retry_after(response.headers))
+                            self.logger.warning(f"请求触发频率限制 (HTTP 429)，{delay:.2f}s 后第 {throttled + 1} 次重试: {file_url}")
+                            throttled += 1
+                            await asyncio.sleep(delay)
+                            continue
+                    else:
+                        limiter.on_success()
+
+                    if response.status_code == 416 and offset:
+                        # 服务端不接受续传位置，丢弃临时文件后从头下载
+                        os.remove(part_path)
+                        resumes += 1
+                        if resumes > max_resume:
+                            self.logger.error(f"下载文件失败，续传位置无效: {file_url}")
+                            return False
+                        continue
+
+                    if response.status_code not in (200, 206):
+                        body = await response.aread()
+                        self.logger.error(f"下载文件失败，状态码: {response.status_code}, 响应: {body[:500]!r}")
+                        return False
+
+                    # 服务端忽略 Range 返回完整内容时，从头写入
+                    if response.status_code == 200:
+                        offset = 0
+                    total_size = FeishuBitableClient._content_total_size(response.headers, response.status_code, offset)
+
+                    try:
+                        with open(part_path, 'ab' if offset else 'wb') as f:
+                            async for chunk in response.aiter_bytes(chunk_size):
+                                if chunk:
+                                    f.write(chunk)
+                                    downloaded += len(chunk)
+                    except httpx.TransportError as e:
+                        resumes += 1
+                        if resumes > max_resume:
+                            self.logger.error(f"下载文件中断且超过最大续传次数: {e}")
+                            return False
+                        self.logger.warning(f"下载文件中断，第 {resumes} 次续传: {e}")
+                        continue
+
+                if total_size is not None and os.path.getsize(part_path) < total_size:
+                    resumes += 1
+                    if resumes > max_resume:
+                        self.logger.error(f"下载文件不完整且超过最大续传次数: {file_url}")
+                        return False
+                    self.logger.warning(f"下载文件不完整，第 {resumes} 次续传: {file_name}")
+                    continue
+                break
+
+            # 检查文件大小
+            file_size = os.path.getsize(part_path)
+            for label, size in (("Content-Length", total_size), ("附件 size", expected_size)):
+                if size is not None and file_size != size:
+                    self.logger.error(f"下载文件大小校验失败，{label}: {size}, 实际: {file_size} bytes")
+                    os.remove(part_path)
+                    return False
+            if total_size is None and expected_size is None and file_size < 100:
+                # 无法校验大小时，文件太小可能是下载失败
+                self.logger.warning(f"下载文件可能失败，文件大小过小: {file_size} bytes")
+                os.remove(part_path)
+                return False
+
+            os.replace(part_path, save_path)
+            if self.metrics:
+                self.metrics.observe_download(downloaded, time.monotonic() - started)
+            if self.attachment_cache and file_token:
+                self.attachment_cache.put(file_token, save_path)
+            self.logger.info(f"文件下载成功: {save_path}")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"下载文件异常: {e}")
+            return False
+
+    async def download_field_attachments(self,
+                                         field_data: List[Dict],
+                                         save_dir: str,
+                                         prefix: str = "",
+                                         max_concurrency: int = 4) -> List[str]:
+        """
+        并发下载字段中的所有附件
+
+        Args:
+            field_data: 字段数据，一个附件项列表
+            save_dir: 保存文件的目录
+            prefix: 文件名前缀
+            max_concurrency: 同时进行的下载数
+
+        Returns:
+            List[str]: 下载成功的文件路径列表，顺序与附件顺序一致
+        """
+        if not field_data or not isinstance(field_data, list):
+            self.logger.warning(f"字段数据为空或不是列表类型: {type(field_data).__name__}")
+            return []
+
+        self.logger.info(f"处理附件字段，包含 {len(field_data)} 个文件")
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def download(index: int, item: Dict[str, Any]) -> Optional[str]:
+            save_path = FeishuBitableClient._attachment_save_path(save_dir, index, item, prefix)
+            async with semaphore:
+                if await self.download_attachment(item, save_path):
+                    return save_path
+            return None
+
+        results = await asyncio.gather(*(
+            download(i, item) for i, item in enumerate(field_data) if isinstance(item, dict)
+        ))
+        return [path for path in results if path]
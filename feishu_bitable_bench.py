@@ -0,0 +1,534 @@
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from feishu_bitable_utils import DEFAULT_RATE_LIMITS, FeishuBitableClient
+
+
+class MockBitableServer:
+    """
+    本地模拟的飞书开放平台服务
+
+    在后台线程中运行，实现令牌、记录的搜索/获取/增删改、数据表和字段列表以及附件下载和上传接口，
+    可配置每个请求的延迟、单页记录数上限和按间隔返回的频率限制，用于离线压测客户端
+    """
+
+    APP_TOKEN = "bench_app"
+    TABLE_ID = "tbl_bench"
+    FIELDS = [
+        {"field_id": "fld_text", "field_name": "文本", "type": 1},
+        {"field_id": "fld_number", "field_name": "数字", "type": 2},
+        {"field_id": "fld_date", "field_name": "日期", "type": 5},
+        {"field_id": "fld_attachment", "field_name": "附件", "type": 17},
+    ]
+
+    def __init__(self,
+                 records: int = 10000,
+                 latency: float = 0.0,
+                 max_page_size: int = 500,
+                 throttle_every: int = 0,
+                 attachment_size: int = 4 * 1024 * 1024,
+                 tables: int = 1,
+                 upload_block_size: int = 4 * 1024 * 1024):
+        """
+        初始化模拟服务
+
+        Args:
+            records: 初始记录数
+            latency: 每个请求的固定延迟（秒）
+            max_page_size: 搜索接口单页返回记录数的上限
+            throttle_every: 每隔多少个请求返回一次频率限制，0 表示不限流
+            attachment_size: 附件的字节数
+            tables: 数据表数量，只有第一张表有记录
+            upload_block_size: 分片上传的分片大小
+        """
+        self.latency = latency
+        self.max_page_size = max_page_size
+        self.throttle_every = throttle_every
+        self.attachment = os.urandom(attachment_size)
+        self.tables = [
+            {"table_id": self.TABLE_ID if i == 0 else f"tbl_bench_{i}", "name": f"表{i}", "revision": 1}
+            for i in range(tables)
+        ]
+        self.upload_block_size = upload_block_size
+        self.uploads: Dict[str, Dict[str, Any]] = {}
+        self.uploaded: Dict[str, int] = {}
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.requests = 0
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        for _ in range(records):
+            self._add_record()
+
+    @property
+    def url(self) -> str:
+        """服务的基础地址，如 http://127.0.0.1:8080"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _add_record(self, fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self._next_id += 1
+        record_id = f"rec{self._next_id:08d}"
+        if fields is None:
+            fields = {
+                "文本": [{"type": "text", "text": f"第 {self._next_id} 条记录"}],
+                "数字": self._next_id * 1.5,
+                "日期": 1700000000000 + self._next_id * 1000,
+                "附件": [{
+                    "file_token": f"box{self._next_id % 16}",
+                    "name": f"file{self._next_id % 16}.bin",
+                    "size": len(self.attachment),
+                    "url": f"/open-apis/drive/v1/medias/box{self._next_id % 16}/download"
+                }],
+            }
+        self.records[record_id] = fields
+        return {"record_id": record_id, "fields": fields}
+
+    def start(self) -> "MockBitableServer":
+        """在随机端口上启动服务"""
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MockBitableServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockBitableServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _should_throttle(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            return bool(self.throttle_every) and self.requests % self.throttle_every == 0
+
+    def handle(self, method: str, path: str, query: Dict[str, str], body: Any) -> Tuple[int, Any]:
+        """
+        处理一个请求
+
+        Returns:
+            (HTTP 状态码, JSON 响应)，附件下载时响应为 bytes
+        """
+        if path == "/open-apis/auth/v3/tenant_access_token/internal":
+            return 200, {"code": 0, "msg": "ok", "tenant_access_token": "t-bench", "expire": 7200}
+
+        match = re.fullmatch(r"/open-apis/drive/v1/medias/([^/]+)/download", path)
+        if match:
+            return 200, self.attachment
+
+        match = re.fullmatch(r"/open-apis/drive/v1/medias/(upload_all|upload_prepare|upload_part|upload_finish)", path)
+        if match and method == "POST":
+            with self._lock:
+                return self._upload(match.group(1), body or {})
+
+        match = re.fullmatch(r"/open-apis/bitable/v1/apps/([^/]+)/tables(?:/([^/]+)(?:/(records|fields)(?:/([^/]+))?)?)?", path)
+        if not match:
+            return 404, {"code": 404, "msg": f"not found: {path}"}
+        table_id, kind, tail = match.group(2), match.group(3), match.group(4)
+
+        if table_id is None:
+            return 200, self._ok({"has_more": False, "page_token": "", "total": len(self.tables), "items": self.tables})
+        if kind == "fields":
+            return 200, self._ok({"has_more": False, "page_token": "", "total": len(self.FIELDS), "items": self.FIELDS})
+        if kind != "records":
+            return 404, {"code": 404, "msg": f"not found: {path}"}
+
+        records = self.records if table_id == self.TABLE_ID else {}
+        with self._lock:
+            if method == "POST" and tail == "search":
+                return 200, self._ok(self._search(records, query, body or {}))
+            if method == "POST" and tail == "batch_get":
+                ids = body.get("record_ids", [])
+                return 200, self._ok({"records": [self._record(records, rid) for rid in ids if rid in records]})
+            if method == "POST" and tail == "batch_create":
+                return 200, self._ok({"records": [self._add_record(item.get("fields", {})) for item in body.get("records", [])]})
+            if method == "POST" and tail == "batch_update":
+                updated = []
+                for item in body.get("records", []):
+                    records.setdefault(item["record_id"], {}).update(item.get("fields", {}))
+                    updated.append(self._record(records, item["record_id"]))
+                return 200, self._ok({"records": updated})
+            if method == "POST" and tail == "batch_delete":
+                deleted = [{"record_id": rid, "deleted": records.pop(rid, None) is not None} for rid in body.get("records", [])]
+                return 200, self._ok({"records": deleted})
+            if method == "POST" and tail is None:
+                return 200, self._ok({"record": self._add_record(body.get("fields", {}))})
+            if tail and tail in records:
+                if method == "GET":
+                    return 200, self._ok({"record": self._record(records, tail)})
+                if method == "PUT":
+                    records[tail].update(body.get("fields", {}))
+                    return 200, self._ok({"record": self._record(records, tail)})
+                if method == "DELETE":
+                    records.pop(tail)
+                    return 200, self._ok({"deleted": True, "record_id": tail})
+        return 200, {"code": 1254043, "msg": "RecordIdNotFound"}
+
+    def _upload(self, step: str, body: Dict[str, Any]) -> Tuple[int, Any]:
+        if step == "upload_all":
+            if len(body.get("file", b"")) != int(body.get("size", -1)):
+                return 400, {"code": 1061002, "msg": "params error: size mismatch"}
+            return 200, self._ok({"file_token": self._finish_upload(int(body["size"]))})
+        if step == "upload_prepare":
+            upload_id = f"upload{len(self.uploads) + 1}"
+            size = int(body["size"])
+            block_num = max(1, -(-size // self.upload_block_size))
+            self.uploads[upload_id] = {"size": size, "block_num": block_num, "parts": {}}
+            return 200, self._ok({"upload_id": upload_id, "block_size": self.upload_block_size, "block_num": block_num})
+        upload = self.uploads.get(body.get("upload_id"))
+        if upload is None:
+            return 400, {"code": 1061002, "msg": "params error: unknown upload_id"}
+        if step == "upload_part":
+            upload["parts"][int(body["seq"])] = len(body.get("file", b""))
+            return 200, self._ok({})
+        if len(upload["parts"]) != upload["block_num"] or sum(upload["parts"].values()) != upload["size"]:
+            return 400, {"code": 1061002, "msg": "params error: missing parts"}
+        return 200, self._ok({"file_token": self._finish_upload(upload["size"])})
+
+    def _finish_upload(self, size: int) -> str:
+        file_token = f"boxup{len(self.uploaded) + 1}"
+        self.uploaded[file_token] = size
+        return file_token
+
+    @staticmethod
+    def _ok(data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"code": 0, "msg": "success", "data": data}
+
+    @staticmethod
+    def _record(records: Dict[str, Dict[str, Any]], record_id: str) -> Dict[str, Any]:
+        return {"record_id": record_id, "fields": records[record_id]}
+
+    def _search(self, records: Dict[str, Dict[str, Any]], query: Dict[str, str], body: Dict[str, Any]) -> Dict[str, Any]:
+        page_size = min(int(query.get("page_size", 20)), self.max_page_size)
+        offset = int(query.get("page_token") or 0)
+        ids = list(records)
+        page = ids[offset:offset + page_size]
+        field_names = body.get("field_names")
+        items = []
+        for record_id in page:
+            fields = records[record_id]
+            if field_names:
+                fields = {name: fields[name] for name in field_names if name in fields}
+            items.append({"record_id": record_id, "fields": fields})
+        has_more = offset + page_size < len(ids)
+        return {
+            "has_more": has_more,
+            "page_token": str(offset + page_size) if has_more else "",
+            "total": len(ids),
+            "items": items
+        }
+
+
+def _make_handler(server: MockBitableServer):
+    """生成绑定到模拟服务的请求处理类"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _dispatch(self):
+            if server.latency:
+                time.sleep(server.latency)
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            parts = urlsplit(self.path)
+            query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+
+            if server._should_throttle():
+                self._send(429, {"code": 99991400, "msg": "request trigger frequency limit"}, {"x-ogw-ratelimit-reset": "0"})
+                return
+
+            content_type = self.headers.get("Content-Type") or ""
+            if content_type.startswith("multipart/form-data"):
+                body = self._parse_form(content_type, raw)
+            else:
+                body = json.loads(raw) if raw else None
+            status, payload = server.handle(self.command, parts.path, query, body)
+            if isinstance(payload, bytes):
+                self._send_bytes(status, payload)
+            else:
+                self._send(status, payload)
+
+        @staticmethod
+        def _parse_form(content_type: str, raw: bytes) -> Dict[str, Any]:
+            """解析 multipart 表单，文件字段保留为 bytes，其余字段解码为字符串"""
+            message = BytesParser(policy=default_policy).parsebytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode() + raw
+            )
+            form = {}
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                value = part.get_payload(decode=True) or b""
+                form[name] = value if part.get_filename() else value.decode("utf-8")
+            return form
+
+        def _send(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("X-Tt-Logid", f"bench-{server.requests}")
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_bytes(self, status: int, data: bytes):
+            # 支持 Range 续传
+            start = 0
+            range_header = self.headers.get("Range")
+            if range_header:
+                match = re.fullmatch(r"bytes=(\d+)-", range_header)
+                start = int(match.group(1)) if match else 0
+            chunk = data[start:]
+            self.send_response(206 if start else status)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(chunk)))
+            if start:
+                self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+            self.end_headers()
+            self.wfile.write(chunk)
+
+        do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+    return Handler
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class BenchmarkResult:
+    """单个方法的压测结果"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.records = 0
+        self.pages = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = self.elapsed or 1e-9
+        return {
+            "name": self.name,
+            "calls": len(self.latencies),
+            "elapsed": self.elapsed,
+            "records_per_sec": self.records / elapsed,
+            "pages_per_sec": self.pages / elapsed,
+            "mb_per_sec": self.bytes / elapsed / (1024 * 1024),
+            "p50_ms": _percentile(self.latencies, 0.5) * 1000,
+            "p99_ms": _percentile(self.latencies, 0.99) * 1000,
+        }
+
+
+def run_benchmarks(server: MockBitableServer,
+                   client: FeishuBitableClient,
+                   iterations: int = 20,
+                   page_size: int = 500,
+                   prefetch: int = 2,
+                   batch_size: int = 500) -> List[Dict[str, Any]]:
+    """
+    对客户端的主要方法逐一压测
+
+    Args:
+        server: 已启动的模拟服务
+        client: base_url 为模拟服务地址的客户端
+        iterations: 单条请求类方法的调用次数
+        page_size: 分页读取的分页大小
+        prefetch: 分页读取的预取深度
+        batch_size: 批量写入的记录数
+
+    Returns:
+        每个方法的结果列表
+    """
+    app_token, table_id = server.APP_TOKEN, server.TABLE_ID
+    record_ids = list(server.records)
+    # 预先导入并构建 SDK 客户端，避免首次调用的导入耗时计入结果
+    client.client
+    results = []
+
+    def bench(name: str, call: Callable[[BenchmarkResult], None], times: int = iterations):
+        result = BenchmarkResult(name)
+        start = time.perf_counter()
+        for _ in range(times):
+            call_start = time.perf_counter()
+            call(result)
+            result.latencies.append(time.perf_counter() - call_start)
+        result.elapsed = time.perf_counter() - start
+        results.append(result.to_dict())
+
+    def token(result: BenchmarkResult):
+        client.get_tenant_access_token(force_refresh=True)
+
+    def search(result: BenchmarkResult):
+        page = client.search_records(app_token, table_id, page_size=page_size)
+        result.pages += 1
+        result.records += len(page.get("items", []))
+
+    def iterate(result: BenchmarkResult):
+        for page in client.iter_record_pages(app_token, table_id, page_size=page_size, prefetch=prefetch):
+            result.pages += 1
+            result.records += len(page.get("items", []))
+
+    def get_one(result: BenchmarkResult):
+        client.get_record(app_token, table_id, record_ids[len(result.latencies) % len(record_ids)])
+        result.records += 1
+
+    def get_many(result: BenchmarkResult):
+        result.records += len(client.get_records(app_token, table_id, record_ids[:batch_size]))
+
+    created: List[str] = []
+
+    def create(result: BenchmarkResult):
+        rows = [{"文本": f"压测 {i}", "数字": i} for i in range(batch_size)]
+        records = client.batch_create_records(app_token, table_id, rows)["records"]
+        created.extend(record["record_id"] for record in records)
+        result.records += len(records)
+
+    def update(result: BenchmarkResult):
+        rows = [{"record_id": record_id, "fields": {"数字": 0}} for record_id in created[:batch_size]]
+        result.records += len(client.batch_update_records(app_token, table_id, rows)["records"])
+
+    def delete(result: BenchmarkResult):
+        chunk = created[:batch_size]
+        del created[:batch_size]
+        client.batch_delete_records(app_token, table_id, chunk)
+        result.records += len(chunk)
+
+    def tables(result: BenchmarkResult):
+        result.pages += 1
+        result.records += len(client.get_all_tables(app_token, use_cache=False))
+
+    def fields(result: BenchmarkResult):
+        result.pages += 1
+        result.records += len(client.get_all_fields(app_token, table_id, use_cache=False))
+
+    download_dir = tempfile.mkdtemp(prefix="feishu_bench_")
+
+    def download(result: BenchmarkResult):
+        item = {
+            "url": f"{server.url}/open-apis/drive/v1/medias/bench/download",
+            "name": "bench.bin",
+            "size": len(server.attachment)
+        }
+        path = os.path.join(download_dir, f"{len(result.latencies)}.bin")
+        if client.download_attachment(item, path):
+            result.bytes += os.path.getsize(path)
+            os.remove(path)
+
+    bench("get_tenant_access_token", token)
+    bench("search_records", search)
+    bench("iter_record_pages", iterate, times=max(1, iterations // 10))
+    bench("get_record", get_one)
+    bench("get_records", get_many, times=max(1, iterations // 4))
+    bench("batch_create_records", create, times=max(1, iterations // 4))
+    bench("batch_update_records", update, times=max(1, iterations // 4))
+    bench("batch_delete_records", delete, times=max(1, iterations // 4))
+    bench("get_all_tables", tables)
+    bench("get_all_fields", fields)
+    bench("download_attachment", download, times=max(1, iterations // 4))
+
+    small_path = os.path.join(download_dir, "small.bin")
+    large_path = os.path.join(download_dir, "large.bin")
+    with open(small_path, "wb") as f:
+        f.write(server.attachment)
+    with open(large_path, "wb") as f:
+        for _ in range(4):
+            f.write(server.attachment)
+
+    def upload(result: BenchmarkResult):
+        client.upload_attachment(app_token, small_path, multipart_threshold=len(server.attachment))
+        result.bytes += len(server.attachment)
+
+    def upload_multipart(result: BenchmarkResult):
+        client.upload_attachment(app_token, large_path, multipart_threshold=0)
+        result.bytes += 4 * len(server.attachment)
+
+    def upload_many(result: BenchmarkResult):
+        result.records += len(client.upload_field_attachments(app_token, [small_path] * 8))
+        result.bytes += 8 * len(server.attachment)
+
+    bench("upload_attachment", upload, times=max(1, iterations // 4))
+    bench("upload_attachment[multipart]", upload_multipart, times=max(1, iterations // 4))
+    bench("upload_field_attachments", upload_many, times=max(1, iterations // 10))
+    shutil.rmtree(download_dir, ignore_errors=True)
+    return results
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """将压测结果格式化为表格"""
+    header = f"{'method':<30}{'calls':>7}{'rec/s':>12}{'pages/s':>10}{'MB/s':>9}{'p50 ms':>10}{'p99 ms':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['name']:<30}{r['calls']:>7}{r['records_per_sec']:>12.0f}{r['pages_per_sec']:>10.1f}"
+            f"{r['mb_per_sec']:>9.1f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="使用本地模拟服务压测 FeishuBitableClient")
+    parser.add_argument("--records", type=int, default=10000, help="模拟表中的记录数")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的模拟延迟（秒）")
+    parser.add_argument("--max-page-size", type=int, default=500, help="搜索接口单页记录数上限")
+    parser.add_argument("--throttle-every", type=int, default=0, help="每隔多少个请求返回一次频率限制")
+    parser.add_argument("--attachment-mb", type=float, default=4, help="附件大小（MB）")
+    parser.add_argument("--iterations", type=int, default=20, help="单条请求类方法的调用次数")
+    parser.add_argument("--page-size", type=int, default=500, help="分页读取的分页大小")
+    parser.add_argument("--prefetch", type=int, default=2, help="分页读取的预取深度")
+    parser.add_argument("--raw-decode", action="store_true", help="启用 raw_decode 快速解析")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    server = MockBitableServer(
+        records=args.records,
+        latency=args.latency,
+        max_page_size=args.max_page_size,
+        throttle_every=args.throttle_every,
+        attachment_size=int(args.attachment_mb * 1024 * 1024)
+    )
+    # 压测时不限制客户端的请求速率，只测量客户端自身的开销
+    unlimited = {name: 1e6 for name in DEFAULT_RATE_LIMITS}
+    with server:
+        with FeishuBitableClient("bench_app_id", "bench_app_secret", log_level=logging.ERROR,
+                                 rate_limits=unlimited, raw_decode=args.raw_decode, base_url=server.url) as client:
+            results = run_benchmarks(server, client, args.iterations, args.page_size, args.prefetch)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import json
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from feishu_bitable_utils import FeishuBitableClient
+
+
+# 多维表格字段类型到列类型的映射，未列出的类型按 JSON 字符串导出
+FIELD_TYPE_KINDS = {
+    1: "string",       # 多行文本
+    2: "float64",      # 数字
+    3: "string",       # 单选
+    5: "timestamp",    # 日期
+    7: "bool",         # 复选框
+    13: "string",      # 电话号码
+    15: "string",      # 超链接
+    1001: "timestamp", # 创建时间
+    1002: "timestamp", # 最后更新时间
+    1005: "string",    # 自动编号
+}
+
+# 缺失日期在 NumPy 中的取值，对应 NaT
+_NAT = -(2 ** 63)
+
+
+def _import_pyarrow():
+    """按需导入 pyarrow，未安装时给出提示"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("列式导出 Arrow/Parquet 需要安装 pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _import_numpy():
+    """按需导入 numpy，未安装时给出提示"""
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("导出 NumPy 数组需要安装 numpy: pip install numpy") from e
+    return numpy
+
+
+def _to_float(value: Any) -> Optional[float]:
+    value = FeishuBitableClient._normalize_value(value)
+    try:
+        return float(value) if value is not None and value != "" else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_timestamp(value: Any) -> Optional[int]:
+    value = FeishuBitableClient._normalize_value(value)
+    try:
+        return int(value) if value is not None and value != "" else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_bool(value: Any) -> Optional[bool]:
+    return bool(value) if value is not None else None
+
+
+def _to_string(value: Any) -> Optional[str]:
+    value = FeishuBitableClient._normalize_value(value)
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _to_json(value: Any) -> Optional[str]:
+    return json.dumps(value, ensure_ascii=False) if value is not None else None
+
+
+_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "float64": _to_float,
+    "timestamp": _to_timestamp,
+    "bool": _to_bool,
+    "string": _to_string,
+    "json": _to_json,
+}
+
+
+class ColumnarExporter:
+    """
+    多维表格的列式导出工具
+
+    根据 get_all_fields 返回的字段类型确定每列的类型，边分页读取边转换为列，
+    直接写出 Arrow 记录批或 Parquet 文件，或将数字、日期、复选框列汇总为 NumPy 数组。
+    内存中只保留当前页和类型化的列缓冲，峰值内存远低于记录字典列表
+    """
+
+    def __init__(self,
+                 client: FeishuBitableClient,
+                 app_token: str,
+                 table_id: str,
+                 view_id: Optional[str] = None,
+                 field_names: Optional[List[str]] = None,
+                 filter_: Optional[str] = None,
+                 page_size: int = 500,
+                 prefetch: int = 2,
+                 fields: Optional[List[Dict[str, Any]]] = None):
+        """
+        初始化列式导出
+
+        Args:
+            client: 飞书多维表格客户端
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            view_id: 视图 ID
+            field_names: 需要导出的字段名列表，默认导出全部字段
+            filter_: 过滤条件
+            page_size: 分页大小
+            prefetch: 分页预取深度
+            fields: 已获取的字段列表（get_all_fields 的返回值），为空时在首次使用时获取
+        """
+        self.client = client
+        self.app_token = app_token
+        self.table_id = table_id
+        self.view_id = view_id
+        self.field_names = field_names
+        self.filter_ = filter_
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.fields = fields
+        self._columns: Optional[List[Tuple[str, str]]] = None
+
+    def columns(self) -> List[Tuple[str, str]]:
+        """
+        获取导出的列及其类型
+
+        Returns:
+            [(字段名, 列类型)]，列类型为 float64、timestamp、bool、string、json 之一
+        """
+        if self._columns is None:
+            fields = self.fields
+            if fields is None:
+                fields = self.client.get_all_fields(self.app_token, self.table_id, self.view_id)
+            kinds = {field["field_name"]: FIELD_TYPE_KINDS.get(field["type"], "json") for field in fields}
+            names = self.field_names or [field["field_name"] for field in fields]
+            self._columns = [(name, kinds.get(name, "json")) for name in names]
+        return self._columns
+
+    def iter_column_pages(self) -> Iterator[Dict[str, List[Any]]]:
+        """
+        逐页读取并转换为列
+
+        Yields:
+            {列名: 值列表}，包含 record_id 列，缺失值为 None
+        """
+        columns = self.columns()
+        for page in self.client.iter_record_pages(
+            app_token=self.app_token,
+            table_id=self.table_id,
+            view_id=self.view_id,
+            field_names=[name for name, _ in columns],
+            filter_=self.filter_,
+            page_size=self.page_size,
+            prefetch=self.prefetch
+        ):
+            items = page.get("items", [])
+            data = {"record_id": [item["record_id"] for item in items]}
+            for name, kind in columns:
+                convert = _CONVERTERS[kind]
+                data[name] = [convert((item.get("fields") or {}).get(name)) for item in items]
+            yield data
+
+    def arrow_schema(self):
+        """构建 Arrow schema，日期列为毫秒精度的 timestamp"""
+        pa = _import_pyarrow()
+        types = {
+            "float64": pa.float64(),
+            "timestamp": pa.timestamp("ms"),
+            "bool": pa.bool_(),
+            "string": pa.string(),
+            "json": pa.string(),
+        }
+        return pa.schema(
+            [pa.field("record_id", pa.string())] +
+            [pa.field(name, types[kind]) for name, kind in self.columns()]
+        )
+
+    def iter_record_batches(self) -> Iterator[Any]:
+        """
+        逐页产出 Arrow 记录批
+
+        Yields:
+            pyarrow.RecordBatch
+        """
+        pa = _import_pyarrow()
+        schema = self.arrow_schema()
+        for data in self.iter_column_pages():
+            arrays = [pa.array(data[field.name], type=field.type) for field in schema]
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def to_arrow(self):
+        """
+        导出为 Arrow 表
+
+        Returns:
+            pyarrow.Table
+        """
+        pa = _import_pyarrow()
+        return pa.Table.from_batches(list(self.iter_record_batches()), schema=self.arrow_schema())
+
+    def to_parquet(self, path: str, compression: str = "zstd") -> int:
+        """
+        边读取边写出 Parquet 文件，每页一个行组
+
+        Args:
+            path: 输出文件路径
+            compression: 压缩算法
+
+        Returns:
+            写出的行数
+        """
+        pa = _import_pyarrow()
+        rows = 0
+        with pa.parquet.ParquetWriter(path, self.arrow_schema(), compression=compression) as writer:
+            for batch in self.iter_record_batches():
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        return rows
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        将数字、日期和复选框列导出为 NumPy 数组
+
+        各列先累积到 array 模块的类型化缓冲中，读取完成后零拷贝转为 NumPy 数组。
+        数字缺失值为 NaN，日期缺失值为 NaT，复选框缺失值为 False
+
+        Returns:
+            {列名: numpy.ndarray}，日期列为 datetime64[ms]
+        """
+        np = _import_numpy()
+        typecodes = {"float64": "d", "timestamp": "q", "bool": "b"}
+        missing = {"float64": float("nan"), "timestamp": _NAT, "bool": 0}
+        numeric = [(name, kind) for name, kind in self.columns() if kind in typecodes]
+        buffers = {name: array(typecodes[kind]) for name, kind in numeric}
+
+        for data in self.iter_column_pages():
+            for name, kind in numeric:
+                default = missing[kind]
+                buffers[name].extend(default if value is None else value for value in data[name])
+
+        result = {}
+        for name, kind in numeric:
+            if kind == "float64":
+                result[name] = np.frombuffer(buffers[name], dtype=np.float64)
+            elif kind == "timestamp":
+                result[name] = np.frombuffer(buffers[name], dtype=np.int64).view("datetime64[ms]")
+            else:
+                result[name] = np.frombuffer(buffers[name], dtype=np.int8).astype(np.bool_)
+        return result
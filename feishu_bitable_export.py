@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from feishu_bitable_utils import FeishuBitableClient
+
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _write_jsonl(client: FeishuBitableClient,
+                 app_token: str,
+                 table_id: str,
+                 path: str,
+                 fields: List[Dict[str, Any]],
+                 page_size: int,
+                 prefetch: int) -> int:
+    """逐页将表中记录写入 JSONL 文件，每行一条记录，返回写出的行数"""
+    rows = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for page in client.iter_record_pages(
+            app_token=app_token,
+            table_id=table_id,
+            page_size=page_size,
+            prefetch=prefetch
+        ):
+            for record in page.get("items", []):
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+            rows += len(page.get("items", []))
+    return rows
+
+
+def _write_parquet(client: FeishuBitableClient,
+                   app_token: str,
+                   table_id: str,
+                   path: str,
+                   fields: List[Dict[str, Any]],
+                   page_size: int,
+                   prefetch: int) -> int:
+    """通过列式导出将表写入 Parquet 文件，列类型由已获取的字段列表推断，返回写出的行数"""
+    from feishu_bitable_columnar import ColumnarExporter
+
+    exporter = ColumnarExporter(
+        client, app_token, table_id, page_size=page_size, prefetch=prefetch, fields=fields
+    )
+    return exporter.to_parquet(path)
+
+
+_WRITERS = {
+    "jsonl": _write_jsonl,
+    "parquet": _write_parquet,
+}
+
+
+def export_base(client: FeishuBitableClient,
+                app_token: str,
+                out_dir: str,
+                output_format: str = "jsonl",
+                table_ids: Optional[List[str]] = None,
+                max_workers: int = 4,
+                page_size: int = 500,
+                prefetch: int = 1) -> Dict[str, Any]:
+    """
+    导出整个多维表格的所有数据表
+
+    各数据表在有界线程池中并发导出，每张表逐页写入各自的文件，内存中只保留当前页。
+    所有线程共用同一个客户端，因此共享其限流器和连接池，并发数再高也不会超过限流配额。
+    导出完成后写入 manifest.json，记录每张表的 revision、字段、行数和文件名
+
+    单张表导出失败不会中断其他表，失败信息记录在清单的 error 中
+
+    Args:
+        client: 飞书多维表格客户端
+        app_token: 多维表格的 app_token
+        out_dir: 输出目录
+        output_format: 输出格式，jsonl 或 parquet（需要安装 pyarrow）
+        table_ids: 只导出指定的数据表，默认导出全部
+        max_workers: 并发导出的数据表数
+        page_size: 分页大小
+        prefetch: 每张表的分页预取深度
+
+    Returns:
+        导出清单，与写入的 manifest.json 内容一致
+    """
+    if output_format not in _WRITERS:
+        raise ValueError(f"不支持的导出格式: {output_format}，可选 {', '.join(_WRITERS)}")
+
+    logger = logging.getLogger("FeishuBitableClient")
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.monotonic()
+
+    tables = client.get_all_tables(app_token, use_cache=False)
+    if table_ids is not None:
+        tables = [table for table in tables if table["table_id"] in table_ids]
+
+    write = _WRITERS[output_format]
+
+    def export_table(table: Dict[str, Any]) -> Dict[str, Any]:
+        table_id = table["table_id"]
+        file_name = f"{table_id}.{output_format}"
+        path = os.path.join(out_dir, file_name)
+        entry = {
+            "table_id": table_id,
+            "name": table.get("name"),
+            "revision": table.get("revision"),
+            "file": file_name,
+            "rows": 0,
+            "fields": [],
+            "error": None,
+        }
+        table_start = time.monotonic()
+        temp_path = path + ".part"
+        try:
+            fields = client.get_all_fields(app_token, table_id)
+            entry["fields"] = [{"field_name": field["field_name"], "type": field["type"]} for field in fields]
+            entry["rows"] = write(client, app_token, table_id, temp_path, fields, page_size, prefetch)
+            os.replace(temp_path, path)
+        except Exception as e:
+            entry["error"] = str(e)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            logger.error(f"导出数据表失败: {table_id}, {e}")
+        entry["elapsed"] = time.monotonic() - table_start
+        return entry
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tables) or 1))) as pool:
+        entries = list(pool.map(export_table, tables))
+
+    manifest = {
+        "app_token": app_token,
+        "format": output_format,
+        "exported_at": int(time.time()),
+        "elapsed": time.monotonic() - start,
+        "total_rows": sum(entry["rows"] for entry in entries),
+        "failed": [entry["table_id"] for entry in entries if entry["error"]],
+        "tables": entries,
+    }
+
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(manifest_path + ".part", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(manifest_path + ".part", manifest_path)
+
+    logger.info(
+        f"导出完成: {len(entries)} 张表, {manifest['total_rows']} 条记录, "
+        f"失败 {len(manifest['failed'])} 张, 耗时 {manifest['elapsed']:.2f}s"
+    )
+    return manifest
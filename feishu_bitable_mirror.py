@@ -0,0 +1,277 @@
+import json
+import logging
+import sqlite3
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from feishu_bitable_utils import FeishuBitableClient
+
+
+class BitableMirror:
+    """
+    多维表格的本地 SQLite 镜像
+
+    首次同步全量拉取整张表，之后只按"最后更新时间"字段拉取水位线之后变更的记录；
+    删除的记录通过定期比对全部 record_id 识别。下游可以直接查询本地镜像，
+    同步开销随变更量而不是表的大小增长
+
+    表中需要有一个"最后更新时间"类型的字段（字段类型 1002），其名称通过 modified_field 指定
+    """
+
+    def __init__(self,
+                 client: FeishuBitableClient,
+                 app_token: str,
+                 table_id: str,
+                 db_path: str,
+                 modified_field: str = "最后更新时间",
+                 view_id: Optional[str] = None,
+                 page_size: int = 500,
+                 prefetch: int = 2,
+                 overlap_ms: int = 24 * 3600 * 1000,
+                 reconcile_interval: float = 24 * 3600):
+        """
+        初始化本地镜像
+
+        Args:
+            client: 飞书多维表格客户端
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            db_path: SQLite 数据库文件路径
+            modified_field: "最后更新时间"字段的名称
+            view_id: 视图 ID
+            page_size: 同步时的分页大小
+            prefetch: 同步时的分页预取深度
+            overlap_ms: 增量同步时水位线向前回退的毫秒数。日期过滤按天比较，
+                回退一天可以避免漏掉与水位线同一天内更新的记录，重复拉取的记录按 record_id 覆盖
+            reconcile_interval: 比对删除记录的间隔（秒）
+        """
+        self.client = client
+        self.app_token = app_token
+        self.table_id = table_id
+        self.modified_field = modified_field
+        self.view_id = view_id
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.overlap_ms = overlap_ms
+        self.reconcile_interval = reconcile_interval
+        self.logger = logging.getLogger("FeishuBitableClient")
+
+        self.db = sqlite3.connect(db_path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "record_id TEXT PRIMARY KEY, fields TEXT NOT NULL, modified_time INTEGER, synced_at REAL)"
+        )
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.db.commit()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: Any):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    @property
+    def watermark(self) -> Optional[int]:
+        """已同步记录中最大的最后更新时间（毫秒时间戳）"""
+        value = self._get_meta("watermark")
+        return int(value) if value is not None else None
+
+    def _modified_time(self, record: Dict[str, Any]) -> Optional[int]:
+        value = record.get("fields", {}).get(self.modified_field)
+        try:
+            return int(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def _upsert_page(self, items: List[Dict[str, Any]]) -> Optional[int]:
+        """写入一页记录，返回本页最大的最后更新时间"""
+        now = time.time()
+        rows = []
+        max_modified = None
+        for record in items:
+            modified = self._modified_time(record)
+            if modified is not None and (max_modified is None or modified > max_modified):
+                max_modified = modified
+            rows.append((record["record_id"], json.dumps(record.get("fields", {}), ensure_ascii=False), modified, now))
+        self.db.executemany(
+            "INSERT OR REPLACE INTO records (record_id, fields, modified_time, synced_at) VALUES (?, ?, ?, ?)",
+            rows
+        )
+        return max_modified
+
+    def _advance_watermark(self, modified: Optional[int]):
+        current = self.watermark
+        if modified is not None and (current is None or modified > current):
+            self._set_meta("watermark", modified)
+
+    def sync(self, full: bool = False) -> Dict[str, Any]:
+        """
+        同步镜像：首次或指定 full 时全量同步，否则增量同步，并按间隔比对删除记录
+
+        Args:
+            full: 是否强制全量同步
+
+        Returns:
+            同步报告，包含 mode、upserted、deleted、elapsed
+        """
+        start = time.monotonic()
+        if full or self.watermark is None:
+            report = self.full_load()
+        else:
+            report = self.delta_sync()
+            last_reconcile = float(self._get_meta("last_reconcile") or 0)
+            if time.time() - last_reconcile >= self.reconcile_interval:
+                report["deleted"] = self.reconcile()["deleted"]
+        report["elapsed"] = time.monotonic() - start
+        return report
+
+    def full_load(self) -> Dict[str, Any]:
+        """
+        全量同步整张表，并删除本地多余的记录
+
+        整个全量同步在一个事务中完成，水位线在最后一页写入后才更新。
+        中途失败时回滚，未完成的全量同步不会被当作已完成，下次同步仍走全量
+
+        Returns:
+            同步报告
+        """
+        self.db.execute("CREATE TEMP TABLE IF NOT EXISTS seen (record_id TEXT PRIMARY KEY)")
+        self.db.execute("DELETE FROM seen")
+
+        upserted = 0
+        max_modified = None
+        try:
+            for page in self.client.iter_record_pages(
+                app_token=self.app_token,
+                table_id=self.table_id,
+                view_id=self.view_id,
+                page_size=self.page_size,
+                prefetch=self.prefetch
+            ):
+                items = page.get("items", [])
+                modified = self._upsert_page(items)
+                if modified is not None and (max_modified is None or modified > max_modified):
+                    max_modified = modified
+                self.db.executemany("INSERT OR IGNORE INTO seen (record_id) VALUES (?)", [(r["record_id"],) for r in items])
+                upserted += len(items)
+
+            deleted = self.db.execute("DELETE FROM records WHERE record_id NOT IN (SELECT record_id FROM seen)").rowcount
+            self.db.execute("DELETE FROM seen")
+            self._advance_watermark(max_modified)
+            self._set_meta("last_reconcile", time.time())
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+
+        self.logger.info(f"镜像全量同步完成: {self.table_id}, 写入 {upserted} 条, 删除 {deleted} 条")
+        return {"mode": "full", "upserted": upserted, "deleted": deleted}
+
+    def delta_sync(self) -> Dict[str, Any]:
+        """
+        增量同步水位线之后变更的记录
+
+        按最后更新时间升序拉取，每页写入后立即推进水位线，中断后可从断点继续
+
+        Returns:
+            同步报告
+        """
+        since = max(0, (self.watermark or 0) - self.overlap_ms)
+        filter_ = {
+            "conjunction": "and",
+            "conditions": [{
+                "field_name": self.modified_field,
+                "operator": "isGreater",
+                "value": ["ExactDate", str(since)]
+            }]
+        }
+        sort = [{"field_name": self.modified_field, "desc": False}]
+
+        upserted = 0
+        for page in self.client.iter_record_pages(
+            app_token=self.app_token,
+            table_id=self.table_id,
+            view_id=self.view_id,
+            filter_=filter_,
+            sort=sort,
+            page_size=self.page_size,
+            prefetch=self.prefetch
+        ):
+            items = page.get("items", [])
+            self._advance_watermark(self._upsert_page(items))
+            self.db.commit()
+            upserted += len(items)
+
+        self.logger.info(f"镜像增量同步完成: {self.table_id}, 写入 {upserted} 条")
+        return {"mode": "delta", "upserted": upserted, "deleted": 0}
+
+    def reconcile(self) -> Dict[str, Any]:
+        """
+        比对线上全部 record_id，删除本地已不存在的记录
+
+        只请求最后更新时间一个字段，数据量远小于全量同步
+
+        Returns:
+            比对报告，包含 deleted
+        """
+        self.db.execute("CREATE TEMP TABLE IF NOT EXISTS seen (record_id TEXT PRIMARY KEY)")
+        self.db.execute("DELETE FROM seen")
+
+        for page in self.client.iter_record_pages(
+            app_token=self.app_token,
+            table_id=self.table_id,
+            view_id=self.view_id,
+            field_names=[self.modified_field],
+            page_size=self.page_size,
+            prefetch=self.prefetch
+        ):
+            self.db.executemany(
+                "INSERT OR IGNORE INTO seen (record_id) VALUES (?)",
+                [(r["record_id"],) for r in page.get("items", [])]
+            )
+
+        deleted = self.db.execute("DELETE FROM records WHERE record_id NOT IN (SELECT record_id FROM seen)").rowcount
+        self.db.execute("DELETE FROM seen")
+        self._set_meta("last_reconcile", time.time())
+        self.db.commit()
+
+        if deleted:
+            self.logger.info(f"镜像比对完成: {self.table_id}, 删除 {deleted} 条")
+        return {"deleted": deleted}
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """
+        从本地镜像读取单条记录
+
+        Returns:
+            {"record_id", "fields"} 格式的记录，不存在时返回 None
+        """
+        row = self.db.execute("SELECT record_id, fields FROM records WHERE record_id = ?", (record_id,)).fetchone()
+        if not row:
+            return None
+        return {"record_id": row[0], "fields": json.loads(row[1])}
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """
+        逐条读取本地镜像中的全部记录
+
+        Yields:
+            {"record_id", "fields"} 格式的记录
+        """
+        for record_id, fields in self.db.execute("SELECT record_id, fields FROM records ORDER BY record_id"):
+            yield {"record_id": record_id, "fields": json.loads(fields)}
+
+    def count(self) -> int:
+        """本地镜像中的记录数"""
+        return self.db.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        self.db.close()
+
+    def __enter__(self) -> "BitableMirror":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
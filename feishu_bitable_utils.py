@@ -1,48 +1,1473 @@
+from __future__ import annotations
+
+import copy
 import json
 import logging
 import os
+import queue
+import random
 import requests
+import shutil
+import threading
 import time
-from typing import Dict, List, Any, Optional, Union
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Any, Optional, Tuple
+
+# lark_oapi 导入开销较大，只在首次调用 SDK 接口时按需导入，仅下载附件等场景不会加载 SDK
+if TYPE_CHECKING:
+    import lark_oapi as lark
+    from lark_oapi.api.bitable.v1 import *
+
+# 可选的高性能 JSON 解析器，未安装时回退到标准库
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+# 多维表格批量接口单次请求的记录数上限
+BATCH_RECORD_LIMIT = 500
+
+# 飞书和 Lark 国际版开放平台的域名
+FEISHU_DOMAIN = "https://open.feishu.cn"
+LARK_DOMAIN = "https://open.larksuite.com"
+
+# 批量获取记录接口单次请求的记录数上限
+BATCH_GET_LIMIT = 100
+
+# 附件下载每次写入磁盘的块大小
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# 超过该字节数的附件使用分片上传，不超过的一次上传（一次上传接口上限为 20MB）
+MULTIPART_UPLOAD_THRESHOLD = 4 * 1024 * 1024
+
+# 表示触发频率限制、可以退避重试的错误码
+RATE_LIMIT_CODES = {
+    99991400,  # 应用或租户请求频率超限
+    1254290,   # 多维表格请求过快
+    1254291,   # 多维表格并发写冲突
+}
+
+# 表示 tenant_access_token 无效、需要刷新后重试的错误码
+TOKEN_INVALID_CODES = {
+    99991661,  # 缺少访问凭证
+    99991663,  # 访问凭证无效
+    99991668,  # 访问凭证已过期
+}
+
+# 失败响应体的记录方式：pretty 格式化输出完整响应，compact 输出截断的原始响应，none 不输出
+ERROR_PAYLOAD_MODES = ("pretty", "compact", "none")
+
+# compact 模式下输出的响应体最大字节数
+ERROR_PAYLOAD_LIMIT = 2048
+
+# 各类接口默认的每秒请求数预算
+DEFAULT_RATE_LIMITS = {
+    "search": 20,
+    "write": 10,
+    "download": 10,
+    "upload": 5,
+    "auth": 5,
+}
+
+
+def _backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """
+    计算带随机抖动的指数退避时间
+    
+    Args:
+        attempt: 已重试次数，从 0 开始
+        base: 首次退避的基准秒数
+        cap: 退避时间上限
+        
+    Returns:
+        需要等待的秒数
+    """
+    delay = min(cap, base * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _retry_after(headers: Optional[Dict[str, str]]) -> float:
+    """从响应头中读取服务端建议的等待秒数，没有时返回 0"""
+    if not headers:
+        return 0.0
+    for name in ("x-ogw-ratelimit-reset", "Retry-After"):
+        value = headers.get(name) or headers.get(name.lower())
+        if value:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                continue
+    return 0.0
+
+
+class BatchOperationError(Exception):
+    """
+    批量操作中有分块失败时抛出
+    
+    result 中保留成功分块合并后的结果以及每个分块的执行报告
+    """
+    
+    def __init__(self, message: str, result: Dict[str, Any]):
+        super().__init__(message)
+        self.result = result
+
+
+class TenantAccessTokenManager:
+    """
+    tenant_access_token 缓存管理器
+    
+    按接口返回的 expire 缓存令牌，在过期前 refresh_ahead 秒内提前刷新。
+    刷新采用单飞锁：同一时刻只有一个线程请求新令牌，其余线程
+    在令牌仍有效时直接使用旧令牌，令牌已失效时等待刷新结果。
+    """
+    
+    def __init__(self, fetcher: Callable[[], Tuple[str, int]], refresh_ahead: float = 300):
+        """
+        初始化令牌管理器
+        
+        Args:
+            fetcher: 获取新令牌的函数，返回 (token, expire秒数)，失败时返回空 token
+            refresh_ahead: 距过期多少秒时开始提前刷新
+        """
+        self._fetcher = fetcher
+        self._refresh_ahead = refresh_ahead
+        self._lock = threading.Lock()
+        self._token = ""
+        self._expires_at = 0.0
+        
+        # 统计计数，快速路径不持有刷新锁，计数单独加锁
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.failures = 0
+    
+    def get_token(self, force_refresh: bool = False) -> str:
+        """
+        获取令牌，优先使用缓存
+        
+        Args:
+            force_refresh: 是否忽略缓存强制刷新
+            
+        Returns:
+            tenant_access_token，获取失败时返回空字符串
+        """
+        now = time.monotonic()
+        token, expires_at = self._token, self._expires_at
+        
+        if not force_refresh and token and now < expires_at:
+            if now < expires_at - self._refresh_ahead:
+                self._count("hits")
+                return token
+            # 进入提前刷新窗口：抢到锁的线程负责刷新，其余线程继续使用旧令牌
+            if not self._lock.acquire(blocking=False):
+                self._count("hits")
+                return token
+            try:
+                return self._refresh_locked(force_refresh=False)
+            finally:
+                self._lock.release()
+        
+        with self._lock:
+            return self._refresh_locked(force_refresh)
+    
+    def _count(self, name: str):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+    
+    def _refresh_locked(self, force_refresh: bool) -> str:
+        """在持有锁的情况下刷新令牌，已被其他线程刷新过则直接返回"""
+        now = time.monotonic()
+        if not force_refresh and self._token and now < self._expires_at - self._refresh_ahead:
+            self._count("hits")
+            return self._token
+        
+        self._count("misses")
+        token, expire = self._fetcher()
+        if not token:
+            self._count("failures")
+            # 刷新失败时，旧令牌只要未过期仍可继续使用
+            if self._token and now < self._expires_at:
+                return self._token
+            return ""
+        
+        self._count("refreshes")
+        self._token = token
+        self._expires_at = time.monotonic() + max(int(expire), 0)
+        return token
+    
+    def invalidate(self):
+        """使缓存的令牌失效，下次获取时重新请求"""
+        with self._lock:
+            self._token = ""
+            self._expires_at = 0.0
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计
+        
+        Returns:
+            包含 hits、misses、refreshes、failures 的字典
+        """
+        with self._stats_lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "failures": self.failures
+            }
+
+
+class RateLimiter:
+    """
+    线程安全的自适应令牌桶限流器
+    
+    以 rate 的速率补充令牌，最多积攒 burst 个，令牌不足时调用方需等待。
+    遇到限流时速率减半（不低于 min_rate），之后每次成功请求按 increase 缓慢回升到 max_rate
+    """
+    
+    def __init__(self, 
+                 rate: float, 
+                 burst: Optional[int] = None,
+                 min_rate: Optional[float] = None,
+                 max_rate: Optional[float] = None,
+                 increase: float = 0.1):
+        """
+        初始化限流器
+        
+        Args:
+            rate: 每秒允许的请求数
+            burst: 允许的突发请求数，默认与 rate 相同
+            min_rate: 限流后速率的下限，默认为 rate 的 1/10
+            max_rate: 速率回升的上限，默认为 rate
+            increase: 每次成功请求后速率的增量
+        """
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1, int(rate))
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.increase = increase
+        self.throttled = 0
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """
+        预占一个令牌
+        
+        Returns:
+            调用方需要等待的秒数，为 0 表示可以立即请求
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def acquire(self):
+        """获取一个令牌，不足时阻塞等待"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+    
+    def on_throttle(self):
+        """收到限流响应时降低速率，并清空已积攒的令牌"""
+        with self._lock:
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+    
+    def on_success(self):
+        """请求成功时缓慢提高速率"""
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+
+class ClientMetrics:
+    """
+    线程安全的客户端指标收集器
+    
+    按接口类别和操作记录请求数、耗时直方图、响应字节数、限流次数、错误、分页深度和附件下载吞吐，
+    可通过 to_prometheus 导出为 Prometheus 文本格式。add_hook 注册的回调会收到每个原始事件，
+    可用于对接 OpenTelemetry 等追踪系统。客户端未配置 metrics 时不会产生任何额外开销
+    """
+    
+    # 请求耗时直方图的默认分桶（秒）
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    # 分页深度直方图的分桶（页数）
+    PAGE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+    # 下载耗时直方图的分桶（秒）
+    DOWNLOAD_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+    
+    def __init__(self, namespace: str = "feishu_bitable", latency_buckets: Optional[Tuple[float, ...]] = None):
+        """
+        初始化指标收集器
+        
+        Args:
+            namespace: 导出指标名的前缀
+            latency_buckets: 请求耗时直方图的分桶，默认使用 LATENCY_BUCKETS
+        """
+        self.namespace = namespace
+        self._buckets = {
+            "request_duration_seconds": tuple(latency_buckets or self.LATENCY_BUCKETS),
+            "pagination_pages": self.PAGE_BUCKETS,
+            "download_duration_seconds": self.DOWNLOAD_BUCKETS,
+        }
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], List[Any]] = {}
+        self._hooks: List[Callable[[str, Dict[str, str], float], None]] = []
+        self._lock = threading.Lock()
+    
+    def add_hook(self, hook: Callable[[str, Dict[str, str], float], None]):
+        """
+        注册事件回调
+        
+        Args:
+            hook: 回调函数，参数为 (事件名, 标签, 数值)。事件名包括 request、throttle、error、
+                pages、download，error 事件的标签中带有 code 和 log_id
+        """
+        self._hooks.append(hook)
+    
+    def _inc(self, name: str, labels: Dict[str, str], value: float = 1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def _observe(self, name: str, labels: Dict[str, str], value: float):
+        key = (name, tuple(sorted(labels.items())))
+        buckets = self._buckets[name]
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [[0] * len(buckets), 0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+    
+    def _emit(self, event: str, labels: Dict[str, str], value: float):
+        for hook in self._hooks:
+            try:
+                hook(event, labels, value)
+            except Exception:
+                logging.getLogger("FeishuBitableClient").exception(f"指标回调异常: {event}")
+    
+    def observe_request(self, endpoint: str, operation: str, seconds: float, status: str, nbytes: int = 0):
+        """
+        记录一次接口请求
+        
+        Args:
+            endpoint: 接口类别，如 search、write、download
+            operation: 具体操作，如 records.search、tables.list、tenant_access_token
+            seconds: 请求耗时
+            status: ok、error 或 throttled
+            nbytes: 响应体字节数
+        """
+        labels = {"endpoint": endpoint, "operation": operation}
+        self._inc("requests_total", dict(labels, status=status))
+        self._observe("request_duration_seconds", labels, seconds)
+        if nbytes:
+            self._inc("response_bytes_total", labels, nbytes)
+        if status == "throttled":
+            self._inc("throttled_total", labels)
+        if self._hooks:
+            self._emit("request", dict(labels, status=status, bytes=str(nbytes)), seconds)
+            if status == "throttled":
+                self._emit("throttle", labels, 1)
+    
+    def observe_error(self, endpoint: str, operation: str, code: Any, log_id: Optional[str] = None):
+        """记录一次失败的接口调用，log_id 只传给回调，不作为指标标签"""
+        labels = {"endpoint": endpoint, "operation": operation, "code": str(code)}
+        self._inc("errors_total", labels)
+        if self._hooks:
+            self._emit("error", dict(labels, log_id=log_id or ""), 1)
+    
+    def observe_pages(self, operation: str, pages: int):
+        """记录一次分页遍历的页数"""
+        self._observe("pagination_pages", {"operation": operation}, pages)
+        if self._hooks:
+            self._emit("pages", {"operation": operation}, pages)
+    
+    def observe_download(self, nbytes: int, seconds: float):
+        """记录一次完成的附件下载"""
+        self._inc("download_files_total", {})
+        self._inc("download_bytes_total", {}, nbytes)
+        self._observe("download_duration_seconds", {}, seconds)
+        if self._hooks:
+            self._emit("download", {"bytes": str(nbytes)}, seconds)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取当前指标的快照
+        
+        Returns:
+            {"counters": {(指标名, 标签): 数值}, "histograms": {(指标名, 标签): {"buckets", "sum", "count"}}}
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                key: {
+                    "buckets": dict(zip(self._buckets[key[0]], entry[0])),
+                    "sum": entry[1],
+                    "count": entry[2]
+                }
+                for key, entry in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+    
+    def _format_labels(self, labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        items = list(labels) + ([extra] if extra else [])
+        if not items:
+            return ""
+        escaped = [(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in items]
+        return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+    
+    @staticmethod
+    def _format_value(value: float) -> str:
+        """精确输出计数值，整数不带小数部分，避免科学计数法丢失精度"""
+        if float(value).is_integer():
+            return str(int(value))
+        return repr(float(value))
+    
+    def to_prometheus(self) -> str:
+        """
+        导出为 Prometheus 文本格式
+        
+        Returns:
+            可直接作为 /metrics 响应体的文本
+        """
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+        
+        for (name, labels), value in sorted(snapshot["counters"].items()):
+            full_name = f"{self.namespace}_{name}"
+            if full_name not in typed:
+                lines.append(f"# TYPE {full_name} counter")
+                typed.add(full_name)
+            lines.append(f"{full_name}{self._format_labels(labels)} {self._format_value(value)}")
+        
+        for (name, labels), entry in sorted(snapshot["histograms"].items()):
+            full_name = f"{self.namespace}_{name}"
+            if full_name not in typed:
+                lines.append(f"# TYPE {full_name} histogram")
+                typed.add(full_name)
+            for bound, count in entry["buckets"].items():
+                lines.append(f"{full_name}_bucket{self._format_labels(labels, ('le', f'{bound:g}'))} {count}")
+            lines.append(f"{full_name}_bucket{self._format_labels(labels, ('le', '+Inf'))} {entry['count']}")
+            lines.append(f"{full_name}_sum{self._format_labels(labels)} {repr(float(entry['sum']))}")
+            lines.append(f"{full_name}_count{self._format_labels(labels)} {entry['count']}")
+        
+        return "\n".join(lines) + "\n"
+
+
+class AttachmentCache:
+    """
+    按 file_token 寻址的本地附件缓存
+    
+    附件内容由 file_token 唯一确定，缓存命中时直接复制到目标路径，无需再次下载。
+    缓存文件与目标文件互不共享，修改下载得到的文件不会影响缓存。缓存总大小超过
+    max_bytes 时按最近使用时间淘汰
+    """
+    
+    def __init__(self, cache_dir: str, max_bytes: int = 10 * 1024 ** 3):
+        """
+        初始化附件缓存
+        
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限（字节），默认 10 GB
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path, _ in self._entries())
+        
+        # 统计计数
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def _path(self, file_token: str) -> str:
+        """缓存文件路径，按 token 前两位分目录避免单个目录文件过多"""
+        safe_token = "".join(c for c in file_token if c.isalnum() or c in "-_")
+        return os.path.join(self.cache_dir, safe_token[:2], safe_token)
+    
+    def _entries(self) -> List[Tuple[str, float]]:
+        """列出所有缓存文件及其最近使用时间"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    entries.append((path, os.path.getmtime(path)))
+                except OSError:
+                    continue
+        return entries
+    
+    def get(self, file_token: str, expected_size: Optional[int] = None) -> Optional[str]:
+        """
+        查找缓存文件
+        
+        Args:
+            file_token: 附件的 file_token
+            expected_size: 附件大小，缓存文件大小不一致时视为未命中
+            
+        Returns:
+            缓存文件路径，未命中时返回 None
+        """
+        path = self._path(file_token)
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                self.misses += 1
+                return None
+            if expected_size is not None and size != expected_size:
+                self.misses += 1
+                return None
+            
+            # 以缓存文件的修改时间记录最近使用时间，供 LRU 淘汰使用
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self.hits += 1
+        return path
+    
+    def materialize(self, file_token: str, dest_path: str, expected_size: Optional[int] = None) -> bool:
+        """
+        将缓存文件放到目标路径
+        
+        Args:
+            file_token: 附件的 file_token
+            dest_path: 目标路径
+            expected_size: 附件大小，用于校验缓存文件
+            
+        Returns:
+            是否命中缓存
+        """
+        path = self.get(file_token, expected_size)
+        if not path:
+            return False
+        
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        try:
+            shutil.copyfile(path, dest_path)
+        except FileNotFoundError:
+            # 命中后、复制前被其他线程淘汰
+            return False
+        return True
+    
+    def put(self, file_token: str, src_path: str):
+        """
+        将已下载的文件加入缓存
+        
+        Args:
+            file_token: 附件的 file_token
+            src_path: 已下载文件的路径
+        """
+        path = self._path(file_token)
+        if os.path.exists(path):
+            return
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        shutil.copyfile(src_path, tmp_path)
+        
+        with self._lock:
+            if os.path.exists(path):
+                os.remove(tmp_path)
+                return
+            os.replace(tmp_path, path)
+            self._size += os.path.getsize(path)
+            if self._size > self.max_bytes:
+                self._evict()
+    
+    def _evict(self):
+        """按最近使用时间从旧到新淘汰，直到总大小降到上限的 90%"""
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        self._size = sum(os.path.getsize(path) for path, _ in entries)
+        target = self.max_bytes * 0.9
+        for path, _ in entries:
+            if self._size <= target:
+                break
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= size
+            self.evictions += 1
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计
+        
+        Returns:
+            包含 hits、misses、evictions、bytes 的字典
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes": self._size
+            }
+
+
+class SchemaCache:
+    """
+    数据表和字段结构缓存
+    
+    按 app_token 缓存数据表列表，按 app_token/table_id/view_id 缓存字段列表。
+    字段缓存记录所属数据表的 revision，数据表列表刷新后 revision 变化的字段缓存随即失效。
+    未设置 ttl 时，字段缓存一直有效，直到重新获取的数据表列表中 revision 发生变化；
+    设置 ttl 时，未过期的缓存无需任何请求即可使用。指定 path 时缓存持久化为 JSON 文件。
+    读取接口返回缓存的副本，调用方修改返回值不会影响缓存
+    """
+    
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None):
+        """
+        初始化结构缓存
+        
+        Args:
+            path: 持久化文件路径，为空时只缓存在内存中
+            ttl: 缓存有效期（秒），为空时字段缓存按最近一次获取的数据表 revision 校验
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Dict[str, Any]] = {}
+        self._fields: Dict[str, Dict[str, Any]] = {}
+        
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._tables = data.get("tables", {})
+                self._fields = data.get("fields", {})
+            except (OSError, ValueError):
+                # 缓存文件损坏时直接丢弃，重新从接口获取
+                self._tables = {}
+                self._fields = {}
+    
+    @staticmethod
+    def _fields_key(app_token: str, table_id: str, view_id: Optional[str] = None) -> str:
+        return f"{app_token}/{table_id}/{view_id or ''}"
+    
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """缓存项是否仍在 ttl 有效期内"""
+        return self.ttl is not None and time.time() - entry["fetched_at"] < self.ttl
+    
+    def get_tables(self, app_token: str) -> Optional[Dict[str, Any]]:
+        """获取数据表列表缓存项的副本，包含 tables 和 fetched_at"""
+        with self._lock:
+            return copy.deepcopy(self._tables.get(app_token))
+    
+    def set_tables(self, app_token: str, tables: List[Dict[str, Any]]):
+        """
+        更新数据表列表，并使 revision 已变化或已删除的数据表的字段缓存失效
+        
+        Args:
+            app_token: 多维表格的 app_token
+            tables: get_all_tables 的结果
+        """
+        revisions = {table["table_id"]: table.get("revision") for table in tables}
+        with self._lock:
+            self._tables[app_token] = {"tables": tables, "fetched_at": time.time()}
+            prefix = f"{app_token}/"
+            for key in [k for k in self._fields if k.startswith(prefix)]:
+                table_id = key.split("/")[1]
+                if table_id not in revisions or self._fields[key]["revision"] != revisions[table_id]:
+                    del self._fields[key]
+        self.save()
+    
+    def table_revision(self, app_token: str, table_id: str) -> Optional[int]:
+        """从数据表列表缓存中取出数据表的 revision"""
+        with self._lock:
+            entry = self._tables.get(app_token)
+            if not entry:
+                return None
+            for table in entry["tables"]:
+                if table["table_id"] == table_id:
+                    return table.get("revision")
+        return None
+    
+    def get_fields(self, app_token: str, table_id: str, view_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """获取字段列表缓存项的副本，包含 fields、revision 和 fetched_at"""
+        with self._lock:
+            return copy.deepcopy(self._fields.get(self._fields_key(app_token, table_id, view_id)))
+    
+    def set_fields(self, 
+                   app_token: str, 
+                   table_id: str, 
+                   view_id: Optional[str], 
+                   fields: List[Dict[str, Any]], 
+                   revision: Optional[int]):
+        """
+        更新字段列表缓存
+        
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            view_id: 视图 ID
+            fields: get_all_fields 的结果
+            revision: 获取字段时数据表的 revision
+        """
+        with self._lock:
+            self._fields[self._fields_key(app_token, table_id, view_id)] = {
+                "fields": fields,
+                "revision": revision,
+                "fetched_at": time.time()
+            }
+        self.save()
+    
+    def touch_fields(self, app_token: str, table_id: str, view_id: Optional[str] = None):
+        """revision 校验通过后重置字段缓存的有效期"""
+        with self._lock:
+            entry = self._fields.get(self._fields_key(app_token, table_id, view_id))
+            if not entry:
+                return
+            entry["fetched_at"] = time.time()
+        self.save()
+    
+    def invalidate(self, app_token: Optional[str] = None, table_id: Optional[str] = None):
+        """
+        手动使缓存失效
+        
+        Args:
+            app_token: 为空时清空全部缓存
+            table_id: 为空时清空该 app_token 下的全部缓存
+        """
+        with self._lock:
+            if app_token is None:
+                self._tables.clear()
+                self._fields.clear()
+            else:
+                prefix = f"{app_token}/{table_id}/" if table_id else f"{app_token}/"
+                for key in [k for k in self._fields if k.startswith(prefix)]:
+                    del self._fields[key]
+                if table_id is None:
+                    self._tables.pop(app_token, None)
+        self.save()
+    
+    def save(self):
+        """将缓存写入持久化文件"""
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps({"tables": self._tables, "fields": self._fields}, ensure_ascii=False)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
 
-import lark_oapi as lark
-from lark_oapi.api.bitable.v1 import *
+class RecordCache:
+    """
+    记录读缓存
+    
+    按 (app_token, table_id, record_id) 缓存 get_record 的结果，
+    超过 max_size 时淘汰最久未使用的记录，超过 ttl 的记录视为未命中
+    """
+    
+    def __init__(self, max_size: int = 10000, ttl: Optional[float] = 300):
+        """
+        初始化记录缓存
+        
+        Args:
+            max_size: 最多缓存的记录数
+            ttl: 缓存有效期（秒），为空时不过期
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._records: "OrderedDict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        
+        # 统计计数
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _copy(record: Dict[str, Any]) -> Dict[str, Any]:
+        # 字段值可能是列表或字典（附件、人员、多选等），需要深拷贝才能与调用方隔离
+        return {"record_id": record["record_id"], "fields": copy.deepcopy(record.get("fields") or {})}
+    
+    def get(self, app_token: str, table_id: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的记录
+        
+        Returns:
+            记录的副本，未命中或已过期时返回 None
+        """
+        key = (app_token, table_id, record_id)
+        with self._lock:
+            entry = self._records.get(key)
+            if entry is None or (self.ttl is not None and time.monotonic() - entry[0] > self.ttl):
+                if entry is not None:
+                    del self._records[key]
+                self.misses += 1
+                return None
+            self._records.move_to_end(key)
+            self.hits += 1
+            return self._copy(entry[1])
+    
+    def set(self, app_token: str, table_id: str, record: Dict[str, Any]):
+        """写入一条 {"record_id", "fields"} 格式的记录"""
+        key = (app_token, table_id, record["record_id"])
+        with self._lock:
+            self._records[key] = (time.monotonic(), self._copy(record))
+            self._records.move_to_end(key)
+            while len(self._records) > self.max_size:
+                self._records.popitem(last=False)
+    
+    def merge(self, app_token: str, table_id: str, record: Dict[str, Any]):
+        """将更新后的字段合并到已缓存的记录中，未缓存的记录不做处理"""
+        key = (app_token, table_id, record["record_id"])
+        with self._lock:
+            entry = self._records.get(key)
+            if entry is not None:
+                entry[1]["fields"].update(copy.deepcopy(record.get("fields") or {}))
+    
+    def invalidate(self, app_token: str, table_id: str, record_id: Optional[str] = None):
+        """
+        使缓存失效
+        
+        Args:
+            record_id: 为空时使整张表的缓存失效
+        """
+        with self._lock:
+            if record_id is not None:
+                self._records.pop((app_token, table_id, record_id), None)
+                return
+            for key in [k for k in self._records if k[0] == app_token and k[1] == table_id]:
+                del self._records[key]
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计
+        
+        Returns:
+            包含 hits、misses、size 的字典
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._records)
+        }
+
+
+class RecordWriteBuffer:
+    """
+    记录写缓冲
+    
+    将逐条的 update/create 暂存起来，同一 record_id 的多次更新合并为一次，
+    待缓冲的记录数达到 max_records 或最早的写入超过 flush_interval 秒时，
+    通过 batch_update_records/batch_create_records 批量提交。
+    每次写入返回一个 Future，提交后得到对应的记录数据或异常。
+    作为上下文管理器使用时，退出时自动提交剩余的写入
+    """
+    
+    def __init__(self, 
+                 client: "FeishuBitableClient", 
+                 app_token: str, 
+                 table_id: str,
+                 max_records: int = BATCH_RECORD_LIMIT,
+                 flush_interval: Optional[float] = 1.0):
+        """
+        初始化写缓冲
+        
+        Args:
+            client: 飞书多维表格客户端
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            max_records: 缓冲的记录数达到该值时立即提交
+            flush_interval: 最早的写入等待超过该秒数时自动提交，为空时只在手动 flush 或退出时提交
+        """
+        self.client = client
+        self.app_token = app_token
+        self.table_id = table_id
+        self.max_records = max_records
+        self.flush_interval = flush_interval
+        
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._updates: "OrderedDict[str, Tuple[Dict[str, Any], List[Future]]]" = OrderedDict()
+        self._creates: List[Tuple[Dict[str, Any], Future]] = []
+        self._oldest = None
+        self._closed = threading.Event()
+        self._timer = None
+    
+    def __len__(self) -> int:
+        return len(self._updates) + len(self._creates)
+    
+    def update(self, record_id: str, fields: Dict[str, Any]) -> Future:
+        """
+        暂存一次记录更新，与同一记录尚未提交的更新合并
+        
+        Args:
+            record_id: 记录 ID
+            fields: 需要更新的字段
+            
+        Returns:
+            Future，提交成功后结果为更新后的记录数据
+        """
+        future = Future()
+        with self._lock:
+            self._check_open()
+            if record_id in self._updates:
+                self._updates[record_id][0].update(fields)
+                self._updates[record_id][1].append(future)
+            else:
+                self._updates[record_id] = (dict(fields), [future])
+            self._mark_pending()
+        self._maybe_flush()
+        return future
+    
+    def create(self, fields: Dict[str, Any]) -> Future:
+        """
+        暂存一次记录创建
+        
+        Args:
+            fields: 字段值
+            
+        Returns:
+            Future，提交成功后结果为创建的记录数据
+        """
+        future = Future()
+        with self._lock:
+            self._check_open()
+            self._creates.append((dict(fields), future))
+            self._mark_pending()
+        self._maybe_flush()
+        return future
+    
+    def _check_open(self):
+        if self._closed.is_set():
+            raise RuntimeError("写缓冲已关闭")
+    
+    def _mark_pending(self):
+        """记录最早一次写入的时间，并按需启动定时提交线程"""
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        if self.flush_interval and self._timer is None:
+            self._timer = threading.Thread(target=self._run_timer, name="FeishuBitableWriteBuffer", daemon=True)
+            self._timer.start()
+    
+    def _maybe_flush(self):
+        if len(self) >= self.max_records:
+            self.flush()
+    
+    def _run_timer(self):
+        while not self._closed.wait(self.flush_interval / 4):
+            oldest = self._oldest
+            if oldest is not None and time.monotonic() - oldest >= self.flush_interval:
+                try:
+                    self.flush()
+                except Exception as e:
+                    self.client.logger.error(f"写缓冲定时提交异常: {e}")
+    
+    def flush(self):
+        """提交缓冲中的全部写入，结果通过各自的 Future 返回"""
+        with self._flush_lock:
+            with self._lock:
+                updates, self._updates = self._updates, OrderedDict()
+                creates, self._creates = self._creates, []
+                self._oldest = None
+            
+            if updates:
+                records = [{"record_id": record_id, "fields": fields} for record_id, (fields, _) in updates.items()]
+                futures = [futures for _, futures in updates.values()]
+                self._submit(self.client.batch_update_records, records, futures)
+            if creates:
+                records = [fields for fields, _ in creates]
+                futures = [[future] for _, future in creates]
+                self._submit(self.client.batch_create_records, records, futures)
+    
+    def _submit(self, method: Callable[..., Dict[str, Any]], records: List[Dict[str, Any]], futures: List[List[Future]]):
+        """批量提交并把每个分块的结果或错误分发给对应的 Future"""
+        try:
+            result = method(self.app_token, self.table_id, records, raise_on_error=False)
+        except Exception as e:
+            for group in futures:
+                for future in group:
+                    future.set_exception(e)
+            return
+        
+        # records 只包含成功分块的结果，按分块顺序依次取出
+        returned = iter(result["records"])
+        for chunk in result["chunks"]:
+            for index in range(chunk["start"], chunk["start"] + chunk["count"]):
+                if chunk["success"]:
+                    record = next(returned, None)
+                    for future in futures[index]:
+                        future.set_result(record)
+                else:
+                    error = Exception(chunk["error"])
+                    for future in futures[index]:
+                        future.set_exception(error)
+    
+    def close(self):
+        """提交剩余写入并停止定时提交，同时从客户端的写缓冲列表中移除"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self.flush()
+        try:
+            self.client._write_buffers.remove(self)
+        except ValueError:
+            pass
+    
+    def __enter__(self) -> "RecordWriteBuffer":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
 class FeishuBitableClient:
     """
     飞书多维表格操作工具类
     
-    封装了对飞书多维表格的增删改查操作
-    无需手动获取和刷新应用访问凭证，SDK会自动管理
-    """
+    封装了对飞书多维表格的增删改查操作
+    无需手动获取和刷新应用访问凭证，SDK会自动管理
+    """
+    
+    def __init__(self, 
+                 app_id: str, 
+                 app_secret: str, 
+                 log_level: int = logging.INFO,
+                 pool_size: int = 16,
+                 timeout: Tuple[float, float] = (5, 60),
+                 rate_limits: Optional[Dict[str, float]] = None,
+                 max_retries: int = 5,
+                 download_chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+                 attachment_cache: Optional[AttachmentCache] = None,
+                 schema_cache: Optional[SchemaCache] = None,
+                 record_cache: Optional[RecordCache] = None,
+                 raw_decode: bool = False,
+                 metrics: Optional[ClientMetrics] = None,
+                 sdk_log_level: Optional[int] = None,
+                 install_log_handler: bool = True,
+                 error_payload: str = "pretty",
+                 error_payload_sample_rate: float = 1.0,
+                 base_url: str = FEISHU_DOMAIN,
+                 session: Optional[requests.Session] = None,
+                 sdk_client: Optional[lark.Client] = None):
+        """
+        初始化飞书多维表格客户端
+        
+        Args:
+            app_id: 飞书应用的 App ID
+            app_secret: 飞书应用的 App Secret
+            log_level: 日志等级，默认为 INFO
+            pool_size: 直接 HTTP 请求（令牌、附件下载）的连接池大小
+            timeout: 直接 HTTP 请求的 (连接超时, 读取超时)，单位秒
+            rate_limits: 各类接口的每秒请求数预算，键为 search、write、download、upload、auth，
+                未指定的使用 DEFAULT_RATE_LIMITS
+            max_retries: 触发频率限制时的最大重试次数
+            download_chunk_size: 附件下载每次读取和写入的字节数
+            attachment_cache: 附件本地缓存，命中时跳过下载，为空时不使用缓存
+            schema_cache: 数据表和字段结构缓存，为空时不使用缓存
+            record_cache: 记录读缓存，为空时不使用缓存
+            raw_decode: 搜索、获取、批量获取、批量创建和批量更新记录时绕过 SDK 的模型反序列化，
+                直接请求接口并将响应体一次解析为字典，安装 orjson 时使用 orjson 解析
+            metrics: 指标收集器，为空时不记录指标
+            sdk_log_level: lark SDK 的日志等级，默认与 log_level 相同
+            install_log_handler: 是否为 "FeishuBitableClient" 日志器安装输出到控制台的 handler，
+                多个实例只会安装一次。由应用统一配置日志时可以关闭
+            error_payload: 接口失败时响应体的记录方式，可选 ERROR_PAYLOAD_MODES 中的值
+            error_payload_sample_rate: 记录失败响应体的采样比例，错误摘要始终记录
+            base_url: 开放平台的域名，如 LARK_DOMAIN、私有化部署地址或本地代理，
+                SDK 请求和直接 HTTP 请求（令牌、raw_decode）都发往该域名
+            session: 直接 HTTP 请求（令牌、附件下载、raw_decode）使用的会话，可挂载自定义的
+                transport adapter 实现缓存或录制回放。为空时创建带连接池的会话
+            sdk_client: 预先构建的 lark SDK 客户端，用于自定义 SDK 的配置。为空时按 base_url 懒构建
+        """
+        if error_payload not in ERROR_PAYLOAD_MODES:
+            raise ValueError(f"不支持的 error_payload: {error_payload}，可选 {', '.join(ERROR_PAYLOAD_MODES)}")
+        
+        # SDK 客户端在首次访问 client 属性时才构建
+        self._client = sdk_client
+        self._client_lock = threading.Lock()
+        self.sdk_log_level = sdk_log_level if sdk_log_level is not None else log_level
+        
+        self.logger = logging.getLogger("FeishuBitableClient")
+        if install_log_handler and not any(getattr(h, "_feishu_bitable", False) for h in self.logger.handlers):
+            handler = logging.StreamHandler()
+            handler._feishu_bitable = True
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            self.logger.addHandler(handler)
+        self.logger.setLevel(log_level)
+        self.error_payload = error_payload
+        self.error_payload_sample_rate = error_payload_sample_rate
+        
+        # 存储应用凭证
+        self.app_id = app_id
+        self.app_secret = app_secret
+        
+        self.base_url = base_url.rstrip("/")
+        self.open_api_url = f"{self.base_url}/open-apis"
+        self.token_url = f"{self.open_api_url}/auth/v3/tenant_access_token/internal"
+        
+        # 令牌和附件下载共用的长连接会话，多线程共享同一个连接池
+        self.timeout = timeout
+        self._owns_session = session is None
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        
+        # tenant_access_token 缓存，供直接使用 requests 的接口共用
+        self.token_manager = TenantAccessTokenManager(self._fetch_tenant_access_token)
+        
+        # 按接口类别划分的限流器，所有线程共用，遇到限流时自动降速
+        budgets = dict(DEFAULT_RATE_LIMITS)
+        budgets.update(rate_limits or {})
+        self.rate_limiters = {name: RateLimiter(rate=rate) for name, rate in budgets.items()}
+        self.download_limiter = self.rate_limiters["download"]
+        self.max_retries = max_retries
+        self.download_chunk_size = download_chunk_size
+        self.attachment_cache = attachment_cache
+        self.schema_cache = schema_cache
+        self.record_cache = record_cache
+        self.raw_decode = raw_decode
+        self.metrics = metrics
+        self._write_buffers: List[RecordWriteBuffer] = []
+    
+    @property
+    def client(self) -> lark.Client:
+        """lark SDK 客户端，首次访问时导入 SDK 并构建"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import lark_oapi as lark
+                    # 取不高于 sdk_log_level 的最近一个 SDK 日志等级
+                    level = max(
+                        (level for level in lark.LogLevel if level.value <= self.sdk_log_level),
+                        key=lambda level: level.value,
+                        default=lark.LogLevel.DEBUG
+                    )
+                    self._client = lark.Client.builder() \
+                        .app_id(self.app_id) \
+                        .app_secret(self.app_secret) \
+                        .domain(self.base_url) \
+                        .log_level(level) \
+                        .build()
+        return self._client
+    
+    def write_buffer(self, 
+                     app_token: str, 
+                     table_id: str,
+                     max_records: int = BATCH_RECORD_LIMIT,
+                     flush_interval: Optional[float] = 1.0) -> RecordWriteBuffer:
+        """
+        创建记录写缓冲，将逐条的更新和创建合并为批量请求
+        
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            max_records: 缓冲的记录数达到该值时立即提交
+            flush_interval: 最早的写入等待超过该秒数时自动提交
+            
+        Returns:
+            写缓冲，关闭客户端时会自动提交并关闭
+        """
+        buffer = RecordWriteBuffer(self, app_token, table_id, max_records, flush_interval)
+        self._write_buffers.append(buffer)
+        return buffer
+    
+    def close(self):
+        """提交未关闭的写缓冲，并关闭 HTTP 连接池，外部传入的 session 由调用方关闭"""
+        for buffer in list(self._write_buffers):
+            buffer.close()
+        if self._owns_session:
+            self.session.close()
+    
+    def __enter__(self) -> "FeishuBitableClient":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _check_response(self, response: Any, action: str):
+        """
+        校验 SDK 响应，失败时记录日志并抛出异常
+        
+        Args:
+            response: SDK 返回的响应对象
+            action: 失败时错误信息的前缀，如 "搜索记录失败"
+        """
+        if response.success():
+            return
+        raw = getattr(response, "raw", None)
+        error_msg = self._log_error(action, response.code, response.msg, response.get_log_id(), 
+                                    getattr(raw, "content", None))
+        raise Exception(error_msg)
+    
+    def _log_error(self, action: str, code: Any, msg: Any, log_id: Optional[str], content: Optional[bytes]) -> str:
+        """
+        记录接口失败的日志
+        
+        错误摘要以 extra={"feishu_error": {...}} 附带结构化字段，便于结构化日志处理；
+        响应体按 error_payload 和 error_payload_sample_rate 决定是否以及如何输出
+        
+        Returns:
+            错误摘要
+        """
+        error_msg = f"{action}，code: {code}, msg: {msg}, log_id: {log_id}"
+        self.logger.error(error_msg, extra={"feishu_error": {"action": action, "code": code, "msg": msg, "log_id": log_id}})
+        
+        if not content or self.error_payload == "none" or not self.logger.isEnabledFor(logging.ERROR):
+            return error_msg
+        if self.error_payload_sample_rate < 1 and random.random() >= self.error_payload_sample_rate:
+            return error_msg
+        
+        if self.error_payload == "compact":
+            self.logger.error(content[:ERROR_PAYLOAD_LIMIT].decode("utf-8", errors="replace"))
+        else:
+            try:
+                self.logger.error(json.dumps(json.loads(content), indent=4, ensure_ascii=False))
+            except ValueError:
+                self.logger.error(content[:ERROR_PAYLOAD_LIMIT].decode("utf-8", errors="replace"))
+        return error_msg
+    
+    @staticmethod
+    def _is_throttled(response: Any) -> bool:
+        """判断 SDK 响应是否为频率限制"""
+        if response.code in RATE_LIMIT_CODES:
+            return True
+        raw = getattr(response, "raw", None)
+        return raw is not None and getattr(raw, "status_code", None) == 429
     
-    def __init__(self, app_id: str, app_secret: str, log_level: int = logging.INFO):
+    def _call_api(self, endpoint: str, operation: str, method: Callable[[Any], Any], request: Any, action: str) -> Any:
         """
-        初始化飞书多维表格客户端
+        经限流器调用 SDK 接口，触发频率限制时指数退避重试
         
         Args:
-            app_id: 飞书应用的 App ID
-            app_secret: 飞书应用的 App Secret
-            log_level: 日志等级，默认为 INFO
+            endpoint: 接口类别，对应 rate_limiters 的键
+            operation: 记入 metrics 的操作名，如 records.search、tables.list
+            method: SDK 接口方法，如 self.client.bitable.v1.app_table_record.search
+            request: SDK 请求对象
+            action: 失败时错误信息的前缀
+            
+        Returns:
+            校验过的 SDK 响应
         """
-        # 直接指定DEBUG级别而不是通过枚举
-        self.client = lark.Client.builder() \
-            .app_id(app_id) \
-            .app_secret(app_secret) \
-            .log_level(lark.LogLevel.DEBUG) \
-            .build()
+        limiter = self.rate_limiters[endpoint]
+        attempt = 0
         
-        self.logger = logging.getLogger("FeishuBitableClient")
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
-        self.logger.setLevel(log_level)
+        while True:
+            limiter.acquire()
+            started = time.monotonic()
+            response = method(request)
+            throttled = self._is_throttled(response)
+            if self.metrics:
+                self._observe_response(endpoint, operation, started, response, throttled)
+            
+            if not throttled:
+                limiter.on_success()
+                break
+            
+            limiter.on_throttle()
+            if attempt >= self.max_retries:
+                break
+            
+            headers = getattr(getattr(response, "raw", None), "headers", None)
+            delay = max(_backoff_delay(attempt), _retry_after(headers))
+            self.logger.warning(f"{action}: 触发频率限制 (code: {response.code})，{delay:.2f}s 后第 {attempt + 1} 次重试")
+            time.sleep(delay)
+            attempt += 1
         
-        # 存储应用凭证
-        self.app_id = app_id
-        self.app_secret = app_secret
+        self._check_response(response, action)
+        return response
+    
+    def _observe_response(self, endpoint: str, operation: str, started: float, response: Any, throttled: bool):
+        """将一次 SDK 调用的耗时、响应大小和结果记入 metrics"""
+        raw = getattr(response, "raw", None)
+        nbytes = len(getattr(raw, "content", None) or b"")
+        if throttled:
+            status = "throttled"
+        elif response.success():
+            status = "ok"
+        else:
+            status = "error"
+            self.metrics.observe_error(endpoint, operation, response.code, response.get_log_id())
+        self.metrics.observe_request(endpoint, operation, time.monotonic() - started, status, nbytes)
+    
+    def _request_with_retry(self, 
+                            method: str, 
+                            url: str, 
+                            endpoint: str = "download", 
+                            operation: str = "download",
+                            **kwargs) -> requests.Response:
+        """
+        经限流器发起 HTTP 请求，遇到 429 时指数退避重试
+        
+        Args:
+            method: HTTP 方法
+            url: 请求地址
+            endpoint: 接口类别，对应 rate_limiters 的键
+            operation: 记入 metrics 的操作名
+            **kwargs: 透传给 requests 的参数
+            
+        Returns:
+            最后一次请求的响应
+        """
+        limiter = self.rate_limiters[endpoint]
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        
+        while True:
+            limiter.acquire()
+            started = time.monotonic()
+            response = self.session.request(method, url, **kwargs)
+            if self.metrics:
+                status = "ok" if response.status_code < 400 else "throttled" if response.status_code == 429 else "error"
+                self.metrics.observe_request(endpoint, operation, time.monotonic() - started, status)
+            
+            if response.status_code != 429:
+                limiter.on_success()
+                return response
+            
+            limiter.on_throttle()
+            if attempt >= self.max_retries:
+                return response
+            
+            delay = max(_backoff_delay(attempt), _retry_after(response.headers))
+            self.logger.warning(f"请求触发频率限制 (HTTP 429)，{delay:.2f}s 后第 {attempt + 1} 次重试: {url}")
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+    
+    def _call_raw(self, 
+                  endpoint: str, 
+                  method: str, 
+                  path: str, 
+                  action: str,
+                  params: Optional[Dict[str, Any]] = None,
+                  body: Optional[Dict[str, Any]] = None,
+                  operation: Optional[str] = None,
+                  files: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        绕过 SDK 直接调用开放平台接口，响应体只解析一次
+        
+        与 _call_api 一样经限流器发起请求并在频率限制时退避重试。令牌失效时只强制刷新一次，
+        之后的限流重试复用缓存中的新令牌
+        
+        Args:
+            endpoint: 接口类别，对应 rate_limiters 的键
+            method: HTTP 方法
+            path: 接口路径，如 /bitable/v1/apps/{app_token}/tables/{table_id}/records/search
+            action: 失败时错误信息的前缀
+            params: 查询参数
+            body: JSON 请求体，指定 files 时作为 multipart 表单字段
+            operation: 记入 metrics 的操作名，默认为 endpoint
+            files: multipart 上传的文件，内容需为 bytes 以便重试时重新发送
+            
+        Returns:
+            响应中的 data 字典
+        """
+        url = f"{self.open_api_url}{path}"
+        limiter = self.rate_limiters[endpoint]
+        attempt = 0
+        refreshed = False
+        force_refresh = False
+        content = {"data": body, "files": files} if files else {"json": body}
+        
+        while True:
+            token = self.get_tenant_access_token(force_refresh=force_refresh)
+            force_refresh = False
+            limiter.acquire()
+            started = time.monotonic()
+            response = self.session.request(
+                method, url, 
+                headers={"Authorization": f"Bearer {token}"},
+                params=params, 
+                timeout=self.timeout,
+                **content
+            )
+            try:
+                payload = _json_loads(response.content)
+            except ValueError:
+                payload = {"code": response.status_code, "msg": response.text[:200]}
+            code = payload.get("code")
+            throttled = response.status_code == 429 or code in RATE_LIMIT_CODES
+            if self.metrics:
+                status = "throttled" if throttled else "ok" if code == 0 else "error"
+                self.metrics.observe_request(
+                    endpoint, operation or endpoint, time.monotonic() - started, status, len(response.content)
+                )
+            
+            if (response.status_code == 401 or code in TOKEN_INVALID_CODES) and not refreshed:
+                refreshed = True
+                force_refresh = True
+                continue
+            
+            if not throttled:
+                limiter.on_success()
+                break
+            
+            limiter.on_throttle()
+            if attempt >= self.max_retries:
+                break
+            
+            delay = max(_backoff_delay(attempt), _retry_after(response.headers))
+            self.logger.warning(f"{action}: 触发频率限制 (code: {code})，{delay:.2f}s 后第 {attempt + 1} 次重试")
+            time.sleep(delay)
+            attempt += 1
+        
+        if code != 0:
+            log_id = response.headers.get("X-Tt-Logid")
+            if self.metrics:
+                self.metrics.observe_error(endpoint, operation or endpoint, code, log_id)
+            raise Exception(self._log_error(action, code, payload.get("msg"), log_id, response.content))
+        return payload.get("data") or {}
+    
+    @staticmethod
+    def _raw_body_value(value: Any) -> Any:
+        """将 SDK 模型对象（如 FilterInfo、Sort）转换为可直接序列化的 JSON 值"""
+        if value is None or isinstance(value, (dict, str, int, float, bool)):
+            return value
+        if isinstance(value, list):
+            return [FeishuBitableClient._raw_body_value(item) for item in value]
+        from lark_oapi import JSON
+        return json.loads(JSON.marshal(value))
+    
+    @staticmethod
+    def _raw_record(item: Dict[str, Any]) -> Dict[str, Any]:
+        """从接口返回的记录中取出与 _record_to_dict 相同的字段"""
+        return {
+            "record_id": item.get("record_id"),
+            "fields": item.get("fields")
+        }
+    
+    @staticmethod
+    def _record_to_dict(record: Any) -> Dict[str, Any]:
+        """将 SDK 的记录对象转换为字典格式"""
+        return {
+            "record_id": record.record_id,
+            "fields": record.fields
+        }
     
     def search_records(self, 
                       app_token: str, 
@@ -71,6 +1496,85 @@ class FeishuBitableClient:
         Returns:
             搜索结果数据
         """
+        if self.raw_decode:
+            return self._search_data_to_dict(self._search_records_raw(
+                app_token, table_id, view_id, field_names, filter_, sort, page_size, page_token, user_id_type
+            ))
+        
+        response = self._search_records_response(
+            app_token=app_token,
+            table_id=table_id,
+            view_id=view_id,
+            field_names=field_names,
+            filter_=filter_,
+            sort=sort,
+            page_size=page_size,
+            page_token=page_token,
+            user_id_type=user_id_type
+        )
+        return self._search_response_to_dict(response)
+    
+    def _search_records_response(self, 
+                                 app_token: str, 
+                                 table_id: str, 
+                                 view_id: Optional[str] = None,
+                                 field_names: Optional[List[str]] = None,
+                                 filter_: Optional[str] = None,
+                                 sort: Optional[str] = None,
+                                 page_size: int = 20,
+                                 page_token: Optional[str] = None,
+                                 user_id_type: str = "open_id") -> SearchAppTableRecordResponse:
+        """发起搜索记录请求，返回校验过的原始响应"""
+        request = self._build_search_request(
+            app_token, table_id, view_id, field_names, filter_, sort, page_size, page_token, user_id_type
+        )
+        response: SearchAppTableRecordResponse = self._call_api(
+            "search", "records.search", self.client.bitable.v1.app_table_record.search, request, "搜索记录失败"
+        )
+        return response
+    
+    def _search_records_raw(self, 
+                            app_token: str, 
+                            table_id: str, 
+                            view_id: Optional[str] = None,
+                            field_names: Optional[List[str]] = None,
+                            filter_: Optional[str] = None,
+                            sort: Optional[str] = None,
+                            page_size: int = 20,
+                            page_token: Optional[str] = None,
+                            user_id_type: str = "open_id") -> Dict[str, Any]:
+        """绕过 SDK 发起搜索记录请求，返回响应中的 data 字典"""
+        params = {"page_size": page_size, "user_id_type": user_id_type}
+        if page_token:
+            params["page_token"] = page_token
+        
+        body = {}
+        if view_id:
+            body["view_id"] = view_id
+        if field_names:
+            body["field_names"] = field_names
+        if filter_:
+            body["filter"] = self._raw_body_value(filter_)
+        if sort:
+            body["sort"] = self._raw_body_value(sort)
+        
+        return self._call_raw(
+            "search", "POST", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/search",
+            "搜索记录失败", params=params, body=body, operation="records.search"
+        )
+    
+    @staticmethod
+    def _build_search_request(app_token: str, 
+                              table_id: str, 
+                              view_id: Optional[str] = None,
+                              field_names: Optional[List[str]] = None,
+                              filter_: Optional[str] = None,
+                              sort: Optional[str] = None,
+                              page_size: int = 20,
+                              page_token: Optional[str] = None,
+                              user_id_type: str = "open_id") -> SearchAppTableRecordRequest:
+        """构建搜索记录请求"""
+        from lark_oapi.api.bitable.v1 import SearchAppTableRecordRequest, SearchAppTableRecordRequestBody
         request_body = SearchAppTableRecordRequestBody.builder()
         
         if view_id:
@@ -82,25 +1586,22 @@ class FeishuBitableClient:
         if sort:
             request_body.sort(sort)
             
-        request = SearchAppTableRecordRequest.builder() \
+        request_builder = SearchAppTableRecordRequest.builder() \
             .app_token(app_token) \
             .table_id(table_id) \
             .page_size(page_size) \
-            .request_body(request_body.build()) \
-            .build()
+            .user_id_type(user_id_type) \
+            .request_body(request_body.build())
             
+        # page_token 需在 build 之前设置，构建后的请求对象不支持链式调用
         if page_token:
-            request.page_token(page_token)
+            request_builder.page_token(page_token)
             
-        response: SearchAppTableRecordResponse = self.client.bitable.v1.app_table_record.search(request)
-        
-        if not response.success():
-            error_msg = f"搜索记录失败，code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}"
-            self.logger.error(error_msg)
-            self.logger.error(json.dumps(json.loads(response.raw.content), indent=4, ensure_ascii=False))
-            raise Exception(error_msg)
-            
-        # 手动转换响应数据为字典格式
+        return request_builder.build()
+    
+    @staticmethod
+    def _search_response_to_dict(response: SearchAppTableRecordResponse) -> Dict[str, Any]:
+        """将搜索记录的响应转换为字典格式"""
         result = {}
         if response.data:
             result = {
@@ -111,14 +1612,215 @@ class FeishuBitableClient:
             }
             if response.data.items:
                 for item in response.data.items:
-                    record_dict = {
-                        "record_id": item.record_id,
-                        "fields": item.fields
-                    }
-                    result["items"].append(record_dict)
+                    result["items"].append(FeishuBitableClient._record_to_dict(item))
             
         return result
     
+    @staticmethod
+    def _search_data_to_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+        """将直接解析的搜索记录 data 转换为与 _search_response_to_dict 相同的格式"""
+        if not data:
+            return {}
+        return {
+            "has_more": data.get("has_more", False),
+            "page_token": data.get("page_token"),
+            "total": data.get("total"),
+            "items": [FeishuBitableClient._raw_record(item) for item in data.get("items") or []]
+        }
+    
+    def iter_record_pages(self, 
+                          app_token: str, 
+                          table_id: str, 
+                          view_id: Optional[str] = None,
+                          field_names: Optional[List[str]] = None,
+                          filter_: Optional[str] = None,
+                          sort: Optional[str] = None,
+                          page_size: int = 100,
+                          page_token: Optional[str] = None,
+                          user_id_type: str = "open_id",
+                          prefetch: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        逐页迭代多维表格记录，自动处理分页
+        
+        每次产出一页 search_records 的结果，其中的 page_token 即下一页的断点，
+        保存后可作为本方法的 page_token 参数从断点继续读取。
+        开启预取时，后台线程拿到本页 page_token 后立即请求下一页，
+        与当前页的字典转换和调用方的处理并行
+        
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            view_id: 视图 ID
+            field_names: 需要返回的字段名列表
+            filter_: 过滤条件
+            sort: 排序条件
+            page_size: 分页大小
+            page_token: 起始分页标记，为空时从第一页开始
+            user_id_type: 用户 ID 类型
+            prefetch: 预取深度，即最多提前缓冲的页数，0 表示不预取
+            
+        Yields:
+            每一页的搜索结果数据
+        """
+        if self.raw_decode:
+            def fetch_page(token: Optional[str]) -> Dict[str, Any]:
+                return self._search_records_raw(
+                    app_token, table_id, view_id, field_names, filter_, sort, page_size, token, user_id_type
+                )
+            
+            yield from self._observe_pages(
+                "records.search", self._iter_pages(fetch_page, self._search_data_to_dict, page_token, prefetch)
+            )
+            return
+        
+        def fetch_page(token: Optional[str]) -> SearchAppTableRecordResponse:
+            return self._search_records_response(
+                app_token=app_token,
+                table_id=table_id,
+                view_id=view_id,
+                field_names=field_names,
+                filter_=filter_,
+                sort=sort,
+                page_size=page_size,
+                page_token=token,
+                user_id_type=user_id_type
+            )
+        
+        yield from self._observe_pages(
+            "records.search", self._iter_pages(fetch_page, self._search_response_to_dict, page_token, prefetch)
+        )
+    
+    def iter_records(self, 
+                     app_token: str, 
+                     table_id: str, 
+                     view_id: Optional[str] = None,
+                     field_names: Optional[List[str]] = None,
+                     filter_: Optional[str] = None,
+                     sort: Optional[str] = None,
+                     page_size: int = 100,
+                     page_token: Optional[str] = None,
+                     user_id_type: str = "open_id",
+                     prefetch: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        逐条迭代多维表格记录，自动处理分页
+        
+        内存中只保留当前页，适合遍历大表；需要断点续传时请使用 iter_record_pages
+        
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            view_id: 视图 ID
+            field_names: 需要返回的字段名列表
+            filter_: 过滤条件
+            sort: 排序条件
+            page_size: 分页大小
+            page_token: 起始分页标记，为空时从第一页开始
+            user_id_type: 用户 ID 类型
+            prefetch: 预取深度，0 表示不预取
+            
+        Yields:
+            单条记录数据
+        """
+        for page in self.iter_record_pages(
+            app_token=app_token,
+            table_id=table_id,
+            view_id=view_id,
+            field_names=field_names,
+            filter_=filter_,
+            sort=sort,
+            page_size=page_size,
+            page_token=page_token,
+            user_id_type=user_id_type,
+            prefetch=prefetch
+        ):
+            yield from page.get("items", [])
+    
+    def _iter_pages(self, 
+                    fetch_page: Callable[[Optional[str]], Any],
+                    convert_page: Callable[[Any], Dict[str, Any]],
+                    page_token: Optional[str] = None,
+                    prefetch: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        通用分页迭代，可选后台预取
+        
+        Args:
+            fetch_page: 根据 page_token 请求一页并返回原始响应的函数
+            convert_page: 将原始响应转换为字典的函数
+            page_token: 起始分页标记
+            prefetch: 预取深度，0 表示逐页串行请求
+            
+        Yields:
+            转换后的每一页数据
+        """
+        if prefetch <= 0:
+            has_more = True
+            while has_more:
+                response = fetch_page(page_token)
+                has_more, page_token = self._next_page(response)
+                yield convert_page(response)
+            return
+        
+        # 有界队列限制预取深度，队列满时后台线程等待消费
+        pages = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+        
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+        
+        def producer():
+            token = page_token
+            has_more = True
+            try:
+                while has_more and not stop.is_set():
+                    response = fetch_page(token)
+                    has_more, token = self._next_page(response)
+                    put(("page", response))
+            except Exception as e:
+                put(("error", e))
+            finally:
+                put(("end", None))
+        
+        worker = threading.Thread(target=producer, name="FeishuBitablePrefetch", daemon=True)
+        worker.start()
+        try:
+            while True:
+                kind, payload = pages.get()
+                if kind == "page":
+                    yield convert_page(payload)
+                elif kind == "error":
+                    raise payload
+                else:
+                    break
+        finally:
+            # 调用方提前退出时通知后台线程停止预取
+            stop.set()
+    
+    def _observe_pages(self, operation: str, pages: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """透传分页迭代的每一页，迭代结束或提前关闭时将分页深度记入 metrics"""
+        count = 0
+        try:
+            for page in pages:
+                count += 1
+                yield page
+        finally:
+            pages.close()
+            if self.metrics:
+                self.metrics.observe_pages(operation, count)
+    
+    @staticmethod
+    def _next_page(response: Any) -> Tuple[bool, Optional[str]]:
+        """从原始响应或直接解析的 data 字典中取出 has_more 和下一页的 page_token"""
+        if isinstance(response, dict):
+            return bool(response.get("has_more")), response.get("page_token")
+        if not response.data:
+            return False, None
+        return bool(response.data.has_more), response.data.page_token
+    
     def get_all_records(self, 
                        app_token: str, 
                        table_id: str, 
@@ -126,7 +1828,8 @@ class FeishuBitableClient:
                        field_names: Optional[List[str]] = None,
                        filter_: Optional[str] = None,
                        sort: Optional[str] = None,
-                       user_id_type: str = "open_id") -> List[Dict[str, Any]]:
+                       user_id_type: str = "open_id",
+                       prefetch: int = 0) -> List[Dict[str, Any]]:
         """
         获取多维表格的所有记录，自动处理分页
         
@@ -138,33 +1841,274 @@ class FeishuBitableClient:
             filter_: 过滤条件
             sort: 排序条件
             user_id_type: 用户 ID 类型
+            prefetch: 预取深度，0 表示不预取
+            
+        Returns:
+            所有记录的列表
+        """
+        # 设置较大的页大小以减少请求次数
+        return list(self.iter_records(
+            app_token=app_token,
+            table_id=table_id,
+            view_id=view_id,
+            field_names=field_names,
+            filter_=filter_,
+            sort=sort,
+            page_size=100,
+            user_id_type=user_id_type,
+            prefetch=prefetch
+        ))
+    
+    def parallel_scan(self, 
+                      app_token: str, 
+                      table_id: str, 
+                      partition_field: Optional[str] = None,
+                      partitions: int = 8,
+                      partition_filters: Optional[List[Dict[str, Any]]] = None,
+                      view_id: Optional[str] = None,
+                      field_names: Optional[List[str]] = None,
+                      filter_: Optional[Dict[str, Any]] = None,
+                      max_workers: int = 8,
+                      page_size: int = 500,
+                      utc_offset_hours: int = 8) -> List[Dict[str, Any]]:
+        """
+        分区并发扫描全表，返回全部记录
+        
+        单条分页链中每一页依赖上一页的 page_token，只能串行请求。这里把表按时间字段
+        （如创建时间）划分为互不相交的区间，每个区间各自分页并在线程池中并发扫描，
+        最后按分区顺序合并并按 record_id 去重
+        
+        日期过滤按天比较，分区边界对齐到天，所有记录落在同一天内时只有一个分区。
+        按 partition_field 自动分区时，该字段为空的记录单独作为最后一个分区扫描
+        
+        整张表的记录都会保存在内存中，大表请使用 iter_parallel_scan 边扫描边处理
+        
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            partition_field: 用于分区的日期类字段名，如"创建时间"
+            partitions: 最大分区数，按该字段最小值和最大值之间的天数等分
+            partition_filters: 自定义的分区过滤条件列表，指定后忽略 partition_field 和 partitions
+            view_id: 视图 ID
+            field_names: 需要返回的字段名列表
+            filter_: 额外的过滤条件，conjunction 必须为 and，会与分区条件合并
+            max_workers: 并发扫描的线程数
+            page_size: 分页大小
+            utc_offset_hours: 划分天边界所用的时区偏移，应与多维表格的时区一致
             
         Returns:
             所有记录的列表
         """
+        partition_filters = self._scan_partitions(
+            app_token, table_id, partition_field, partitions, partition_filters, view_id, filter_, utc_offset_hours
+        )
+        
+        def scan(partition: Dict[str, Any]) -> List[Dict[str, Any]]:
+            return list(self.iter_records(
+                app_token=app_token,
+                table_id=table_id,
+                view_id=view_id,
+                field_names=field_names,
+                filter_=partition,
+                page_size=page_size
+            ))
+        
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(partition_filters)))) as pool:
+            results = list(pool.map(scan, partition_filters))
+        
         all_records = []
-        page_token = None
-        has_more = True
+        seen = set()
+        for records in results:
+            for record in records:
+                if record["record_id"] not in seen:
+                    seen.add(record["record_id"])
+                    all_records.append(record)
+        
+        self.logger.info(
+            f"分区扫描完成: {table_id}, {len(partition_filters)} 个分区, {len(all_records)} 条记录, "
+            f"耗时 {time.monotonic() - start:.2f}s"
+        )
+        return all_records
+    
+    def iter_parallel_scan(self, 
+                           app_token: str, 
+                           table_id: str, 
+                           partition_field: Optional[str] = None,
+                           partitions: int = 8,
+                           partition_filters: Optional[List[Dict[str, Any]]] = None,
+                           view_id: Optional[str] = None,
+                           field_names: Optional[List[str]] = None,
+                           filter_: Optional[Dict[str, Any]] = None,
+                           max_workers: int = 8,
+                           page_size: int = 500,
+                           utc_offset_hours: int = 8) -> Iterator[Dict[str, Any]]:
+        """
+        分区并发扫描全表，逐条产出记录
+        
+        分区方式与 parallel_scan 相同。各分区扫描到的页放入有界队列，内存中最多缓冲
+        2 * max_workers 页，调用方处理不及时时扫描线程会等待。记录按到达顺序产出，
+        不同分区的记录交错出现；自定义的 partition_filters 有重叠时可能产出重复记录。
+        任一分区失败时在产出位置抛出异常，提前关闭迭代器时停止扫描
+        
+        Args:
+            参数与 parallel_scan 相同
+            
+        Yields:
+            单条记录数据
+        """
+        partition_filters = self._scan_partitions(
+            app_token, table_id, partition_field, partitions, partition_filters, view_id, filter_, utc_offset_hours
+        )
+        workers = max(1, min(max_workers, len(partition_filters)))
+        pages = queue.Queue(maxsize=2 * workers)
+        stop = threading.Event()
+        
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+        
+        def scan(partition: Dict[str, Any]):
+            try:
+                for page in self.iter_record_pages(
+                    app_token=app_token,
+                    table_id=table_id,
+                    view_id=view_id,
+                    field_names=field_names,
+                    filter_=partition,
+                    page_size=page_size
+                ):
+                    if stop.is_set():
+                        return
+                    put(("page", page.get("items") or []))
+            except Exception as e:
+                put(("error", e))
+        
+        def run():
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    list(pool.map(scan, partition_filters))
+            finally:
+                put(("end", None))
+        
+        threading.Thread(target=run, name="FeishuBitableScan", daemon=True).start()
+        try:
+            while True:
+                kind, payload = pages.get()
+                if kind == "page":
+                    yield from payload
+                elif kind == "error":
+                    raise payload
+                else:
+                    break
+        finally:
+            # 调用方提前退出或出错时通知扫描线程停止
+            stop.set()
+    
+    def _scan_partitions(self, 
+                         app_token: str, 
+                         table_id: str, 
+                         partition_field: Optional[str],
+                         partitions: int,
+                         partition_filters: Optional[List[Dict[str, Any]]],
+                         view_id: Optional[str],
+                         filter_: Optional[Dict[str, Any]],
+                         utc_offset_hours: int) -> List[Dict[str, Any]]:
+        """生成分区扫描的过滤条件，并与额外的过滤条件合并"""
+        if partition_filters is None:
+            if not partition_field:
+                raise ValueError("必须指定 partition_field 或 partition_filters")
+            partition_filters = self._time_partition_filters(
+                app_token, table_id, partition_field, partitions, view_id, utc_offset_hours
+            )
         
-        while has_more:
+        if filter_:
+            if filter_.get("conjunction", "and") != "and":
+                raise ValueError("分区扫描只支持 conjunction 为 and 的过滤条件")
+            partition_filters = [
+                {"conjunction": "and", "conditions": part["conditions"] + filter_.get("conditions", [])}
+                for part in partition_filters
+            ]
+        return partition_filters
+    
+    def _time_partition_filters(self, 
+                                app_token: str, 
+                                table_id: str, 
+                                partition_field: str,
+                                partitions: int,
+                                view_id: Optional[str] = None,
+                                utc_offset_hours: int = 8) -> List[Dict[str, Any]]:
+        """
+        按日期字段的取值范围以天为单位等分出分区过滤条件
+        
+        通过两次 page_size=1 的排序查询取得非空的最小值和最大值，换算为天后等分，
+        重复的边界会被合并，因此分区数不超过跨越的天数。日期字段只支持 isGreater 和 isLess
+        且按天比较，第 i 个分区覆盖 [起始日, 结束日)，条件写为 isGreater(起始日前一天) 和
+        isLess(结束日)。第一个分区不设下界、最后一个分区不设上界，该字段有值的记录恰好落在一个分区中；
+        另加一个 isEmpty 分区覆盖该字段为空的记录
+        """
+        not_empty = {
+            "conjunction": "and",
+            "conditions": [{"field_name": partition_field, "operator": "isNotEmpty", "value": []}]
+        }
+        bounds = []
+        for desc in (False, True):
             result = self.search_records(
                 app_token=app_token,
                 table_id=table_id,
                 view_id=view_id,
-                field_names=field_names,
-                filter_=filter_,
-                sort=sort,
-                page_token=page_token,
-                page_size=100  # 设置较大的页大小以减少请求次数
+                field_names=[partition_field],
+                filter_=not_empty,
+                sort=[{"field_name": partition_field, "desc": desc}],
+                page_size=1
             )
-            
-            if "items" in result:
-                all_records.extend(result["items"])
-                
-            has_more = result.get("has_more", False)
-            page_token = result.get("page_token")
-            
-        return all_records
+            items = result.get("items") or []
+            value = items[0]["fields"].get(partition_field) if items else None
+            bounds.append(int(value) if value is not None else None)
+        
+        low, high = bounds
+        if low is None or high is None:
+            return [{"conjunction": "and", "conditions": []}]
+        
+        day_ms = 24 * 3600 * 1000
+        offset_ms = utc_offset_hours * 3600 * 1000
+        low_day = (low + offset_ms) // day_ms
+        days = (high + offset_ms) // day_ms - low_day + 1
+        
+        # 分区起始日，按天数等分后去重，保证每个分区至少跨一天
+        starts = sorted({low_day + days * i // partitions for i in range(max(1, min(partitions, days)))})
+        if len(starts) <= 1:
+            return [{"conjunction": "and", "conditions": []}]
+        
+        def exact_date(day: int) -> List[str]:
+            # 取当天正午，避免时区差异导致落到相邻的一天
+            return ["ExactDate", str(day * day_ms - offset_ms + day_ms // 2)]
+        
+        filters = []
+        for i, start in enumerate(starts):
+            conditions = []
+            if i > 0:
+                conditions.append({
+                    "field_name": partition_field,
+                    "operator": "isGreater",
+                    "value": exact_date(start - 1)
+                })
+            if i < len(starts) - 1:
+                conditions.append({
+                    "field_name": partition_field,
+                    "operator": "isLess",
+                    "value": exact_date(starts[i + 1])
+                })
+            filters.append({"conjunction": "and", "conditions": conditions})
+        filters.append({
+            "conjunction": "and",
+            "conditions": [{"field_name": partition_field, "operator": "isEmpty", "value": []}]
+        })
+        return filters
     
     def get_record(self, 
                   app_token: str, 
@@ -183,27 +2127,123 @@ class FeishuBitableClient:
         Returns:
             记录数据
         """
-        request = GetAppTableRecordRequest.builder() \
+        if self.record_cache:
+            cached = self.record_cache.get(app_token, table_id, record_id)
+            if cached:
+                return cached
+        
+        if self.raw_decode:
+            data = self._call_raw(
+                "search", "GET", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/{record_id}",
+                "获取记录失败", params={"user_id_type": user_id_type}, operation="records.get"
+            )
+            result = self._raw_record(data["record"]) if data.get("record") else {}
+        else:
+            request = self._build_get_record_request(app_token, table_id, record_id)
+            response: GetAppTableRecordResponse = self._call_api(
+                "search", "records.get", self.client.bitable.v1.app_table_record.get, request, "获取记录失败"
+            )
+            result = self._get_record_to_dict(response)
+        if self.record_cache and result:
+            self.record_cache.set(app_token, table_id, result)
+            
+        return result
+    
+    def get_records(self, 
+                    app_token: str, 
+                    table_id: str, 
+                    record_ids: List[str],
+                    user_id_type: str = "open_id",
+                    max_workers: int = 4) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取记录
+        
+        先查记录缓存，未命中的记录去重后按 BATCH_GET_LIMIT 分块，通过批量获取接口并发请求
+        
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            record_ids: 记录 ID 列表，可以重复
+            user_id_type: 用户 ID 类型
+            max_workers: 并发请求分块的线程数
+            
+        Returns:
+            {record_id: 记录数据}，不存在的记录不会出现在结果中
+        """
+        result = {}
+        missing = []
+        for record_id in dict.fromkeys(record_ids):
+            cached = self.record_cache.get(app_token, table_id, record_id) if self.record_cache else None
+            if cached:
+                result[record_id] = cached
+            else:
+                missing.append(record_id)
+        
+        if not missing:
+            return result
+        
+        def send_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+            return self._batch_get_chunk(app_token, table_id, chunk)
+        
+        reports = self._dispatch_chunks(missing, BATCH_GET_LIMIT, max_workers, send_chunk)
+        fetched = self._merge_chunk_results("批量获取记录", reports, raise_on_error=True)
+        
+        for record in fetched["records"]:
+            result[record["record_id"]] = record
+            if self.record_cache:
+                self.record_cache.set(app_token, table_id, record)
+        
+        return result
+    
+    def _batch_get_chunk(self, 
+                         app_token: str, 
+                         table_id: str, 
+                         record_ids: List[str]) -> List[Dict[str, Any]]:
+        """提交一个批量获取分块，返回获取到的记录列表"""
+        if self.raw_decode:
+            data = self._call_raw(
+                "search", "POST", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/batch_get",
+                "批量获取记录失败", body={"record_ids": record_ids}, operation="records.batch_get"
+            )
+            return [self._raw_record(record) for record in data.get("records") or []]
+        
+        request = self._build_batch_get_request(app_token, table_id, record_ids)
+        response: BatchGetAppTableRecordResponse = self._call_api(
+            "search", "records.batch_get", self.client.bitable.v1.app_table_record.batch_get, request, "批量获取记录失败"
+        )
+        
+        return self._records_to_list(response)
+    
+    @staticmethod
+    def _build_batch_get_request(app_token: str, 
+                                 table_id: str, 
+                                 record_ids: List[str]) -> BatchGetAppTableRecordRequest:
+        """构建批量获取记录请求"""
+        from lark_oapi.api.bitable.v1 import BatchGetAppTableRecordRequest, BatchGetAppTableRecordRequestBody
+        return BatchGetAppTableRecordRequest.builder() \
+            .app_token(app_token) \
+            .table_id(table_id) \
+            .request_body(BatchGetAppTableRecordRequestBody.builder()
+                          .record_ids(record_ids)
+                          .build()) \
+            .build()
+    
+    @staticmethod
+    def _build_get_record_request(app_token: str, table_id: str, record_id: str) -> GetAppTableRecordRequest:
+        """构建获取单条记录请求"""
+        from lark_oapi.api.bitable.v1 import GetAppTableRecordRequest
+        return GetAppTableRecordRequest.builder() \
             .app_token(app_token) \
             .table_id(table_id) \
             .record_id(record_id) \
             .build()
-            
-        response: GetAppTableRecordResponse = self.client.bitable.v1.app_table_record.get(request)
-        
-        if not response.success():
-            error_msg = f"获取记录失败，code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}"
-            self.logger.error(error_msg)
-            self.logger.error(json.dumps(json.loads(response.raw.content), indent=4, ensure_ascii=False))
-            raise Exception(error_msg)
-            
-        # 手动转换响应数据为字典格式
+    
+    @staticmethod
+    def _get_record_to_dict(response: GetAppTableRecordResponse) -> Dict[str, Any]:
+        """将获取单条记录的响应转换为字典格式"""
         result = {}
         if response.data and response.data.record:
-            result = {
-                "record_id": response.data.record.record_id,
-                "fields": response.data.record.fields
-            }
+            result = FeishuBitableClient._record_to_dict(response.data.record)
             
         return result
     
@@ -224,54 +2264,117 @@ class FeishuBitableClient:
         Returns:
             创建的记录数据
         """
+        request = self._build_create_record_request(app_token, table_id, fields)
+        response: CreateAppTableRecordResponse = self._call_api(
+            "write", "records.create", self.client.bitable.v1.app_table_record.create, request, "创建记录失败"
+        )
+        
+        result = self._single_record_to_dict(response)
+        if self.record_cache and result:
+            self.record_cache.set(app_token, table_id, result["record"])
+            
+        return result
+    
+    @staticmethod
+    def _build_create_record_request(app_token: str, 
+                                     table_id: str, 
+                                     fields: Dict[str, Any]) -> CreateAppTableRecordRequest:
+        """构建创建记录请求"""
+        from lark_oapi.api.bitable.v1 import CreateAppTableRecordRequest
         # 使用正确的类名
         body = {
             "fields": fields
         }
             
-        request = CreateAppTableRecordRequest.builder() \
+        return CreateAppTableRecordRequest.builder() \
             .app_token(app_token) \
             .table_id(table_id) \
             .request_body(body) \
             .build()
-            
-        response: CreateAppTableRecordResponse = self.client.bitable.v1.app_table_record.create(request)
-        
-        if not response.success():
-            error_msg = f"创建记录失败，code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}"
-            self.logger.error(error_msg)
-            self.logger.error(json.dumps(json.loads(response.raw.content), indent=4, ensure_ascii=False))
-            raise Exception(error_msg)
-            
-        # 手动转换响应数据为字典格式
+    
+    @staticmethod
+    def _single_record_to_dict(response: Any) -> Dict[str, Any]:
+        """将创建/更新单条记录的响应转换为 {"record": {...}} 格式"""
         result = {}
         if response.data and response.data.record:
             result = {
-                "record": {
-                    "record_id": response.data.record.record_id,
-                    "fields": response.data.record.fields
-                }
+                "record": FeishuBitableClient._record_to_dict(response.data.record)
             }
             
         return result
     
+    @staticmethod
+    def _records_to_list(response: Any) -> List[Dict[str, Any]]:
+        """将批量创建/更新/获取的响应转换为记录列表"""
+        records = []
+        if response.data and response.data.records:
+            for record in response.data.records:
+                records.append(FeishuBitableClient._record_to_dict(record))
+            
+        return records
+    
     def batch_create_records(self, 
                            app_token: str, 
                            table_id: str, 
                            records: List[Dict[str, Any]],
-                           user_id_type: str = "open_id") -> Dict[str, Any]:
+                           user_id_type: str = "open_id",
+                           chunk_size: int = BATCH_RECORD_LIMIT,
+                           max_workers: int = 4,
+                           raise_on_error: bool = True) -> Dict[str, Any]:
         """
         批量创建记录
         
+        超过单次请求上限的记录会自动分块，各分块在线程池中并发提交
+        
         Args:
             app_token: 多维表格的 app_token
             table_id: 表格 ID
             records: 记录列表，每个记录为 {字段名: 字段值} 的字典
             user_id_type: 用户 ID 类型
+            chunk_size: 每个分块的记录数，不超过 BATCH_RECORD_LIMIT
+            max_workers: 并发提交分块的线程数
+            raise_on_error: 有分块失败时是否抛出 BatchOperationError
             
         Returns:
-            创建的记录数据
+            创建的记录数据，records 按输入顺序合并，chunks 为各分块的执行报告
         """
+        def send_chunk(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            return self._batch_create_chunk(app_token, table_id, chunk)
+        
+        reports = self._dispatch_chunks(records, chunk_size, max_workers, send_chunk)
+        return self._merge_chunk_results("批量创建记录", reports, raise_on_error)
+    
+    def _batch_create_chunk(self, 
+                            app_token: str, 
+                            table_id: str, 
+                            records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """提交一个批量创建分块，返回创建的记录列表"""
+        if self.raw_decode:
+            data = self._call_raw(
+                "write", "POST", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/batch_create",
+                "批量创建记录失败", body={"records": [{"fields": record} for record in records]},
+                operation="records.batch_create"
+            )
+            created = [self._raw_record(record) for record in data.get("records") or []]
+        else:
+            request = self._build_batch_create_request(app_token, table_id, records)
+            response: BatchCreateAppTableRecordResponse = self._call_api(
+                "write", "records.batch_create", self.client.bitable.v1.app_table_record.batch_create, request, "批量创建记录失败"
+            )
+            created = self._records_to_list(response)
+        
+        if self.record_cache:
+            for record in created:
+                self.record_cache.set(app_token, table_id, record)
+            
+        return created
+    
+    @staticmethod
+    def _build_batch_create_request(app_token: str, 
+                                    table_id: str, 
+                                    records: List[Dict[str, Any]]) -> BatchCreateAppTableRecordRequest:
+        """构建批量创建记录请求"""
+        from lark_oapi.api.bitable.v1 import BatchCreateAppTableRecordRequest
         # 直接构建请求体
         records_to_create = []
         for record in records:
@@ -281,29 +2384,72 @@ class FeishuBitableClient:
             "records": records_to_create
         }
             
-        request = BatchCreateAppTableRecordRequest.builder() \
+        return BatchCreateAppTableRecordRequest.builder() \
             .app_token(app_token) \
             .table_id(table_id) \
             .request_body(body) \
             .build()
+    
+    def _dispatch_chunks(self, 
+                         items: List[Any],
+                         chunk_size: int,
+                         max_workers: int,
+                         send_chunk: Callable[[List[Any]], Any]) -> List[Dict[str, Any]]:
+        """
+        将输入切分为不超过上限的分块并发提交
+        
+        Args:
+            items: 待提交的数据列表
+            chunk_size: 每个分块的大小
+            max_workers: 并发线程数
+            send_chunk: 提交单个分块的函数
             
-        response: BatchCreateAppTableRecordResponse = self.client.bitable.v1.app_table_record.batch_create(request)
+        Returns:
+            按输入顺序排列的分块报告，包含 index、start、count、success、error、result
+        """
+        chunk_size = max(1, min(chunk_size, BATCH_RECORD_LIMIT))
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        
+        def run(index: int) -> Dict[str, Any]:
+            report = {
+                "index": index,
+                "start": index * chunk_size,
+                "count": len(chunks[index]),
+                "success": False,
+                "error": None,
+                "result": None
+            }
+            try:
+                report["result"] = send_chunk(chunks[index])
+                report["success"] = True
+            except Exception as e:
+                report["error"] = str(e)
+            return report
+        
+        if len(chunks) <= 1 or max_workers <= 1:
+            return [run(i) for i in range(len(chunks))]
         
-        if not response.success():
-            error_msg = f"批量创建记录失败，code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}"
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+            return list(pool.map(run, range(len(chunks))))
+    
+    def _merge_chunk_results(self, 
+                             operation: str,
+                             reports: List[Dict[str, Any]],
+                             raise_on_error: bool) -> Dict[str, Any]:
+        """按分块顺序合并记录结果，并在有分块失败时按需抛出异常"""
+        result = {"records": [], "chunks": []}
+        for report in reports:
+            if report["success"] and report["result"]:
+                result["records"].extend(report["result"])
+            result["chunks"].append({k: v for k, v in report.items() if k != "result"})
+        
+        failed = [r for r in reports if not r["success"]]
+        if failed:
+            error_msg = f"{operation}有 {len(failed)}/{len(reports)} 个分块失败"
             self.logger.error(error_msg)
-            self.logger.error(json.dumps(json.loads(response.raw.content), indent=4, ensure_ascii=False))
-            raise Exception(error_msg)
-            
-        # 手动转换响应数据为字典格式
-        result = {"records": []}
-        if response.data and response.data.records:
-            for record in response.data.records:
-                result["records"].append({
-                    "record_id": record.record_id,
-                    "fields": record.fields
-                })
-            
+            if raise_on_error:
+                raise BatchOperationError(error_msg, result)
+        
         return result
     
     def update_record(self, 
@@ -325,55 +2471,96 @@ class FeishuBitableClient:
         Returns:
             更新后的记录数据
         """
+        request = self._build_update_record_request(app_token, table_id, record_id, fields)
+        response: UpdateAppTableRecordResponse = self._call_api(
+            "write", "records.update", self.client.bitable.v1.app_table_record.update, request, "更新记录失败"
+        )
+        
+        result = self._single_record_to_dict(response)
+        if self.record_cache and result:
+            self.record_cache.merge(app_token, table_id, result["record"])
+            
+        return result
+    
+    @staticmethod
+    def _build_update_record_request(app_token: str, 
+                                     table_id: str, 
+                                     record_id: str,
+                                     fields: Dict[str, Any]) -> UpdateAppTableRecordRequest:
+        """构建更新记录请求"""
+        from lark_oapi.api.bitable.v1 import UpdateAppTableRecordRequest
         # 直接构建请求体
         body = {
             "fields": fields
         }
             
-        request = UpdateAppTableRecordRequest.builder() \
+        return UpdateAppTableRecordRequest.builder() \
             .app_token(app_token) \
             .table_id(table_id) \
             .record_id(record_id) \
             .request_body(body) \
             .build()
-            
-        response: UpdateAppTableRecordResponse = self.client.bitable.v1.app_table_record.update(request)
-        
-        if not response.success():
-            error_msg = f"更新记录失败，code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}"
-            self.logger.error(error_msg)
-            self.logger.error(json.dumps(json.loads(response.raw.content), indent=4, ensure_ascii=False))
-            raise Exception(error_msg)
-            
-        # 手动转换响应数据为字典格式
-        result = {}
-        if response.data and response.data.record:
-            result = {
-                "record": {
-                    "record_id": response.data.record.record_id,
-                    "fields": response.data.record.fields
-                }
-            }
-            
-        return result
     
     def batch_update_records(self, 
                            app_token: str, 
                            table_id: str, 
                            records: List[Dict[str, Any]],
-                           user_id_type: str = "open_id") -> Dict[str, Any]:
+                           user_id_type: str = "open_id",
+                           chunk_size: int = BATCH_RECORD_LIMIT,
+                           max_workers: int = 4,
+                           raise_on_error: bool = True) -> Dict[str, Any]:
         """
         批量更新记录
         
+        超过单次请求上限的记录会自动分块，各分块在线程池中并发提交
+        
         Args:
             app_token: 多维表格的 app_token
             table_id: 表格 ID
             records: 记录列表，每个记录必须包含 record_id 和 fields 字段
             user_id_type: 用户 ID 类型
+            chunk_size: 每个分块的记录数，不超过 BATCH_RECORD_LIMIT
+            max_workers: 并发提交分块的线程数
+            raise_on_error: 有分块失败时是否抛出 BatchOperationError
             
         Returns:
-            更新后的记录数据
+            更新后的记录数据，records 按输入顺序合并，chunks 为各分块的执行报告
         """
+        records_to_update = self._normalize_update_records(records)
+        
+        def send_chunk(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            return self._batch_update_chunk(app_token, table_id, chunk)
+        
+        reports = self._dispatch_chunks(records_to_update, chunk_size, max_workers, send_chunk)
+        return self._merge_chunk_results("批量更新记录", reports, raise_on_error)
+    
+    def _batch_update_chunk(self, 
+                            app_token: str, 
+                            table_id: str, 
+                            records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """提交一个批量更新分块，返回更新后的记录列表"""
+        if self.raw_decode:
+            data = self._call_raw(
+                "write", "POST", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/batch_update",
+                "批量更新记录失败", body={"records": records}, operation="records.batch_update"
+            )
+            updated = [self._raw_record(record) for record in data.get("records") or []]
+        else:
+            request = self._build_batch_update_request(app_token, table_id, records)
+            response: BatchUpdateAppTableRecordResponse = self._call_api(
+                "write", "records.batch_update", self.client.bitable.v1.app_table_record.batch_update, request, "批量更新记录失败"
+            )
+            updated = self._records_to_list(response)
+        
+        if self.record_cache:
+            for record in updated:
+                self.record_cache.merge(app_token, table_id, record)
+            
+        return updated
+    
+    @staticmethod
+    def _normalize_update_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """校验批量更新的记录格式，只保留 record_id 和 fields"""
         records_to_update = []
         for record in records:
             if "record_id" not in record or "fields" not in record:
@@ -383,35 +2570,139 @@ class FeishuBitableClient:
                 "record_id": record["record_id"],
                 "fields": record["fields"]
             })
-            
+        
+        return records_to_update
+    
+    @staticmethod
+    def _build_batch_update_request(app_token: str, 
+                                    table_id: str, 
+                                    records: List[Dict[str, Any]]) -> BatchUpdateAppTableRecordRequest:
+        """构建批量更新记录请求"""
+        from lark_oapi.api.bitable.v1 import BatchUpdateAppTableRecordRequest
         body = {
-            "records": records_to_update
+            "records": records
         }
             
-        request = BatchUpdateAppTableRecordRequest.builder() \
+        return BatchUpdateAppTableRecordRequest.builder() \
             .app_token(app_token) \
             .table_id(table_id) \
             .request_body(body) \
             .build()
-            
-        response: BatchUpdateAppTableRecordResponse = self.client.bitable.v1.app_table_record.batch_update(request)
+    
+    def upsert_records(self, 
+                       app_token: str, 
+                       table_id: str, 
+                       rows: List[Dict[str, Any]],
+                       key_field: str,
+                       compare_fields: Optional[List[str]] = None,
+                       max_workers: int = 4,
+                       prefetch: int = 2) -> Dict[str, Any]:
+        """
+        按业务主键批量写入记录，只提交有变化的行
         
-        if not response.success():
-            error_msg = f"批量更新记录失败，code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}"
-            self.logger.error(error_msg)
-            self.logger.error(json.dumps(json.loads(response.raw.content), indent=4, ensure_ascii=False))
-            raise Exception(error_msg)
+        先以只包含主键和比较字段的投影扫描一次全表建立主键索引，
+        主键不存在的行批量创建，字段值有差异的行批量更新，完全相同的行跳过
+        
+        Args:
+            app_token: 多维表格的 app_token
+            table_id: 表格 ID
+            rows: 待写入的行，每行为 {字段名: 字段值}，必须包含 key_field
+            key_field: 作为业务主键的字段名
+            compare_fields: 参与比较的字段，默认为 rows 中出现的全部字段
+            max_workers: 并发提交分块的线程数
+            prefetch: 扫描全表时的分页预取深度
             
-        # 手动转换响应数据为字典格式
-        result = {"records": []}
-        if response.data and response.data.records:
-            for record in response.data.records:
-                result["records"].append({
-                    "record_id": record.record_id,
-                    "fields": record.fields
-                })
+        Returns:
+            写入报告，包含 created、updated、unchanged 数量，
+            以及 create_result、update_result 两次批量请求的结果
+        """
+        if compare_fields is None:
+            compare_fields = list(dict.fromkeys(name for row in rows for name in row if name != key_field))
+        
+        # 同一主键出现多次时以最后一行为准
+        pending = {}
+        for row in rows:
+            if key_field not in row:
+                raise ValueError(f"每一行都必须包含主键字段 {key_field}")
+            pending[self._key_value(row[key_field])] = row
+        
+        index = {}
+        for record in self.iter_records(
+            app_token=app_token,
+            table_id=table_id,
+            field_names=[key_field] + compare_fields,
+            page_size=500,
+            prefetch=prefetch
+        ):
+            key = self._key_value(record["fields"].get(key_field))
+            if key in index:
+                self.logger.warning(f"主键字段 {key_field} 存在重复值: {key}，只更新第一条记录")
+                continue
+            index[key] = record
+        
+        to_create = []
+        to_update = []
+        unchanged = 0
+        for key, row in pending.items():
+            existing = index.get(key)
+            if existing is None:
+                to_create.append(row)
+                continue
             
-        return result
+            changed = {
+                name: value for name, value in row.items()
+                if name != key_field and name in compare_fields
+                and self._normalize_value(value) != self._normalize_value(existing["fields"].get(name))
+            }
+            if changed:
+                to_update.append({"record_id": existing["record_id"], "fields": changed})
+            else:
+                unchanged += 1
+        
+        self.logger.info(
+            f"upsert {table_id}: 创建 {len(to_create)} 条, 更新 {len(to_update)} 条, 未变化 {unchanged} 条"
+        )
+        
+        report = {
+            "created": len(to_create),
+            "updated": len(to_update),
+            "unchanged": unchanged,
+            "create_result": None,
+            "update_result": None
+        }
+        if to_create:
+            report["create_result"] = self.batch_create_records(
+                app_token, table_id, to_create, max_workers=max_workers
+            )
+        if to_update:
+            report["update_result"] = self.batch_update_records(
+                app_token, table_id, to_update, max_workers=max_workers
+            )
+        return report
+    
+    @staticmethod
+    def _key_value(value: Any) -> Any:
+        """将主键字段值规整为可以作为字典键的形式"""
+        value = FeishuBitableClient._normalize_value(value)
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False, sort_keys=True)
+        return value
+    
+    @staticmethod
+    def _normalize_value(value: Any) -> Any:
+        """
+        将读取到的字段值规整为便于与写入值比较的形式
+        
+        文本类字段读取时为 [{"type": "text", "text": ...}] 的分段列表，这里拼接为字符串；
+        公式和查找引用字段的 {"type", "value"} 结构取其 value
+        """
+        if isinstance(value, dict) and "value" in value and "type" in value:
+            return FeishuBitableClient._normalize_value(value["value"])
+        if isinstance(value, list):
+            if value and all(isinstance(item, dict) and "text" in item for item in value):
+                return "".join(str(item["text"]) for item in value)
+            return [FeishuBitableClient._normalize_value(item) for item in value]
+        return value
     
     def delete_record(self, 
                      app_token: str, 
@@ -430,59 +2721,88 @@ class FeishuBitableClient:
         Returns:
             是否删除成功
         """
-        request = DeleteAppTableRecordRequest.builder() \
+        request = self._build_delete_record_request(app_token, table_id, record_id)
+        self._call_api(
+            "write", "records.delete", self.client.bitable.v1.app_table_record.delete, request, "删除记录失败"
+        )
+        
+        if self.record_cache:
+            self.record_cache.invalidate(app_token, table_id, record_id)
+            
+        return True
+    
+    @staticmethod
+    def _build_delete_record_request(app_token: str, table_id: str, record_id: str) -> DeleteAppTableRecordRequest:
+        """构建删除记录请求"""
+        from lark_oapi.api.bitable.v1 import DeleteAppTableRecordRequest
+        return DeleteAppTableRecordRequest.builder() \
             .app_token(app_token) \
             .table_id(table_id) \
             .record_id(record_id) \
             .build()
-            
-        response: DeleteAppTableRecordResponse = self.client.bitable.v1.app_table_record.delete(request)
-        
-        if not response.success():
-            error_msg = f"删除记录失败，code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}"
-            self.logger.error(error_msg)
-            self.logger.error(json.dumps(json.loads(response.raw.content), indent=4, ensure_ascii=False))
-            raise Exception(error_msg)
-            
-        return True
     
     def batch_delete_records(self, 
                            app_token: str, 
                            table_id: str, 
                            record_ids: List[str],
-                           user_id_type: str = "open_id") -> bool:
+                           user_id_type: str = "open_id",
+                           chunk_size: int = BATCH_RECORD_LIMIT,
+                           max_workers: int = 4) -> bool:
         """
         批量删除记录
         
+        超过单次请求上限的记录会自动分块，各分块在线程池中并发提交。
+        有分块失败时抛出 BatchOperationError，其 result 中 records 为已删除的记录 ID
+        
         Args:
             app_token: 多维表格的 app_token
             table_id: 表格 ID
             record_ids: 记录 ID 列表
             user_id_type: 用户 ID 类型
+            chunk_size: 每个分块的记录数，不超过 BATCH_RECORD_LIMIT
+            max_workers: 并发提交分块的线程数
             
         Returns:
             是否删除成功
         """
+        def send_chunk(chunk: List[str]) -> List[str]:
+            self._batch_delete_chunk(app_token, table_id, chunk)
+            return chunk
+        
+        reports = self._dispatch_chunks(record_ids, chunk_size, max_workers, send_chunk)
+        self._merge_chunk_results("批量删除记录", reports, raise_on_error=True)
+        return True
+    
+    def _batch_delete_chunk(self, 
+                            app_token: str, 
+                            table_id: str, 
+                            record_ids: List[str]):
+        """提交一个批量删除分块"""
+        request = self._build_batch_delete_request(app_token, table_id, record_ids)
+        self._call_api(
+            "write", "records.batch_delete", self.client.bitable.v1.app_table_record.batch_delete, request, "批量删除记录失败"
+        )
+        
+        if self.record_cache:
+            for record_id in record_ids:
+                self.record_cache.invalidate(app_token, table_id, record_id)
+    
+    @staticmethod
+    def _build_batch_delete_request(app_token: str, 
+                                    table_id: str, 
+                                    record_ids: List[str]) -> BatchDeleteAppTableRecordRequest:
+        """构建批量删除记录请求"""
+        from lark_oapi.api.bitable.v1 import BatchDeleteAppTableRecordRequest
         # 直接构建请求体
         body = {
             "records": record_ids
         }
             
-        request = BatchDeleteAppTableRecordRequest.builder() \
+        return BatchDeleteAppTableRecordRequest.builder() \
             .app_token(app_token) \
             .table_id(table_id) \
             .request_body(body) \
             .build()
-            
-        response: BatchDeleteAppTableRecordResponse = self.client.bitable.v1.app_table_record.batch_delete(request)
-        
-        if not response.success():
-            error_msg = f"批量删除记录失败，code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}"
-            self.logger.error(error_msg)
-            self.logger.error(json.dumps(json.loads(response.raw.content), indent=4, ensure_ascii=False))
-            raise Exception(error_msg)
-            
-        return True
     
     def get_table_list(self, 
                       app_token: str,
@@ -499,23 +2819,39 @@ class FeishuBitableClient:
         Returns:
             数据表列表
         """
-        request = ListAppTableRequest.builder() \
+        response = self._table_list_response(app_token, page_size, page_token)
+        return self._table_list_to_dict(response)
+    
+    def _table_list_response(self, 
+                             app_token: str,
+                             page_size: int = 100,
+                             page_token: Optional[str] = None) -> ListAppTableResponse:
+        """发起获取数据表列表请求，返回校验过的原始响应"""
+        request = self._build_table_list_request(app_token, page_size, page_token)
+        response: ListAppTableResponse = self._call_api(
+            "search", "tables.list", self.client.bitable.v1.app_table.list, request, "获取数据表列表失败"
+        )
+            
+        return response
+    
+    @staticmethod
+    def _build_table_list_request(app_token: str,
+                                  page_size: int = 100,
+                                  page_token: Optional[str] = None) -> ListAppTableRequest:
+        """构建获取数据表列表请求"""
+        from lark_oapi.api.bitable.v1 import ListAppTableRequest
+        request_builder = ListAppTableRequest.builder() \
             .app_token(app_token) \
-            .page_size(page_size) \
-            .build()
+            .page_size(page_size)
             
         if page_token:
-            request.page_token(page_token)
-            
-        response: ListAppTableResponse = self.client.bitable.v1.app_table.list(request)
-        
-        if not response.success():
-            error_msg = f"获取数据表列表失败，code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}"
-            self.logger.error(error_msg)
-            self.logger.error(json.dumps(json.loads(response.raw.content), indent=4, ensure_ascii=False))
-            raise Exception(error_msg)
+            request_builder.page_token(page_token)
             
-        # 手动转换响应数据为字典格式
+        return request_builder.build()
+    
+    @staticmethod
+    def _table_list_to_dict(response: ListAppTableResponse) -> Dict[str, Any]:
+        """将数据表列表的响应转换为字典格式"""
         result = {
             "has_more": False,
             "page_token": "",
@@ -538,31 +2874,38 @@ class FeishuBitableClient:
         return result
     
     def get_all_tables(self, 
-                     app_token: str) -> List[Dict[str, Any]]:
+                     app_token: str,
+                     prefetch: int = 0,
+                     use_cache: bool = True) -> List[Dict[str, Any]]:
         """
         获取所有数据表，自动处理分页
         
+        配置了 schema_cache 时，ttl 内直接返回缓存；重新获取后会按 revision 使字段缓存失效
+        
         Args:
             app_token: 多维表格的 app_token
+            prefetch: 预取深度，0 表示不预取
+            use_cache: 是否使用结构缓存
             
         Returns:
             所有数据表的列表
         """
+        cache = self.schema_cache if use_cache else None
+        if cache:
+            entry = cache.get_tables(app_token)
+            if entry and cache.is_fresh(entry):
+                return entry["tables"]
+        
         all_tables = []
-        page_token = None
-        has_more = True
         
-        while has_more:
-            result = self.get_table_list(
-                app_token=app_token,
-                page_token=page_token
-            )
-            
-            if "items" in result:
-                all_tables.extend(result["items"])
-                
-            has_more = result.get("has_more", False)
-            page_token = result.get("page_token")
+        def fetch_page(token: Optional[str]) -> ListAppTableResponse:
+            return self._table_list_response(app_token=app_token, page_token=token)
+        
+        for result in self._observe_pages("tables.list", self._iter_pages(fetch_page, self._table_list_to_dict, prefetch=prefetch)):
+            all_tables.extend(result["items"])
+        
+        if self.schema_cache:
+            self.schema_cache.set_tables(app_token, [dict(table) for table in all_tables])
             
         return all_tables
     
@@ -585,26 +2928,46 @@ class FeishuBitableClient:
         Returns:
             字段列表
         """
-        request = ListAppTableFieldRequest.builder() \
+        response = self._field_list_response(app_token, table_id, view_id, page_size, page_token)
+        return self._field_list_to_dict(response)
+    
+    def _field_list_response(self, 
+                             app_token: str,
+                             table_id: str,
+                             view_id: Optional[str] = None,
+                             page_size: int = 100,
+                             page_token: Optional[str] = None) -> ListAppTableFieldResponse:
+        """发起获取字段列表请求，返回校验过的原始响应"""
+        request = self._build_field_list_request(app_token, table_id, view_id, page_size, page_token)
+        response: ListAppTableFieldResponse = self._call_api(
+            "search", "fields.list", self.client.bitable.v1.app_table_field.list, request, "获取字段列表失败"
+        )
+            
+        return response
+    
+    @staticmethod
+    def _build_field_list_request(app_token: str,
+                                  table_id: str,
+                                  view_id: Optional[str] = None,
+                                  page_size: int = 100,
+                                  page_token: Optional[str] = None) -> ListAppTableFieldRequest:
+        """构建获取字段列表请求"""
+        from lark_oapi.api.bitable.v1 import ListAppTableFieldRequest
+        request_builder = ListAppTableFieldRequest.builder() \
             .app_token(app_token) \
             .table_id(table_id) \
-            .page_size(page_size) \
-            .build()
+            .page_size(page_size)
             
         if view_id:
-            request.view_id(view_id)
+            request_builder.view_id(view_id)
         if page_token:
-            request.page_token(page_token)
-            
-        response: ListAppTableFieldResponse = self.client.bitable.v1.app_table_field.list(request)
-        
-        if not response.success():
-            error_msg = f"获取字段列表失败，code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}"
-            self.logger.error(error_msg)
-            self.logger.error(json.dumps(json.loads(response.raw.content), indent=4, ensure_ascii=False))
-            raise Exception(error_msg)
+            request_builder.page_token(page_token)
             
-        # 手动转换响应数据为字典格式
+        return request_builder.build()
+    
+    @staticmethod
+    def _field_list_to_dict(response: ListAppTableFieldResponse) -> Dict[str, Any]:
+        """将字段列表的响应转换为字典格式"""
         result = {
             "has_more": False,
             "page_token": "",
@@ -629,49 +2992,87 @@ class FeishuBitableClient:
     def get_all_fields(self, 
                      app_token: str,
                      table_id: str,
-                     view_id: Optional[str] = None) -> List[Dict[str, Any]]:
+                     view_id: Optional[str] = None,
+                     prefetch: int = 0,
+                     use_cache: bool = True) -> List[Dict[str, Any]]:
         """
         获取所有字段，自动处理分页
         
+        配置了 schema_cache 时，ttl 内的缓存直接返回；其余情况与数据表列表缓存中的 revision
+        比较，未变化则继续使用。数据表列表缺失或超过 ttl 时才重新获取一次，未设置 ttl 时
+        沿用最近一次 get_all_tables 的结果，因此遍历多张表时最多只请求一次数据表列表
+        
         Args:
             app_token: 多维表格的 app_token
             table_id: 表格 ID
             view_id: 视图 ID
+            prefetch: 预取深度，0 表示不预取
+            use_cache: 是否使用结构缓存
             
         Returns:
             所有字段的列表
         """
+        cache = self.schema_cache if use_cache else None
+        if cache:
+            entry = cache.get_fields(app_token, table_id, view_id)
+            if entry and cache.is_fresh(entry):
+                return entry["fields"]
+            
+            # 数据表列表缺失或过期时刷新，revision 变化的字段缓存会在此时失效
+            tables = cache.get_tables(app_token)
+            if tables is None or (cache.ttl is not None and not cache.is_fresh(tables)):
+                self.get_all_tables(app_token, use_cache=False)
+            entry = cache.get_fields(app_token, table_id, view_id)
+            if entry and entry["revision"] == cache.table_revision(app_token, table_id):
+                if cache.ttl is not None:
+                    cache.touch_fields(app_token, table_id, view_id)
+                return entry["fields"]
+        
         all_fields = []
-        page_token = None
-        has_more = True
         
-        while has_more:
-            result = self.get_field_list(
+        def fetch_page(token: Optional[str]) -> ListAppTableFieldResponse:
+            return self._field_list_response(
                 app_token=app_token,
                 table_id=table_id,
                 view_id=view_id,
-                page_token=page_token
+                page_token=token
+            )
+        
+        for result in self._observe_pages("fields.list", self._iter_pages(fetch_page, self._field_list_to_dict, prefetch=prefetch)):
+            all_fields.extend(result["items"])
+        
+        if cache:
+            cache.set_fields(
+                app_token, table_id, view_id,
+                [dict(field) for field in all_fields],
+                cache.table_revision(app_token, table_id)
             )
-            
-            if "items" in result:
-                all_fields.extend(result["items"])
-                
-            has_more = result.get("has_more", False)
-            page_token = result.get("page_token")
             
         return all_fields
 
-    def get_tenant_access_token(self) -> str:
+    def get_tenant_access_token(self, force_refresh: bool = False) -> str:
         """
         获取飞书的tenant_access_token
         
         使用应用的app_id和app_secret获取tenant_access_token，
-        用于调用需要授权的API，如文件下载
+        用于调用需要授权的API，如文件下载。令牌会按有效期缓存并自动提前刷新
         
+        Args:
+            force_refresh: 是否忽略缓存强制刷新
+            
         Returns:
             tenant_access_token: 租户访问令牌
         """
-        url = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
+        return self.token_manager.get_token(force_refresh)
+    
+    def _fetch_tenant_access_token(self) -> Tuple[str, int]:
+        """
+        请求新的tenant_access_token
+        
+        Returns:
+            (tenant_access_token, 有效期秒数)，失败时返回 ("", 0)
+        """
+        url = self.token_url
         
         payload = {
             "app_id": self.app_id,
@@ -683,11 +3084,13 @@ class FeishuBitableClient:
         }
         
         try:
-            response = requests.post(url, headers=headers, json=payload)
+            response = self._request_with_retry(
+                "POST", url, endpoint="auth", operation="tenant_access_token", headers=headers, json=payload
+            )
             if response.status_code == 200:
                 data = response.json()
                 if data.get("code") == 0:
-                    return data.get("tenant_access_token", "")
+                    return data.get("tenant_access_token", ""), data.get("expire", 0)
                 else:
                     self.logger.error(f"获取tenant_access_token失败: {data}")
             else:
@@ -695,18 +3098,29 @@ class FeishuBitableClient:
         except Exception as e:
             self.logger.error(f"获取tenant_access_token异常: {e}")
         
-        return ""
+        return "", 0
     
-    def download_attachment(self, attachment_item: Dict[str, Any], save_path: str) -> bool:
+    def download_attachment(self, 
+                            attachment_item: Dict[str, Any], 
+                            save_path: str,
+                            chunk_size: Optional[int] = None,
+                            max_resume: int = 3) -> bool:
         """
         下载飞书附件
         
         从飞书多维表格的附件字段中下载文件。
         注意：必须使用API返回的原始URL（带有必要的extra参数），而不是自己构建URL
         
+        文件先写入 save_path + ".part"，校验大小后原子地重命名为 save_path。
+        连接中断时通过 HTTP Range 从已下载的位置续传，上次中断留下的 .part 文件也会被续传。
+        配置了 attachment_cache 时，按 file_token 命中缓存的附件不再下载
+        
         Args:
-            attachment_item: 附件字段项，必须包含url和name字段
+            attachment_item: 附件字段项，必须包含url和name字段，可选的size字段用于校验文件大小，
+                file_token字段用于本地缓存
             save_path: 保存文件的路径
+            chunk_size: 每次读取和写入的字节数，默认使用 download_chunk_size
+            max_resume: 连接中断后的最大续传次数
             
         Returns:
             bool: 下载是否成功
@@ -723,41 +3137,104 @@ class FeishuBitableClient:
             self.logger.error(f"附件项缺少URL信息: {attachment_item}")
             return False
         
+        chunk_size = chunk_size or self.download_chunk_size
+        expected_size = attachment_item.get('size')
+        expected_size = int(expected_size) if expected_size is not None else None
+        part_path = save_path + ".part"
+        file_token = attachment_item.get('file_token')
+        
         try:
-            # 获取tenant_access_token用于授权
-            token = self.get_tenant_access_token()
-            if not token:
-                self.logger.error(f"无法获取授权token，下载失败: {file_url}")
-                return False
-                
-            headers = {
-                "Authorization": f"Bearer {token}"
-            }
+            if self.attachment_cache and file_token and \
+                    self.attachment_cache.materialize(file_token, save_path, expected_size):
+                self.logger.info(f"命中附件缓存: {file_name} -> {save_path}")
+                return True
+            
+            # 确保目标文件夹存在
+            os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
             
             self.logger.info(f"开始下载文件: {file_name}")
             self.logger.debug(f"下载URL: {file_url}")
             
-            response = requests.get(file_url, headers=headers, stream=True)
-            
-            if response.status_code != 200:
-                self.logger.error(f"下载文件失败，状态码: {response.status_code}, 响应: {response.text}")
-                return False
+            started = time.monotonic()
+            downloaded = 0
+            resumes = 0
+            total_size = None
+            while True:
+                offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                if expected_size and offset > expected_size:
+                    # 残留的临时文件比附件还大，只能从头下载
+                    os.remove(part_path)
+                    offset = 0
+                if expected_size and offset == expected_size:
+                    total_size = expected_size
+                    break
                 
-            # 确保目标文件夹存在
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            
-            # 保存文件
-            with open(save_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+                response = self._open_download(file_url, offset)
+                if response is None:
+                    return False
+                
+                if response.status_code == 416 and offset:
+                    # 服务端不接受续传位置，丢弃临时文件后从头下载
+                    response.close()
+                    os.remove(part_path)
+                    resumes += 1
+                    if resumes > max_resume:
+                        self.logger.error(f"下载文件失败，续传位置无效: {file_url}")
+                        return False
+                    continue
+                
+                if response.status_code not in (200, 206):
+                    self.logger.error(f"下载文件失败，状态码: {response.status_code}, 响应: {response.text}")
+                    return False
+                
+                # 服务端忽略 Range 返回完整内容时，从头写入
+                if response.status_code == 200:
+                    offset = 0
+                total_size = self._content_total_size(response.headers, response.status_code, offset)
+                
+                try:
+                    with open(part_path, 'ab' if offset else 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            if chunk:
+                                f.write(chunk)
+                                downloaded += len(chunk)
+                except requests.RequestException as e:
+                    resumes += 1
+                    if resumes > max_resume:
+                        self.logger.error(f"下载文件中断且超过最大续传次数: {e}")
+                        return False
+                    self.logger.warning(f"下载文件中断，第 {resumes} 次续传: {e}")
+                    continue
+                finally:
+                    response.close()
+                
+                if total_size is not None and os.path.getsize(part_path) < total_size:
+                    resumes += 1
+                    if resumes > max_resume:
+                        self.logger.error(f"下载文件不完整且超过最大续传次数: {file_url}")
+                        return False
+                    self.logger.warning(f"下载文件不完整，第 {resumes} 次续传: {file_name}")
+                    continue
+                break
             
             # 检查文件大小
-            file_size = os.path.getsize(save_path)
-            if file_size < 100:  # 如果文件太小，可能是下载失败
+            file_size = os.path.getsize(part_path)
+            for label, size in (("Content-Length", total_size), ("附件 size", expected_size)):
+                if size is not None and file_size != size:
+                    self.logger.error(f"下载文件大小校验失败，{label}: {size}, 实际: {file_size} bytes")
+                    os.remove(part_path)
+                    return False
+            if total_size is None and expected_size is None and file_size < 100:
+                # 无法校验大小时，文件太小可能是下载失败
                 self.logger.warning(f"下载文件可能失败，文件大小过小: {file_size} bytes")
+                os.remove(part_path)
                 return False
-                
+            
+            os.replace(part_path, save_path)
+            if self.metrics:
+                self.metrics.observe_download(downloaded, time.monotonic() - started)
+            if self.attachment_cache and file_token:
+                self.attachment_cache.put(file_token, save_path)
             self.logger.info(f"文件下载成功: {save_path}")
             return True
             
@@ -765,7 +3242,67 @@ class FeishuBitableClient:
             self.logger.error(f"下载文件异常: {e}")
             return False
     
-    def download_field_attachments(self, field_data: List[Dict], save_dir: str, prefix: str = "") -> List[str]:
+    def _open_download(self, file_url: str, offset: int = 0) -> Optional[requests.Response]:
+        """
+        发起附件下载请求，令牌失效（401）时强制刷新后重试一次
+        
+        Args:
+            file_url: 附件下载地址
+            offset: 续传的起始字节，为 0 时下载完整文件
+            
+        Returns:
+            流式响应，无法获取令牌时返回 None
+        """
+        for force_refresh in (False, True):
+            # 获取tenant_access_token用于授权
+            token = self.get_tenant_access_token(force_refresh=force_refresh)
+            if not token:
+                self.logger.error(f"无法获取授权token，下载失败: {file_url}")
+                return None
+            
+            headers = {
+                "Authorization": f"Bearer {token}"
+            }
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+            
+            response = self._request_with_retry("GET", file_url, headers=headers, stream=True)
+            if response.status_code != 401 or force_refresh:
+                return response
+            
+            # 令牌可能已被服务端提前作废，强制刷新后重试一次
+            response.close()
+    
+    @staticmethod
+    def _content_total_size(headers: Dict[str, str], status_code: int, offset: int) -> Optional[int]:
+        """
+        根据响应头计算完整文件的字节数
+        
+        Args:
+            headers: 响应头
+            status_code: 响应状态码
+            offset: 本次请求的续传起始字节
+            
+        Returns:
+            完整文件的字节数，无法确定时返回 None
+        """
+        content_range = headers.get("Content-Range")
+        if status_code == 206 and content_range and "/" in content_range:
+            total = content_range.rsplit("/", 1)[1].strip()
+            if total.isdigit():
+                return int(total)
+        
+        # 压缩传输时 Content-Length 与落盘大小不一致，不能用于校验
+        content_length = headers.get("Content-Length")
+        if content_length and content_length.isdigit() and not headers.get("Content-Encoding"):
+            return offset + int(content_length)
+        return None
+    
+    def download_field_attachments(self, 
+                                   field_data: List[Dict], 
+                                   save_dir: str, 
+                                   prefix: str = "",
+                                   max_workers: int = 4) -> List[str]:
         """
         下载字段中的所有附件
         
@@ -773,42 +3310,273 @@ class FeishuBitableClient:
             field_data: 字段数据，一个附件项列表
             save_dir: 保存文件的目录
             prefix: 文件名前缀
+            max_workers: 并发下载的线程数
             
         Returns:
             List[str]: 下载成功的文件路径列表
         """
-        downloaded_files = []
-        
         # 如果字段数据为空，直接返回
         if not field_data or not isinstance(field_data, list):
             self.logger.warning(f"字段数据为空或不是列表类型: {type(field_data).__name__}")
-            return downloaded_files
+            return []
         
         self.logger.info(f"处理附件字段，包含 {len(field_data)} 个文件")
         
-        # 遍历附件列表
+        jobs = []
         for i, item in enumerate(field_data):
             if not isinstance(item, dict):
                 continue
-                
-            # 获取文件名
-            file_name = item.get('name', f"file_{i+1}")
+            jobs.append((item, self._attachment_save_path(save_dir, i, item, prefix)))
+        
+        return self.download_attachments(jobs, max_workers=max_workers)["files"]
+    
+    def download_records_attachments(self, 
+                                     records: List[Dict[str, Any]], 
+                                     field_name: str, 
+                                     save_dir: str,
+                                     max_workers: int = 4,
+                                     progress_callback: Optional[Callable[[int, int, str, bool], None]] = None) -> Dict[str, Any]:
+        """
+        下载多条记录中某个附件字段的全部附件，作为一个任务统一并发执行
+        
+        每条记录的附件以 record_id 作为文件名前缀保存在 save_dir 下
+        
+        Args:
+            records: 记录列表，如 get_all_records 的返回结果
+            field_name: 附件字段名
+            save_dir: 保存文件的目录
+            max_workers: 并发下载的线程数
+            progress_callback: 进度回调，参数为 (已完成数, 总数, 保存路径, 是否成功)
             
-            # 生成保存路径
-            if prefix:
-                file_name = f"{prefix}_{i+1}_{file_name}"
-            else:
-                file_name = f"attachment_{i+1}_{file_name}"
-                
-            save_path = os.path.join(save_dir, file_name)
+        Returns:
+            下载报告，格式同 download_attachments
+        """
+        jobs = []
+        for record in records:
+            field_data = record.get("fields", {}).get(field_name)
+            if not field_data or not isinstance(field_data, list):
+                continue
+            for i, item in enumerate(field_data):
+                if isinstance(item, dict):
+                    jobs.append((item, self._attachment_save_path(save_dir, i, item, record.get("record_id", ""))))
+        
+        self.logger.info(f"处理 {len(records)} 条记录的附件字段 {field_name}，共 {len(jobs)} 个文件")
+        return self.download_attachments(jobs, max_workers=max_workers, progress_callback=progress_callback)
+    
+    def download_attachments(self, 
+                             jobs: List[Tuple[Dict[str, Any], str]],
+                             max_workers: int = 4,
+                             progress_callback: Optional[Callable[[int, int, str, bool], None]] = None) -> Dict[str, Any]:
+        """
+        并发下载一批附件
+        
+        各线程共用 download 限流器限制请求速率
+        
+        Args:
+            jobs: (附件项, 保存路径) 列表
+            max_workers: 并发下载的线程数
+            progress_callback: 进度回调，参数为 (已完成数, 总数, 保存路径, 是否成功)
+            
+        Returns:
+            下载报告，包含:
+                files: 下载成功的文件路径列表，顺序与 jobs 一致
+                failed: 下载失败的保存路径列表
+                total / succeeded: 总数与成功数
+                bytes: 下载的总字节数
+                elapsed: 耗时（秒）
+                files_per_sec / bytes_per_sec: 吞吐量
+        """
+        total = len(jobs)
+        done = 0
+        progress_lock = threading.Lock()
+        start = time.monotonic()
+        
+        def run(job: Tuple[Dict[str, Any], str]) -> Tuple[bool, int]:
+            nonlocal done
+            item, save_path = job
+            success = self.download_attachment(item, save_path)
+            size = os.path.getsize(save_path) if success else 0
+            if progress_callback:
+                with progress_lock:
+                    done += 1
+                    progress_callback(done, total, save_path, success)
+            return success, size
+        
+        if total <= 1 or max_workers <= 1:
+            results = [run(job) for job in jobs]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, total)) as pool:
+                results = list(pool.map(run, jobs))
+        
+        elapsed = time.monotonic() - start
+        files = [job[1] for job, (success, _) in zip(jobs, results) if success]
+        failed = [job[1] for job, (success, _) in zip(jobs, results) if not success]
+        total_bytes = sum(size for _, size in results)
+        
+        report = {
+            "files": files,
+            "failed": failed,
+            "total": total,
+            "succeeded": len(files),
+            "bytes": total_bytes,
+            "elapsed": elapsed,
+            "files_per_sec": len(files) / elapsed if elapsed > 0 else 0.0,
+            "bytes_per_sec": total_bytes / elapsed if elapsed > 0 else 0.0
+        }
+        if total:
+            self.logger.info(
+                f"附件下载完成: 成功 {len(files)}/{total}, {total_bytes / 1024 / 1024:.2f} MB, "
+                f"耗时 {elapsed:.2f}s, {report['bytes_per_sec'] / 1024 / 1024:.2f} MB/s"
+            )
+        return report
+    
+    @staticmethod
+    def _attachment_save_path(save_dir: str, index: int, item: Dict[str, Any], prefix: str = "") -> str:
+        """
+        生成附件的保存路径
+        
+        Args:
+            save_dir: 保存文件的目录
+            index: 附件在字段中的序号，从 0 开始
+            item: 附件项
+            prefix: 文件名前缀
+            
+        Returns:
+            保存文件的完整路径
+        """
+        # 获取文件名
+        file_name = item.get('name', f"file_{index+1}")
+        
+        # 生成保存路径
+        if prefix:
+            file_name = f"{prefix}_{index+1}_{file_name}"
+        else:
+            file_name = f"attachment_{index+1}_{file_name}"
+            
+        return os.path.join(save_dir, file_name)
+    
+    def upload_attachment(self, 
+                          app_token: str, 
+                          file_path: str,
+                          file_name: Optional[str] = None,
+                          parent_type: str = "bitable_file",
+                          extra: Optional[Dict[str, Any]] = None,
+                          part_workers: int = 4,
+                          multipart_threshold: int = MULTIPART_UPLOAD_THRESHOLD) -> str:
+        """
+        上传附件到多维表格
+        
+        不超过 multipart_threshold 的文件一次上传；更大的文件走分片上传（upload_prepare、
+        upload_part、upload_finish），各分片由线程池并发上传，每个线程只从磁盘读取自己的分片，
+        内存占用不超过 分片大小 × part_workers
+        
+        Args:
+            app_token: 多维表格的 app_token，上传的附件归属于该多维表格
+            file_path: 本地文件路径
+            file_name: 上传后的文件名，默认为本地文件名
+            parent_type: 上传点类型，附件为 bitable_file，图片可用 bitable_image
+            extra: 开启高级权限的多维表格需要的额外参数，如 {"bitablePerm": {"tableId": "tblxxx"}}
+            part_workers: 分片上传的并发线程数
+            multipart_threshold: 使用分片上传的文件大小阈值（字节）
+            
+        Returns:
+            file_token，可组成 [{"file_token": ...}] 写入附件字段
+        """
+        file_name = file_name or os.path.basename(file_path)
+        size = os.path.getsize(file_path)
+        form = {
+            "file_name": file_name,
+            "parent_type": parent_type,
+            "parent_node": app_token,
+            "size": str(size),
+        }
+        if extra:
+            form["extra"] = json.dumps(extra, ensure_ascii=False)
+        
+        start = time.monotonic()
+        if size <= multipart_threshold:
+            with open(file_path, "rb") as f:
+                data = f.read()
+            form["checksum"] = str(zlib.adler32(data))
+            result = self._call_raw(
+                "upload", "POST", "/drive/v1/medias/upload_all", "上传附件失败",
+                body=form, files={"file": (file_name, data)}, operation="upload_all"
+            )
+        else:
+            result = self._upload_multipart(file_path, form, part_workers)
+        
+        self.logger.info(f"附件上传成功: {file_name}, {size} bytes, 耗时 {time.monotonic() - start:.2f}s")
+        return result["file_token"]
+    
+    def _upload_multipart(self, file_path: str, form: Dict[str, str], part_workers: int) -> Dict[str, Any]:
+        """分片上传文件，返回 upload_finish 的 data"""
+        session = self._call_raw(
+            "upload", "POST", "/drive/v1/medias/upload_prepare", "分片上传预上传失败",
+            body=dict(form, size=int(form["size"])), operation="upload_prepare"
+        )
+        upload_id = session["upload_id"]
+        block_size = int(session["block_size"])
+        block_num = int(session["block_num"])
+        
+        def upload_part(seq: int):
+            with open(file_path, "rb") as f:
+                f.seek(seq * block_size)
+                data = f.read(block_size)
+            self._call_raw(
+                "upload", "POST", "/drive/v1/medias/upload_part", f"上传第 {seq + 1}/{block_num} 个分片失败",
+                body={
+                    "upload_id": upload_id,
+                    "seq": str(seq),
+                    "size": str(len(data)),
+                    "checksum": str(zlib.adler32(data)),
+                },
+                files={"file": (form["file_name"], data)},
+                operation="upload_part"
+            )
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(part_workers, block_num))) as pool:
+            # list 触发迭代，任一分片失败时抛出其异常
+            list(pool.map(upload_part, range(block_num)))
+        
+        return self._call_raw(
+            "upload", "POST", "/drive/v1/medias/upload_finish", "分片上传完成失败",
+            body={"upload_id": upload_id, "block_num": block_num}, operation="upload_finish"
+        )
+    
+    def upload_field_attachments(self, 
+                                 app_token: str, 
+                                 file_paths: List[str],
+                                 parent_type: str = "bitable_file",
+                                 extra: Optional[Dict[str, Any]] = None,
+                                 max_workers: int = 4,
+                                 part_workers: int = 4) -> List[Dict[str, str]]:
+        """
+        并发上传一组文件，结果可直接作为附件字段的值
+        
+        与 download_field_attachments 对应，各线程共用 upload 限流器
+        
+        Args:
+            app_token: 多维表格的 app_token
+            file_paths: 本地文件路径列表
+            parent_type: 上传点类型
+            extra: 开启高级权限的多维表格需要的额外参数
+            max_workers: 并发上传的文件数
+            part_workers: 单个大文件分片上传的并发线程数
             
-            # 下载文件
-            if self.download_attachment(item, save_path):
-                downloaded_files.append(save_path)
-                # 成功下载一个后短暂暂停，避免请求频率过高
-                time.sleep(0.5)
+        Returns:
+            [{"file_token": ...}]，顺序与 file_paths 一致，如
+            batch_update_records(app_token, table_id, [{"record_id": ..., "fields": {"附件": 返回值}}])
+        """
+        if not file_paths:
+            return []
+        
+        def upload(path: str) -> Dict[str, str]:
+            return {"file_token": self.upload_attachment(
+                app_token, path, parent_type=parent_type, extra=extra, part_workers=part_workers
+            )}
         
-        return downloaded_files
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(file_paths)))) as pool:
+            return list(pool.map(upload, file_paths))
 
 
 # 使用示例
@@ -0,0 +1,284 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import zlib
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feishu_bitable_utils import FeishuBitableClient  # noqa: E402
+
+
+class FakeBitableServer:
+    """
+    测试用的本地开放平台服务
+
+    在后台线程中运行，实现客户端用到的多维表格接口，记录保存在 records 中，
+    搜索支持 field_names、isGreater/isLess/isEmpty/isNotEmpty 条件过滤和排序，按 page_token 偏移分页，数据表列表中的 revision 可由测试修改。字段中带有 "fail" 的批量写入请求返回错误，用于模拟部分分块失败。
+    附件下载接口对任意 file_token 都返回 attachment 的内容，支持 Range 请求。
+    附件上传接口按 adler32 校验每次上传和每个分片的 checksum，上传成功的文件内容保存在 uploaded 中，
+    corrupt_part 为分片序号时模拟该分片在传输中损坏。
+    throttle_every 为 N 时每第 N 个多维表格请求返回频率限制错误码
+    """
+
+    APP_TOKEN = "app_test"
+    TABLE_ID = "tbl_test"
+    FIELDS = [
+        {"field_id": "fld_text", "field_name": "文本", "type": 1},
+        {"field_id": "fld_number", "field_name": "数字", "type": 2},
+        {"field_id": "fld_date", "field_name": "日期", "type": 5},
+    ]
+
+    def __init__(self, records: int = 25, max_page_size: int = 10):
+        self.max_page_size = max_page_size
+        self.records = {}
+        self.calls = []
+        # 出现过的客户端地址，用于检查连接复用
+        self.connections = set()
+        self.attachment = bytes(range(256)) * 8
+        self.download_ranges = []
+        self.upload_block_size = 1024
+        self.uploads = {}
+        self.uploaded = {}
+        self.corrupt_part = None
+        self.throttle_every = 0
+        self.requests = 0
+        self.revision = 1
+        self._next_id = 0
+        self._lock = threading.Lock()
+        for _ in range(records):
+            self.add_record({"数字": self._next_id + 1})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def add_record(self, fields):
+        self._next_id += 1
+        record_id = f"rec{self._next_id:08d}"
+        self.records[record_id] = fields
+        return {"record_id": record_id, "fields": fields}
+
+    def handle(self, method, path, query, body, headers=None):
+        with self._lock:
+            self.calls.append((method, path, query, body))
+        if path == "/open-apis/auth/v3/tenant_access_token/internal":
+            return 200, {"code": 0, "msg": "ok", "tenant_access_token": "t-test", "expire": 7200}
+        if re.fullmatch(r"/open-apis/drive/v1/medias/[^/]+/download", path):
+            return self._download((headers or {}).get("Range"))
+        match = re.fullmatch(r"/open-apis/drive/v1/medias/(upload_all|upload_prepare|upload_part|upload_finish)", path)
+        if match:
+            with self._lock:
+                return self._upload(match.group(1), body or {})
+
+        if not path.startswith("/open-apis/bitable/v1/apps/"):
+            return 404, {"code": 404, "msg": f"not found: {path}"}
+        with self._lock:
+            self.requests += 1
+            if self.throttle_every and self.requests % self.throttle_every == 0:
+                return 200, {"code": 99991400, "msg": "request trigger frequency limit"}
+        if re.fullmatch(r"/open-apis/bitable/v1/apps/[^/]+/tables", path):
+            table = {"table_id": self.TABLE_ID, "name": "数据表", "revision": self.revision}
+            return 200, self._ok({"has_more": False, "page_token": "", "total": 1, "items": [table]})
+        if re.fullmatch(rf"/open-apis/bitable/v1/apps/[^/]+/tables/{self.TABLE_ID}/fields", path):
+            return 200, self._ok({"has_more": False, "page_token": "", "total": len(self.FIELDS), "items": self.FIELDS})
+
+        match = re.fullmatch(r"/open-apis/bitable/v1/apps/([^/]+)/tables/([^/]+)/records(?:/([^/]+))?", path)
+        if not match:
+            return 404, {"code": 404, "msg": f"not found: {path}"}
+        records = self.records if match.group(2) == self.TABLE_ID else {}
+        tail = match.group(3)
+        with self._lock:
+            if method == "POST" and tail == "search":
+                return 200, self._ok(self._search(records, query, body or {}))
+            if method == "POST" and tail in ("batch_create", "batch_update"):
+                items = body.get("records", [])
+                if any("fail" in (item.get("fields") or {}) for item in items):
+                    return 200, {"code": 1254001, "msg": "WrongRequestBody"}
+                if tail == "batch_create":
+                    return 200, self._ok({"records": [self.add_record(item["fields"]) for item in items]})
+                for item in items:
+                    records[item["record_id"]].update(item["fields"])
+                return 200, self._ok({"records": [self._record(records, item["record_id"]) for item in items]})
+            if method == "POST" and tail == "batch_delete":
+                deleted = [{"record_id": rid, "deleted": records.pop(rid, None) is not None} for rid in body["records"]]
+                return 200, self._ok({"records": deleted})
+            if method == "POST" and tail == "batch_get":
+                found = [rid for rid in body["record_ids"] if rid in records]
+                return 200, self._ok({
+                    "records": [self._record(records, rid) for rid in found],
+                    "absent_record_ids": [rid for rid in body["record_ids"] if rid not in records]
+                })
+            if method == "POST" and tail is None:
+                return 200, self._ok({"record": self.add_record(body["fields"])})
+            if tail in records:
+                if method == "GET":
+                    return 200, self._ok({"record": self._record(records, tail)})
+                if method == "PUT":
+                    records[tail].update(body["fields"])
+                    return 200, self._ok({"record": self._record(records, tail)})
+                if method == "DELETE":
+                    del records[tail]
+                    return 200, self._ok({"deleted": True, "record_id": tail})
+        return 200, {"code": 1254043, "msg": "RecordIdNotFound"}
+
+    def _download(self, range_header):
+        size = len(self.attachment)
+        self.download_ranges.append(range_header)
+        match = re.fullmatch(r"bytes=(\d+)-", range_header or "")
+        if not match:
+            return 200, self.attachment
+        start = int(match.group(1))
+        if start >= size:
+            return 416, {"code": 416, "msg": "range not satisfiable"}, {"Content-Range": f"bytes */{size}"}
+        return 206, self.attachment[start:], {"Content-Range": f"bytes {start}-{size - 1}/{size}"}
+
+    def _upload(self, step, body):
+        if step == "upload_prepare":
+            upload_id = f"upload{len(self.uploads) + 1}"
+            block_num = max(1, -(-int(body["size"]) // self.upload_block_size))
+            self.uploads[upload_id] = {"size": int(body["size"]), "block_num": block_num, "parts": {}}
+            return 200, self._ok({"upload_id": upload_id, "block_size": self.upload_block_size, "block_num": block_num})
+        if step == "upload_finish":
+            upload = self.uploads[body["upload_id"]]
+            data = b"".join(upload["parts"][seq] for seq in sorted(upload["parts"]))
+            if len(upload["parts"]) != int(body["block_num"]) or len(data) != upload["size"]:
+                return 200, {"code": 1061002, "msg": "params error: incomplete upload"}
+            return 200, self._ok({"file_token": self._finish_upload(data)})
+
+        data = body.get("file", b"")
+        if step == "upload_part" and int(body["seq"]) == self.corrupt_part:
+            data = bytes([data[0] ^ 0xFF]) + data[1:]
+        if int(body["size"]) != len(data) or int(body["checksum"]) != zlib.adler32(data):
+            return 200, {"code": 1062008, "msg": "checksum param Invalid"}
+        if step == "upload_all":
+            return 200, self._ok({"file_token": self._finish_upload(data)})
+        self.uploads[body["upload_id"]]["parts"][int(body["seq"])] = data
+        return 200, self._ok({})
+
+    def _finish_upload(self, data):
+        file_token = f"boxup{len(self.uploaded) + 1}"
+        self.uploaded[file_token] = data
+        return file_token
+
+    @staticmethod
+    def _ok(data):
+        return {"code": 0, "msg": "success", "data": data}
+
+    @staticmethod
+    def _record(records, record_id):
+        return {"record_id": record_id, "fields": records[record_id]}
+
+    def _search(self, records, query, body):
+        page_size = min(int(query.get("page_size", 20)), self.max_page_size)
+        offset = int(query.get("page_token") or 0)
+        ids = list(records)
+        for condition in (body.get("filter") or {}).get("conditions", []):
+            # 日期条件的值为 ["ExactDate", 毫秒时间戳]，这里按毫秒而不是按天比较
+            name, operator = condition["field_name"], condition["operator"]
+            if operator == "isEmpty":
+                ids = [rid for rid in ids if records[rid].get(name) is None]
+            elif operator == "isNotEmpty":
+                ids = [rid for rid in ids if records[rid].get(name) is not None]
+            elif operator == "isGreater":
+                since = int(condition["value"][-1])
+                ids = [rid for rid in ids if (records[rid].get(name) or 0) > since]
+            else:
+                assert operator == "isLess"
+                until = int(condition["value"][-1])
+                ids = [rid for rid in ids if records[rid].get(name) is not None and records[rid][name] < until]
+        for sort in reversed(body.get("sort") or []):
+            ids.sort(key=lambda rid: records[rid].get(sort["field_name"]) or 0, reverse=sort.get("desc", False))
+        items = []
+        for record_id in ids[offset:offset + page_size]:
+            item = self._record(records, record_id)
+            if body.get("field_names"):
+                item["fields"] = {name: value for name, value in item["fields"].items() if name in body["field_names"]}
+            items.append(item)
+        has_more = offset + page_size < len(ids)
+        return {
+            "has_more": has_more,
+            "page_token": str(offset + page_size) if has_more else "",
+            "total": len(ids),
+            "items": items
+        }
+
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        # 支持长连接
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _dispatch(self):
+            server.connections.add(self.client_address)
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            parts = urlsplit(self.path)
+            query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+            content_type = self.headers.get("Content-Type") or ""
+            if content_type.startswith("multipart/form-data"):
+                body = self._parse_form(content_type, raw)
+            else:
+                body = json.loads(raw) if raw else None
+            status, payload, *extra = server.handle(self.command, parts.path, query, body, self.headers)
+            if isinstance(payload, bytes):
+                data, content_type = payload, "application/octet-stream"
+            else:
+                data, content_type = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (extra[0] if extra else {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        @staticmethod
+        def _parse_form(content_type, raw):
+            """解析 multipart 表单，文件字段保留为 bytes，其余字段解码为字符串"""
+            message = BytesParser(policy=default_policy).parsebytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode() + raw
+            )
+            form = {}
+            for part in message.iter_parts():
+                value = part.get_payload(decode=True) or b""
+                form[part.get_param("name", header="content-disposition")] = value if part.get_filename() else value.decode("utf-8")
+            return form
+
+        do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+    return Handler
+
+
+@pytest.fixture
+def server():
+    srv = FakeBitableServer()
+    yield srv
+    srv.stop()
+
+
+@pytest.fixture
+def client(server):
+    # SDK 请求、令牌请求和直接解析的请求都发往本地服务
+    client = FeishuBitableClient("app_id", "app_secret", base_url=server.url, sdk_log_level=logging.ERROR)
+    yield client
+    client.close()
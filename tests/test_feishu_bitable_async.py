@@ -0,0 +1,167 @@
+import asyncio
+
+import httpx
+import pytest
+
+from feishu_bitable_async import AsyncFeishuBitableClient
+from feishu_bitable_utils import BatchOperationError, ClientMetrics, RecordCache, SchemaCache
+
+TOKEN_PATH = "/open-apis/auth/v3/tenant_access_token/internal"
+
+
+def run(server, scenario, **client_kwargs):
+    """在新的事件循环中创建指向本地服务的客户端并执行 scenario(client)"""
+    async def main():
+        async with AsyncFeishuBitableClient("app_id", "app_secret", base_url=server.url, **client_kwargs) as client:
+            return await scenario(client)
+
+    return asyncio.run(main())
+
+
+def test_record_calls_share_one_pooled_http_client(server):
+    """记录请求与令牌请求都经调用方传入的 httpx 连接池发出，令牌只获取一次"""
+    paths = []
+
+    async def record(request):
+        paths.append(request.url.path)
+
+    async def main():
+        async with httpx.AsyncClient(event_hooks={"request": [record]}) as http:
+            async with AsyncFeishuBitableClient("app_id", "app_secret", base_url=server.url, http=http) as client:
+                pages = [page async for page in client.iter_record_pages(server.APP_TOKEN, server.TABLE_ID, page_size=10)]
+            # 外部传入的连接池由调用方关闭
+            assert not http.is_closed
+            return pages
+
+    pages = asyncio.run(main())
+
+    assert [item["record_id"] for page in pages for item in page["items"]] == list(server.records)
+    assert paths.count(TOKEN_PATH) == 1
+    assert sum(path.endswith("/records/search") for path in paths) == 3
+
+
+def test_concurrent_searches_fetch_token_once(server):
+
+    async def scenario(client):
+        return await asyncio.gather(*(
+            client.search_records(server.APP_TOKEN, server.TABLE_ID, page_size=5) for _ in range(20)
+        ))
+
+    results = run(server, scenario)
+
+    assert all(len(result["items"]) == 5 for result in results)
+    assert sum(path == TOKEN_PATH for method, path, query, body in server.calls) == 1
+
+
+def test_batch_create_reports_partial_failure_and_fills_record_cache(server):
+    rows = [{"n": i} for i in range(6)]
+    rows[3]["fail"] = True
+
+    async def scenario(client):
+        with pytest.raises(BatchOperationError) as excinfo:
+            await client.batch_create_records(server.APP_TOKEN, server.TABLE_ID, rows, chunk_size=2)
+        created = excinfo.value.result["records"]
+        requests_before = server.requests
+        cached = await client.get_records(server.APP_TOKEN, server.TABLE_ID, [record["record_id"] for record in created])
+        return excinfo.value.result, cached, server.requests - requests_before
+
+    result, cached, requests = run(server, scenario, record_cache=RecordCache())
+
+    assert [chunk["success"] for chunk in result["chunks"]] == [True, False, True]
+    assert "1254001" in result["chunks"][1]["error"]
+    assert [record["fields"]["n"] for record in result["records"]] == [0, 1, 4, 5]
+    assert list(cached.values()) == result["records"]
+    assert requests == 0
+
+
+def test_get_records_fetches_misses_in_batches(server):
+    record_ids = list(server.records)
+
+    async def scenario(client):
+        return await client.get_records(server.APP_TOKEN, server.TABLE_ID, record_ids + record_ids[:3])
+
+    result = run(server, scenario)
+
+    assert list(result) == record_ids
+    assert sum(path.endswith("/records/batch_get") for method, path, query, body in server.calls) == 1
+
+
+def test_retries_throttled_requests(server, monkeypatch):
+    monkeypatch.setattr("feishu_bitable_async._backoff_delay", lambda attempt: 0)
+    server.throttle_every = 2
+
+    async def scenario(client):
+        records = [record async for record in client.iter_records(server.APP_TOKEN, server.TABLE_ID, page_size=10)]
+        return records, client._sync.rate_limiters["search"].throttled
+
+    records, throttled = run(server, scenario)
+
+    assert [record["record_id"] for record in records] == list(server.records)
+    assert throttled == 2
+
+
+def test_download_resumes_leftover_part_file(server, tmp_path):
+    save_path = tmp_path / "file.bin"
+    half = len(server.attachment) // 2
+    (tmp_path / "file.bin.part").write_bytes(server.attachment[:half])
+
+    async def scenario(client):
+        return await client.download_attachment({
+            "url": f"{server.url}/open-apis/drive/v1/medias/box/download",
+            "name": "file.bin",
+            "size": len(server.attachment),
+        }, str(save_path))
+
+    assert run(server, scenario)
+    assert save_path.read_bytes() == server.attachment
+    assert server.download_ranges == [f"bytes={half}-"]
+
+
+def test_schema_cache_skips_repeat_requests(server):
+
+    async def scenario(client):
+        tables = await client.get_all_tables(server.APP_TOKEN)
+        first = await client.get_all_fields(server.APP_TOKEN, server.TABLE_ID)
+        requests_before = server.requests
+        second = await client.get_all_fields(server.APP_TOKEN, server.TABLE_ID)
+        return tables, first, second, server.requests - requests_before
+
+    tables, first, second, requests = run(server, scenario, schema_cache=SchemaCache())
+
+    assert [table["table_id"] for table in tables] == [server.TABLE_ID]
+    assert [field["field_name"] for field in first] == [field["field_name"] for field in server.FIELDS]
+    assert first == second
+    assert requests == 0
+
+
+def test_raw_decode_matches_sdk_results(server):
+    record_ids = list(server.records)
+
+    async def scenario(client):
+        return (
+            await client.get_all_records(server.APP_TOKEN, server.TABLE_ID),
+            await client.get_record(server.APP_TOKEN, server.TABLE_ID, record_ids[0]),
+            await client.get_records(server.APP_TOKEN, server.TABLE_ID, record_ids[:5]),
+        )
+
+    assert run(server, scenario, raw_decode=True) == run(server, scenario)
+
+
+def test_metrics_label_operations_and_downloads(server, tmp_path):
+    metrics = ClientMetrics()
+
+    async def scenario(client):
+        await client.get_all_fields(server.APP_TOKEN, server.TABLE_ID)
+        await client.get_all_records(server.APP_TOKEN, server.TABLE_ID)
+        await client.download_attachment({
+            "url": f"{server.url}/open-apis/drive/v1/medias/box/download",
+            "name": "file.bin",
+            "size": len(server.attachment),
+        }, str(tmp_path / "file.bin"))
+
+    run(server, scenario, metrics=metrics)
+
+    counters = metrics.snapshot()["counters"]
+    operations = {dict(labels)["operation"] for name, labels in counters if name == "requests_total"}
+    assert operations == {"fields.list", "records.search"}
+    assert counters[("download_bytes_total", ())] == len(server.attachment)
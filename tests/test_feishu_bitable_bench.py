@@ -0,0 +1,23 @@
+import logging
+
+import pytest
+
+from feishu_bitable_bench import MockBitableServer, format_results, run_benchmarks
+from feishu_bitable_utils import DEFAULT_RATE_LIMITS, FeishuBitableClient
+
+
+@pytest.mark.parametrize("raw_decode", [False, True])
+def test_run_benchmarks_against_mock_server(monkeypatch, raw_decode):
+    monkeypatch.setattr("feishu_bitable_utils._backoff_delay", lambda attempt: 0)
+    unlimited = {name: 1e6 for name in DEFAULT_RATE_LIMITS}
+
+    with MockBitableServer(records=120, max_page_size=50, throttle_every=7, attachment_size=64 * 1024) as server:
+        with FeishuBitableClient("app_id", "app_secret", log_level=logging.ERROR,
+                                 rate_limits=unlimited, raw_decode=raw_decode, base_url=server.url) as client:
+            results = run_benchmarks(server, client, iterations=4, page_size=50, prefetch=1, batch_size=20)
+
+    by_name = {result["name"]: result for result in results}
+    assert by_name["iter_record_pages"]["records_per_sec"] > 0
+    assert by_name["download_attachment"]["mb_per_sec"] > 0
+    assert all(result["calls"] > 0 for result in results)
+    assert "search_records" in format_results(results)
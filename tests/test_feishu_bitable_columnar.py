@@ -0,0 +1,52 @@
+import math
+
+import pytest
+
+from feishu_bitable_columnar import ColumnarExporter
+
+DAY_MS = 24 * 3600 * 1000
+
+
+@pytest.fixture
+def exporter(server, client):
+    for i, fields in enumerate(server.records.values()):
+        fields.update({"文本": [{"type": "text", "text": f"t{i}"}], "数字": i * 1.5, "日期": 1_700_000_000_000 + i * DAY_MS})
+    # 缺失值
+    del next(iter(server.records.values()))["数字"]
+    return ColumnarExporter(client, server.APP_TOKEN, server.TABLE_ID, page_size=10, prefetch=0)
+
+
+def test_columns_follow_field_types(exporter):
+    assert exporter.columns() == [("文本", "string"), ("数字", "float64"), ("日期", "timestamp")]
+
+
+def test_to_arrow_and_parquet(server, exporter, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    table = exporter.to_arrow()
+
+    assert table.num_rows == 25
+    assert table.schema.field("日期").type == pa.timestamp("ms")
+    assert table.column("record_id").to_pylist() == list(server.records)
+    assert table.column("文本").to_pylist()[:2] == ["t0", "t1"]
+    assert table.column("数字").to_pylist()[:2] == [None, 1.5]
+
+    path = str(tmp_path / "table.parquet")
+    assert exporter.to_parquet(path) == 25
+    parquet = pq.ParquetFile(path)
+    # 每页一个行组
+    assert parquet.num_row_groups == 3
+    assert parquet.read().equals(table)
+
+
+def test_to_numpy(exporter):
+    np = pytest.importorskip("numpy")
+
+    arrays = exporter.to_numpy()
+
+    assert sorted(arrays) == ["数字", "日期"]
+    assert math.isnan(arrays["数字"][0])
+    assert arrays["数字"][1:3].tolist() == [1.5, 3.0]
+    assert arrays["日期"].dtype == np.dtype("datetime64[ms]")
+    assert (arrays["日期"][1] - arrays["日期"][0]) == np.timedelta64(DAY_MS, "ms")
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from feishu_bitable_export import MANIFEST_NAME, export_base
+
+
+def test_export_base_writes_jsonl_and_manifest(server, client, tmp_path):
+    manifest = export_base(client, server.APP_TOKEN, str(tmp_path), page_size=10)
+
+    assert manifest == json.loads((tmp_path / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert manifest["failed"] == []
+    assert manifest["total_rows"] == 25
+    entry, = manifest["tables"]
+    assert (entry["table_id"], entry["revision"], entry["rows"]) == (server.TABLE_ID, server.revision, 25)
+    assert [field["field_name"] for field in entry["fields"]] == [field["field_name"] for field in server.FIELDS]
+    lines = (tmp_path / entry["file"]).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["record_id"] for line in lines] == list(server.records)
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_export_base_parquet_fetches_fields_once(server, client, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    manifest = export_base(client, server.APP_TOKEN, str(tmp_path), output_format="parquet", page_size=10)
+
+    entry, = manifest["tables"]
+    assert pq.read_table(tmp_path / entry["file"]).num_rows == 25
+    assert sum(path.endswith("/fields") for method, path, query, body in server.calls) == 1
+
+
+def test_export_base_rejects_unknown_format(client, tmp_path):
+    with pytest.raises(ValueError):
+        export_base(client, "app_test", str(tmp_path), output_format="csv")
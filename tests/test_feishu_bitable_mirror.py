@@ -0,0 +1,72 @@
+import pytest
+
+from feishu_bitable_mirror import BitableMirror
+
+MODIFIED = "最后更新时间"
+
+
+@pytest.fixture
+def mirror(server, client, tmp_path):
+    for i, fields in enumerate(server.records.values()):
+        fields[MODIFIED] = 1_700_000_000_000 + i * 1000
+    mirror = BitableMirror(
+        client, server.APP_TOKEN, server.TABLE_ID, str(tmp_path / "mirror.db"),
+        page_size=10, prefetch=0, overlap_ms=0
+    )
+    yield mirror
+    mirror.close()
+
+
+def test_delta_sync_fetches_only_changed_records(server, mirror):
+    report = mirror.sync()
+    assert (report["mode"], report["upserted"]) == ("full", 25)
+    assert mirror.count() == 25
+    watermark = mirror.watermark
+
+    changed = list(server.records)[:2]
+    for i, record_id in enumerate(changed):
+        server.records[record_id].update({"数字": -1, MODIFIED: watermark + 1000 * (i + 1)})
+    added = server.add_record({"数字": 99, MODIFIED: watermark + 5000})["record_id"]
+
+    report = mirror.sync()
+
+    assert report["mode"] == "delta"
+    assert report["upserted"] == 3
+    assert mirror.watermark == watermark + 5000
+    assert mirror.get(changed[0])["fields"]["数字"] == -1
+    assert mirror.get(added)["fields"]["数字"] == 99
+    assert mirror.count() == 26
+
+
+def test_reconcile_removes_deleted_records(server, mirror):
+    mirror.sync()
+    deleted = list(server.records)[:2]
+    for record_id in deleted:
+        del server.records[record_id]
+
+    mirror.reconcile_interval = 0
+    report = mirror.sync()
+
+    assert report["deleted"] == 2
+    assert mirror.count() == 23
+    assert mirror.get(deleted[0]) is None
+
+
+def test_interrupted_full_load_keeps_full_mode(server, client, mirror):
+    """全量同步中途失败时回滚，水位线不变，下次同步仍走全量"""
+    iter_record_pages = client.iter_record_pages
+
+    def failing_pages(**kwargs):
+        pages = iter_record_pages(**kwargs)
+        yield next(pages)
+        raise RuntimeError("connection reset")
+
+    client.iter_record_pages = failing_pages
+    with pytest.raises(RuntimeError):
+        mirror.sync()
+    del client.iter_record_pages
+
+    assert mirror.watermark is None
+    assert mirror.count() == 0
+    assert mirror.sync()["mode"] == "full"
+    assert mirror.count() == 25
@@ -0,0 +1,690 @@
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+
+from feishu_bitable_utils import (
+    AttachmentCache,
+    BatchOperationError,
+    ClientMetrics,
+    FeishuBitableClient,
+    RateLimiter,
+    RecordCache,
+    SchemaCache,
+    TenantAccessTokenManager,
+)
+
+
+# ---------------------------------------------------------------- 令牌
+
+
+def test_token_refresh_is_single_flight():
+    """并发获取令牌时只请求一次新令牌"""
+    calls = []
+
+    def fetcher():
+        calls.append(1)
+        time.sleep(0.2)
+        return "token", 7200
+
+    manager = TenantAccessTokenManager(fetcher)
+    barrier = threading.Barrier(16)
+    tokens = []
+
+    def worker():
+        barrier.wait()
+        tokens.append(manager.get_token())
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert tokens == ["token"] * 16
+    assert len(calls) == 1
+    assert manager.stats() == {"hits": 15, "misses": 1, "refreshes": 1, "failures": 0}
+
+
+def test_token_refreshes_ahead_of_expiry_and_keeps_valid_token_on_failure():
+    responses = [("t1", 100), ("", 0), ("t2", 7200)]
+    manager = TenantAccessTokenManager(lambda: responses.pop(0), refresh_ahead=300)
+
+    assert manager.get_token() == "t1"
+    # 剩余有效期不足 refresh_ahead，每次获取都会尝试刷新；刷新失败时沿用未过期的旧令牌
+    assert manager.get_token() == "t1"
+    assert manager.get_token() == "t2"
+    assert manager.get_token() == "t2"
+    assert manager.stats() == {"hits": 1, "misses": 3, "refreshes": 2, "failures": 1}
+
+
+def test_token_force_refresh_and_invalidate():
+    tokens = iter(["t1", "t2", "t3"])
+    manager = TenantAccessTokenManager(lambda: (next(tokens), 7200))
+
+    assert manager.get_token() == "t1"
+    assert manager.get_token(force_refresh=True) == "t2"
+    manager.invalidate()
+    assert manager.get_token() == "t3"
+
+
+# ---------------------------------------------------------------- 分页迭代
+
+
+def test_iter_record_pages_resumes_from_page_token(server, client):
+    """中断后用最后一页的 page_token 续读，不重复也不遗漏记录"""
+    pages = client.iter_record_pages(server.APP_TOKEN, server.TABLE_ID, page_size=10)
+    first = next(pages)
+    pages.close()
+
+    resumed = list(client.iter_record_pages(
+        server.APP_TOKEN, server.TABLE_ID, page_size=10, page_token=first["page_token"]
+    ))
+    record_ids = [item["record_id"] for page in [first] + resumed for item in page["items"]]
+
+    assert len(resumed) == 2
+    assert record_ids == list(server.records)
+
+
+def test_iter_records_sends_user_id_type(server, client):
+    records = list(client.iter_records(server.APP_TOKEN, server.TABLE_ID, page_size=10, user_id_type="union_id"))
+
+    assert [record["record_id"] for record in records] == list(server.records)
+    searches = [query for method, path, query, body in server.calls if path.endswith("/records/search")]
+    assert [query["user_id_type"] for query in searches] == ["union_id"] * 3
+
+
+# ---------------------------------------------------------------- 分页预取
+
+
+def sdk_page(items, next_token=None):
+    """构造与 SDK 响应结构相同的一页"""
+    return SimpleNamespace(data=SimpleNamespace(items=items, has_more=next_token is not None, page_token=next_token))
+
+
+def test_prefetch_yields_all_pages_in_order(server, client):
+    pages = list(client.iter_record_pages(server.APP_TOKEN, server.TABLE_ID, page_size=10, prefetch=2))
+    record_ids = [item["record_id"] for page in pages for item in page["items"]]
+
+    assert len(pages) == 3
+    assert record_ids == list(server.records)
+
+
+def test_prefetch_propagates_fetch_error(client):
+    """后台线程中的请求异常在消费到对应位置时抛出"""
+    def fetch_page(token):
+        if token == "2":
+            raise RuntimeError("boom")
+        return sdk_page([token], str(int(token or 0) + 1))
+
+    pages = client._iter_pages(fetch_page, lambda page: page.data.items, prefetch=2)
+
+    assert next(pages) == [None]
+    assert next(pages) == ["1"]
+    with pytest.raises(RuntimeError, match="boom"):
+        next(pages)
+
+
+def test_prefetch_stops_when_consumer_closes(client):
+    """调用方提前关闭迭代器后后台线程停止预取"""
+    fetched = []
+
+    def fetch_page(token):
+        fetched.append(token)
+        return sdk_page([], str(len(fetched)))
+
+    pages = client._iter_pages(fetch_page, lambda page: page.data.items, prefetch=2)
+    next(pages)
+    pages.close()
+
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline and any(t.name == "FeishuBitablePrefetch" for t in threading.enumerate()):
+        time.sleep(0.05)
+    assert not any(t.name == "FeishuBitablePrefetch" for t in threading.enumerate())
+    # 预取深度为 2：已消费 1 页、队列中 2 页，另有 1 页可能正在等待入队
+    assert len(fetched) <= 4
+
+
+# ---------------------------------------------------------------- 分块提交
+
+
+def test_dispatch_chunks_keeps_input_order(client):
+    """分块完成顺序与输入顺序不同时，报告仍按输入顺序排列"""
+    def send_chunk(chunk):
+        time.sleep(0.05 if chunk[0] == 0 else 0)
+        return chunk
+
+    reports = client._dispatch_chunks(list(range(10)), 3, 4, send_chunk)
+
+    assert [report["index"] for report in reports] == [0, 1, 2, 3]
+    assert [report["start"] for report in reports] == [0, 3, 6, 9]
+    assert [report["count"] for report in reports] == [3, 3, 3, 1]
+    assert [item for report in reports for item in report["result"]] == list(range(10))
+
+
+def test_batch_create_reports_partial_failure(server, client):
+    rows = [{"n": i} for i in range(6)]
+    rows[3]["fail"] = True
+
+    with pytest.raises(BatchOperationError) as excinfo:
+        client.batch_create_records(server.APP_TOKEN, server.TABLE_ID, rows, chunk_size=2)
+
+    result = excinfo.value.result
+    assert [chunk["success"] for chunk in result["chunks"]] == [True, False, True]
+    assert result["chunks"][1]["start"] == 2
+    assert "1254001" in result["chunks"][1]["error"]
+    assert [record["fields"]["n"] for record in result["records"]] == [0, 1, 4, 5]
+
+    result = client.batch_create_records(
+        server.APP_TOKEN, server.TABLE_ID, rows, chunk_size=2, raise_on_error=False
+    )
+    assert [chunk["success"] for chunk in result["chunks"]] == [True, False, True]
+
+
+def test_batch_update_and_delete_in_chunks(server, client):
+    record_ids = list(server.records)[:5]
+
+    result = client.batch_update_records(
+        server.APP_TOKEN, server.TABLE_ID,
+        [{"record_id": record_id, "fields": {"n": i}} for i, record_id in enumerate(record_ids)],
+        chunk_size=2
+    )
+    assert [record["fields"]["n"] for record in result["records"]] == list(range(5))
+
+    assert client.batch_delete_records(server.APP_TOKEN, server.TABLE_ID, record_ids, chunk_size=2)
+    assert not set(record_ids) & set(server.records)
+    assert sum(path.endswith("/records/batch_delete") for method, path, query, body in server.calls) == 3
+
+
+# ---------------------------------------------------------------- 限流
+
+
+def test_rate_limiter_backs_off_and_recovers():
+    limiter = RateLimiter(rate=20, increase=5)
+
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.rate == 5
+    assert limiter.reserve() > 0
+
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.rate == limiter.max_rate == 20
+    assert limiter.throttled == 2
+
+
+def test_throttled_searches_are_retried(server, client, monkeypatch):
+    monkeypatch.setattr("feishu_bitable_utils._backoff_delay", lambda attempt: 0)
+    server.throttle_every = 2
+
+    records = list(client.iter_records(server.APP_TOKEN, server.TABLE_ID, page_size=10))
+
+    limiter = client.rate_limiters["search"]
+    assert [record["record_id"] for record in records] == list(server.records)
+    assert limiter.throttled == 2
+    assert limiter.rate < limiter.max_rate
+
+    # 不再限流后速率逐步回升
+    server.throttle_every = 0
+    throttled_rate = limiter.rate
+    list(client.iter_records(server.APP_TOKEN, server.TABLE_ID, page_size=10))
+    assert limiter.rate > throttled_rate
+
+
+# ---------------------------------------------------------------- 附件下载
+
+
+def test_rate_limiter_spaces_out_requests():
+    limiter = RateLimiter(rate=20, burst=1)
+
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+
+    # 首个令牌立即可用，其余 4 个各需等待 1/20 秒
+    assert time.monotonic() - start >= 0.19
+
+
+def test_download_records_attachments(server, client, tmp_path):
+    records = [
+        {"record_id": f"rec{i}", "fields": {"附件": [
+            {"url": f"{server.url}/open-apis/drive/v1/medias/box{i}{j}/download", "name": f"{j}.bin"} for j in range(2)
+        ]}}
+        for i in range(3)
+    ]
+    records.append({"record_id": "rec_empty", "fields": {}})
+    progress = []
+
+    report = client.download_records_attachments(
+        records, "附件", str(tmp_path), max_workers=4,
+        progress_callback=lambda done, total, path, success: progress.append((done, total, success))
+    )
+
+    assert report["total"] == report["succeeded"] == 6
+    assert report["failed"] == []
+    assert report["bytes"] == 6 * len(server.attachment)
+    assert [path.rsplit("/", 1)[-1].split("_")[0] for path in report["files"]] == ["rec0", "rec0", "rec1", "rec1", "rec2", "rec2"]
+    assert all(open(path, "rb").read() == server.attachment for path in report["files"])
+    assert sorted(done for done, total, success in progress) == list(range(1, 7))
+    # 令牌只获取一次，各下载线程共用
+    assert sum(path.endswith("/tenant_access_token/internal") for method, path, query, body in server.calls) == 1
+
+
+def test_token_and_downloads_reuse_one_session_connection(server, client, tmp_path):
+    jobs = [
+        ({"url": f"{server.url}/open-apis/drive/v1/medias/box{i}/download", "name": f"{i}.bin"}, str(tmp_path / f"{i}.bin"))
+        for i in range(5)
+    ]
+
+    with client:
+        report = client.download_attachments(jobs, max_workers=1)
+
+    assert report["succeeded"] == 5
+    # 令牌请求和 5 次下载都经过同一个长连接
+    assert len(server.connections) == 1
+
+
+def attachment_item(server, name="file.bin", **extra):
+    return {"url": f"{server.url}/open-apis/drive/v1/medias/box/download", "name": name, **extra}
+
+
+def test_download_resumes_leftover_part_file(server, client, tmp_path):
+    save_path = tmp_path / "file.bin"
+    half = len(server.attachment) // 2
+    (tmp_path / "file.bin.part").write_bytes(server.attachment[:half])
+
+    assert client.download_attachment(attachment_item(server, size=len(server.attachment)), str(save_path))
+
+    assert save_path.read_bytes() == server.attachment
+    assert not (tmp_path / "file.bin.part").exists()
+    assert server.download_ranges == [f"bytes={half}-"]
+
+
+def test_download_rejects_size_mismatch(server, client, tmp_path):
+    save_path = tmp_path / "file.bin"
+
+    assert not client.download_attachment(attachment_item(server, size=len(server.attachment) + 1), str(save_path))
+
+    assert not save_path.exists()
+    assert not (tmp_path / "file.bin.part").exists()
+
+
+def test_attachment_cache_hit_skips_download(server, client, tmp_path):
+    cache = client.attachment_cache = AttachmentCache(str(tmp_path / "cache"))
+    item = attachment_item(server, file_token="box", size=len(server.attachment))
+
+    assert client.download_attachment(item, str(tmp_path / "a.bin"))
+    assert client.download_attachment(item, str(tmp_path / "b.bin"))
+
+    assert len(server.download_ranges) == 1
+    assert cache.stats()["hits"] == 1
+    # 缓存与下载的文件互不影响
+    (tmp_path / "a.bin").write_bytes(b"edited")
+    assert client.download_attachment(item, str(tmp_path / "c.bin"))
+    assert (tmp_path / "c.bin").read_bytes() == server.attachment
+
+
+def test_attachment_cache_evicts_least_recently_used(tmp_path):
+    cache = AttachmentCache(str(tmp_path / "cache"), max_bytes=2500)
+    src = tmp_path / "src.bin"
+    src.write_bytes(b"x" * 1000)
+
+    cache.put("a", str(src))
+    cache.put("b", str(src))
+    os.utime(cache._path("a"), (1, 1))
+    os.utime(cache._path("b"), (2, 2))
+    # 读取 a 后 b 成为最久未使用的条目
+    assert cache.get("a")
+    cache.put("c", str(src))
+
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+    assert cache.stats()["evictions"] == 1
+
+
+# ---------------------------------------------------------------- 结构缓存
+
+
+def test_schema_cache_invalidates_fields_on_revision_change(server, client, tmp_path):
+    client.schema_cache = SchemaCache(str(tmp_path / "schema.json"))
+
+    fields = client.get_all_fields(server.APP_TOKEN, server.TABLE_ID)
+    requests_before = server.requests
+    assert client.get_all_fields(server.APP_TOKEN, server.TABLE_ID) == fields
+    assert server.requests == requests_before
+
+    # 数据表 revision 变化后，刷新数据表列表会使字段缓存失效
+    server.revision = 2
+    client.get_all_tables(server.APP_TOKEN, use_cache=False)
+    requests_before = server.requests
+    assert client.get_all_fields(server.APP_TOKEN, server.TABLE_ID) == fields
+    assert server.requests == requests_before + 1
+
+
+def test_schema_cache_persists_to_file(server, client, tmp_path):
+    path = str(tmp_path / "schema.json")
+    client.schema_cache = SchemaCache(path)
+    fields = client.get_all_fields(server.APP_TOKEN, server.TABLE_ID)
+
+    client.schema_cache = SchemaCache(path)
+    requests_before = server.requests
+    assert client.get_all_fields(server.APP_TOKEN, server.TABLE_ID) == fields
+    assert server.requests == requests_before
+
+
+# ---------------------------------------------------------------- 记录缓存
+
+
+def test_get_records_dedupes_and_chunks_cache_misses(server, client):
+    client.record_cache = RecordCache()
+    record_ids = list(server.records)
+    client.get_record(server.APP_TOKEN, server.TABLE_ID, record_ids[0])
+    absent = [f"rec_absent{i}" for i in range(100)]
+
+    result = client.get_records(server.APP_TOKEN, server.TABLE_ID, record_ids + record_ids[:5] + absent)
+
+    assert sorted(result) == sorted(record_ids)
+    batch_gets = [body["record_ids"] for method, path, query, body in server.calls if path.endswith("/batch_get")]
+    # 命中缓存的 1 条不再请求，其余 124 个去重后按 100 条分块
+    assert sorted(len(ids) for ids in batch_gets) == [24, 100]
+    assert record_ids[0] not in batch_gets[0] + batch_gets[1]
+
+    requests_before = server.requests
+    assert client.get_records(server.APP_TOKEN, server.TABLE_ID, record_ids) == result
+    assert server.requests == requests_before
+
+
+def test_record_cache_stays_coherent_with_writes(server, client):
+    client.record_cache = RecordCache()
+    record_id = list(server.records)[0]
+
+    record = client.get_record(server.APP_TOKEN, server.TABLE_ID, record_id)
+    record["fields"]["数字"] = "mutated by caller"
+    assert client.get_record(server.APP_TOKEN, server.TABLE_ID, record_id)["fields"]["数字"] == 1
+
+    client.update_record(server.APP_TOKEN, server.TABLE_ID, record_id, {"文本": "updated"})
+    requests_before = server.requests
+    assert client.get_record(server.APP_TOKEN, server.TABLE_ID, record_id)["fields"] == {"数字": 1, "文本": "updated"}
+    assert server.requests == requests_before
+
+    client.delete_record(server.APP_TOKEN, server.TABLE_ID, record_id)
+    assert client.record_cache.get(server.APP_TOKEN, server.TABLE_ID, record_id) is None
+
+
+# ---------------------------------------------------------------- 写缓冲
+
+
+def test_write_buffer_coalesces_updates(server, client):
+    first, second = list(server.records)[:2]
+
+    with client.write_buffer(server.APP_TOKEN, server.TABLE_ID, flush_interval=None) as buffer:
+        futures = [
+            buffer.update(first, {"数字": -1}),
+            buffer.update(first, {"文本": "merged"}),
+            buffer.update(second, {"数字": -2}),
+        ]
+        created = buffer.create({"数字": 100})
+        assert not any(future.done() for future in futures)
+
+    updates = [body["records"] for method, path, query, body in server.calls if path.endswith("/batch_update")]
+    assert updates == [[
+        {"record_id": first, "fields": {"数字": -1, "文本": "merged"}},
+        {"record_id": second, "fields": {"数字": -2}},
+    ]]
+    assert futures[0].result() == futures[1].result() == {"record_id": first, "fields": {"数字": -1, "文本": "merged"}}
+    assert server.records[created.result()["record_id"]] == {"数字": 100}
+    assert client._write_buffers == []
+
+
+def test_write_buffer_routes_chunk_errors_to_futures(server, client):
+    record_id = list(server.records)[0]
+    buffer = client.write_buffer(server.APP_TOKEN, server.TABLE_ID, flush_interval=None)
+    updated = buffer.update(record_id, {"数字": -1})
+    failed = buffer.create({"fail": True})
+
+    client.close()
+
+    assert updated.result()["fields"]["数字"] == -1
+    with pytest.raises(Exception, match="1254001"):
+        failed.result()
+    with pytest.raises(RuntimeError):
+        buffer.update(record_id, {"数字": 0})
+
+
+def test_write_buffer_flushes_on_size_and_interval(server, client):
+    with client.write_buffer(server.APP_TOKEN, server.TABLE_ID, max_records=2, flush_interval=None) as buffer:
+        futures = [buffer.create({"数字": i}) for i in range(2)]
+        assert all(future.done() for future in futures)
+
+    with client.write_buffer(server.APP_TOKEN, server.TABLE_ID, flush_interval=0.1) as buffer:
+        future = buffer.create({"数字": 1})
+        assert future.result(timeout=2)["fields"] == {"数字": 1}
+
+
+# ---------------------------------------------------------------- upsert
+
+
+def test_upsert_records_writes_only_changes(server, client):
+    for i, fields in enumerate(server.records.values()):
+        fields.update({"编号": f"K{i}", "文本": [{"type": "text", "text": f"t{i}"}], "数字": i})
+    record_ids = list(server.records)
+
+    report = client.upsert_records(server.APP_TOKEN, server.TABLE_ID, [
+        {"编号": "K0", "文本": "t0", "数字": 0},
+        {"编号": "K1", "文本": "t1", "数字": -1},
+        {"编号": "K99", "文本": "new", "数字": 99},
+    ], key_field="编号")
+
+    assert (report["created"], report["updated"], report["unchanged"]) == (1, 1, 1)
+    searches = [body for method, path, query, body in server.calls if path.endswith("/records/search")]
+    assert all(body["field_names"] == ["编号", "文本", "数字"] for body in searches)
+    updates = [body["records"] for method, path, query, body in server.calls if path.endswith("/batch_update")]
+    assert updates == [[{"record_id": record_ids[1], "fields": {"数字": -1}}]]
+    assert report["create_result"]["records"][0]["fields"] == {"编号": "K99", "文本": "new", "数字": 99}
+
+
+# ---------------------------------------------------------------- 分区扫描
+
+
+def _spread_over_days(server, days=10):
+    """把记录的日期分布到多天的正午（UTC+8），末尾两条日期为空"""
+    day_ms = 24 * 3600 * 1000
+    base_day = 1_700_000_000_000 // day_ms
+    for i, fields in enumerate(list(server.records.values())[:-2]):
+        fields["日期"] = (base_day + i % days) * day_ms - 8 * 3600 * 1000 + day_ms // 2
+
+
+def test_parallel_scan_covers_each_record_once(server, client):
+    _spread_over_days(server)
+
+    records = client.parallel_scan(server.APP_TOKEN, server.TABLE_ID, partition_field="日期", partitions=4, page_size=3)
+    streamed = list(client.iter_parallel_scan(
+        server.APP_TOKEN, server.TABLE_ID, partition_field="日期", partitions=4, page_size=3
+    ))
+
+    assert sorted(record["record_id"] for record in records) == sorted(server.records)
+    # 流式扫描不去重，分区之间不重叠时每条记录恰好出现一次
+    assert sorted(record["record_id"] for record in streamed) == sorted(server.records)
+    filters = [
+        body["filter"] for method, path, query, body in server.calls
+        if path.endswith("/records/search") and query.get("page_size") != "1"
+    ]
+    # 4 个日期分区加 1 个空值分区
+    assert len({str(f) for f in filters}) == 5
+
+
+# ---------------------------------------------------------------- 直接解析响应
+
+
+def test_raw_decode_matches_sdk_results(server, client):
+    record_ids = list(server.records)
+
+    def read():
+        return (
+            client.get_all_records(server.APP_TOKEN, server.TABLE_ID),
+            client.get_record(server.APP_TOKEN, server.TABLE_ID, record_ids[0]),
+            client.get_records(server.APP_TOKEN, server.TABLE_ID, record_ids[:5]),
+        )
+
+    expected = read()
+    client.raw_decode = True
+    # 直接解析的路径不会构建 SDK 客户端
+    client._client = None
+    assert read() == expected
+    assert client._client is None
+
+    created = client.batch_create_records(server.APP_TOKEN, server.TABLE_ID, [{"数字": 100}])
+    assert created["records"][0]["fields"] == {"数字": 100}
+
+
+# ---------------------------------------------------------------- 指标
+
+
+def test_metrics_record_requests_pages_and_errors(server, client):
+    client.metrics = ClientMetrics()
+    events = []
+    client.metrics.add_hook(lambda event, labels, value: events.append((event, labels)))
+
+    client.get_all_tables(server.APP_TOKEN)
+    client.get_all_fields(server.APP_TOKEN, server.TABLE_ID)
+    list(client.iter_records(server.APP_TOKEN, server.TABLE_ID, page_size=10))
+    with pytest.raises(Exception):
+        client.get_record(server.APP_TOKEN, server.TABLE_ID, "rec_missing")
+
+    snapshot = client.metrics.snapshot()
+    counters = {(name, dict(labels).get("operation"), dict(labels).get("status")): value
+                for (name, labels), value in snapshot["counters"].items()}
+    assert counters[("requests_total", "tables.list", "ok")] == 1
+    assert counters[("requests_total", "fields.list", "ok")] == 1
+    assert counters[("requests_total", "records.search", "ok")] == 3
+    assert counters[("errors_total", "records.get", None)] == 1
+    pages = snapshot["histograms"][("pagination_pages", (("operation", "records.search"),))]
+    assert (pages["count"], pages["sum"]) == (1, 3)
+    error, = [labels for event, labels in events if event == "error"]
+    assert error["code"] == "1254043"
+
+    text = client.metrics.to_prometheus()
+    assert 'feishu_bitable_requests_total{endpoint="search",operation="records.search",status="ok"} 3' in text
+    assert "# TYPE feishu_bitable_request_duration_seconds histogram" in text
+
+
+def test_metrics_export_exact_large_counters():
+    metrics = ClientMetrics()
+    metrics.observe_request("download", "attachment", 0.5, "ok", nbytes=123456789)
+
+    assert 'feishu_bitable_response_bytes_total{endpoint="download",operation="attachment"} 123456789' in metrics.to_prometheus()
+
+
+# ---------------------------------------------------------------- 延迟导入
+
+
+def test_import_and_download_do_not_load_sdk(server, client, tmp_path):
+    code = "import sys, feishu_bitable_utils; print('lark_oapi' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.strip() == "False"
+
+    client._client = None
+    assert client.download_attachment(attachment_item(server), str(tmp_path / "file.bin"))
+    assert client._client is None
+
+
+# ---------------------------------------------------------------- 日志
+
+
+def test_log_handler_is_installed_once():
+    logger = logging.getLogger("FeishuBitableClient")
+    FeishuBitableClient("app_id", "app_secret")
+    FeishuBitableClient("app_id", "app_secret")
+    FeishuBitableClient("app_id", "app_secret", install_log_handler=False)
+
+    assert sum(getattr(handler, "_feishu_bitable", False) for handler in logger.handlers) == 1
+
+
+@pytest.mark.parametrize("raw_decode", [False, True])
+@pytest.mark.parametrize("error_payload, payload_logs", [("compact", 1), ("none", 0)])
+def test_errors_log_structured_summary_and_payload(server, client, caplog, raw_decode, error_payload, payload_logs):
+    client.raw_decode = raw_decode
+    client.error_payload = error_payload
+
+    with caplog.at_level(logging.ERROR, logger="FeishuBitableClient"):
+        with pytest.raises(Exception, match="1254043"):
+            client.get_record(server.APP_TOKEN, server.TABLE_ID, "rec_missing")
+
+    summary, *payloads = caplog.records
+    assert summary.feishu_error["code"] == 1254043
+    assert summary.feishu_error["action"] == "获取记录失败"
+    assert len(payloads) == payload_logs
+    assert all("RecordIdNotFound" in record.getMessage() for record in payloads)
+
+
+# ---------------------------------------------------------------- 域名和会话
+
+
+def test_raw_requests_use_base_url_and_custom_session(server):
+    session = requests.Session()
+    paths = []
+    session.hooks["response"].append(lambda response, *args, **kwargs: paths.append(urlsplit(response.url).path))
+
+    with FeishuBitableClient("app_id", "app_secret", base_url=server.url, session=session,
+                             raw_decode=True, install_log_handler=False) as client:
+        record_id = next(iter(server.records))
+        assert client.get_record(server.APP_TOKEN, server.TABLE_ID, record_id)["record_id"] == record_id
+
+    assert paths == [
+        "/open-apis/auth/v3/tenant_access_token/internal",
+        f"/open-apis/bitable/v1/apps/{server.APP_TOKEN}/tables/{server.TABLE_ID}/records/{record_id}",
+    ]
+
+
+# ---------------------------------------------------------------- 附件上传
+
+
+def test_upload_attachment_in_one_request(server, client, tmp_path):
+    path = tmp_path / "small.bin"
+    path.write_bytes(os.urandom(3000))
+
+    file_token = client.upload_attachment(server.APP_TOKEN, str(path))
+
+    assert server.uploaded[file_token] == path.read_bytes()
+    assert not server.uploads
+
+
+def test_multipart_upload_sends_part_checksums(server, client, tmp_path):
+    path = tmp_path / "large.bin"
+    path.write_bytes(os.urandom(3500))
+
+    file_token = client.upload_attachment(server.APP_TOKEN, str(path), multipart_threshold=0, part_workers=3)
+
+    # 服务端逐个分片校验 checksum，拼接后与原文件一致
+    assert server.uploaded[file_token] == path.read_bytes()
+    assert sorted(len(part) for part in server.uploads["upload1"]["parts"].values()) == [428, 1024, 1024, 1024]
+
+
+def test_multipart_upload_fails_on_corrupted_part(server, client, tmp_path):
+    path = tmp_path / "large.bin"
+    path.write_bytes(os.urandom(3500))
+    server.corrupt_part = 2
+
+    with pytest.raises(Exception, match="1062008"):
+        client.upload_attachment(server.APP_TOKEN, str(path), multipart_threshold=0)
+    assert not server.uploaded
+
+
+def test_upload_field_attachments_keeps_input_order(server, client, tmp_path):
+    paths = []
+    for i, size in enumerate([100, 5000, 200]):
+        path = tmp_path / f"file{i}.bin"
+        path.write_bytes(os.urandom(size))
+        paths.append(str(path))
+
+    values = client.upload_field_attachments(server.APP_TOKEN, paths)
+
+    assert [server.uploaded[value["file_token"]] for value in values] == [open(p, "rb").read() for p in paths]